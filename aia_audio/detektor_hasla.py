@@ -0,0 +1,139 @@
+# aia_audio/detektor_hasla.py
+import os
+import json
+import time
+import numpy as np
+
+# Vosk z gramatyką ograniczoną do haseł - opcjonalny
+try:
+    from vosk import Model, KaldiRecognizer, SetLogLevel
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+# === 1. Parametry ===
+SCIEZKA_MODELU_VOSK = "models/vosk-pl"   # ten sam model co stt/stt_vosk.py
+SAMPLERATE = 16000
+WERYFIKACJA_CO_N = 10  # co który odrzucony segment sprawdzić pełnym STT (szacowanie false reject)
+
+# === 2. Detektor słowa aktywującego ===
+class DetektorHasla:
+    """
+    Lekki detektor słowa aktywującego dla trybu czuwania
+
+    Tryby:
+    - "vosk": mały model Vosk z gramatyką zawężoną do haseł + [unk]
+    - "bramka": bez Vosk - przepuszcza każdy segment z mową do pełnego STT
+
+    Pełne STT weryfikuje każde trafienie (false accept) i co N-te odrzucenie
+    (false reject), więc liczniki pozwalają stroić detektor na żywych danych.
+    """
+
+    def __init__(self, hasla, samplerate: int = SAMPLERATE, sciezka_modelu: str = SCIEZKA_MODELU_VOSK,
+                 weryfikacja_co_n: int = WERYFIKACJA_CO_N):
+        self.samplerate = samplerate
+        self.weryfikacja_co_n = weryfikacja_co_n
+        self._rozpoznawacz = None
+        self._model = None
+
+        if VOSK_AVAILABLE and os.path.isdir(sciezka_modelu):
+            SetLogLevel(-1)
+            self._model = Model(sciezka_modelu)
+            self.tryb = "vosk"
+        else:
+            if not VOSK_AVAILABLE:
+                print("⚠️ Vosk niedostępny - detektor hasła działa jako bramka mowy")
+            else:
+                print(f"⚠️ Brak modelu Vosk w {sciezka_modelu} - detektor hasła działa jako bramka mowy")
+            self.tryb = "bramka"
+
+        self.ustaw_hasla(hasla)
+        self.resetuj_statystyki()
+        print(f"👂 Detektor hasła: {self.tryb} ({', '.join(self.hasla)})")
+
+    def ustaw_hasla(self, hasla):
+        """Zmienia listę haseł (przebudowuje gramatykę)"""
+        self.hasla = [h.lower() for h in hasla]
+        if self._model is not None:
+            gramatyka = json.dumps(self.hasla + ["[unk]"], ensure_ascii=False)
+            self._rozpoznawacz = KaldiRecognizer(self._model, self.samplerate, gramatyka)
+
+    def resetuj_statystyki(self):
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.cpu_detektora_s = 0.0
+        self.audio_s = 0.0
+        self.segmenty = 0
+        self.trafienia = 0
+        self.potwierdzone_trafienia = 0
+        self.falszywe_akceptacje = 0
+        self.odrzucenia = 0
+        self.zweryfikowane_odrzucenia = 0
+        self.falszywe_odrzucenia = 0
+
+    def sprawdz(self, segment) -> bool:
+        """Zwraca True, jeśli segment (float32) zawiera hasło aktywujące"""
+        cpu_start = time.thread_time()
+
+        if self._rozpoznawacz is not None:
+            pcm = (np.clip(segment, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+            self._rozpoznawacz.AcceptWaveform(pcm)
+            tekst = json.loads(self._rozpoznawacz.FinalResult()).get("text", "")
+            self._rozpoznawacz.Reset()
+            trafienie = any(haslo in tekst for haslo in self.hasla)
+        else:
+            trafienie = True
+
+        self.cpu_detektora_s += time.thread_time() - cpu_start
+        self.audio_s += len(segment) / self.samplerate
+        self.segmenty += 1
+        if trafienie:
+            self.trafienia += 1
+        else:
+            self.odrzucenia += 1
+        return trafienie
+
+    def czy_weryfikowac_odrzucenie(self) -> bool:
+        """Czy bieżące odrzucenie sprawdzić pełnym STT (próbkowanie co N-te)"""
+        return self.weryfikacja_co_n > 0 and self.odrzucenia % self.weryfikacja_co_n == 0
+
+    def zglos_weryfikacje(self, trafienie: bool, potwierdzone: bool):
+        """Wynik pełnego STT dla segmentu ocenionego przez detektor"""
+        if trafienie:
+            if potwierdzone:
+                self.potwierdzone_trafienia += 1
+            else:
+                self.falszywe_akceptacje += 1
+        else:
+            self.zweryfikowane_odrzucenia += 1
+            if potwierdzone:
+                self.falszywe_odrzucenia += 1
+
+    def statystyki(self) -> dict:
+        """Zużycie CPU i liczniki FA/FR do strojenia"""
+        czas = max(time.perf_counter() - self._start, 1e-9)
+        zweryfikowane_trafienia = self.potwierdzone_trafienia + self.falszywe_akceptacje
+        return {
+            "tryb": self.tryb,
+            "segmenty": self.segmenty,
+            "audio_s": round(self.audio_s, 1),
+            "cpu_detektora_s": round(self.cpu_detektora_s, 3),
+            "rtf_detektora": round(self.cpu_detektora_s / self.audio_s, 4) if self.audio_s else 0.0,
+            "cpu_procesu_procent": round(100 * (time.process_time() - self._cpu_start) / czas, 1),
+            "trafienia": self.trafienia,
+            "falszywe_akceptacje": self.falszywe_akceptacje,
+            "odsetek_fa": round(self.falszywe_akceptacje / zweryfikowane_trafienia, 3) if zweryfikowane_trafienia else 0.0,
+            "odrzucenia": self.odrzucenia,
+            "zweryfikowane_odrzucenia": self.zweryfikowane_odrzucenia,
+            "falszywe_odrzucenia": self.falszywe_odrzucenia,
+            "odsetek_fr": round(self.falszywe_odrzucenia / self.zweryfikowane_odrzucenia, 3) if self.zweryfikowane_odrzucenia else 0.0
+        }
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    print("🧪 Test detektora hasła")
+
+    detektor = DetektorHasla(["stefan", "aja"])
+    cisza = np.zeros(SAMPLERATE, dtype=np.float32)
+    print(f"Cisza → trafienie: {detektor.sprawdz(cisza)}")
+    print(f"Statystyki: {detektor.statystyki()}")
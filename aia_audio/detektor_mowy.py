@@ -0,0 +1,210 @@
+# aia_audio/detektor_mowy.py
+import numpy as np
+
+# WebRTC VAD jest opcjonalny - bez niego używamy progu energii
+try:
+    import webrtcvad
+    WEBRTC_AVAILABLE = True
+except ImportError:
+    WEBRTC_AVAILABLE = False
+
+# === 1. Parametry ===
+RAMKA_MS = 30             # długość ramki analizy (10/20/30 ms - wymóg WebRTC)
+START_MS = 90             # tyle mowy z rzędu oznacza początek wypowiedzi
+CISZA_KONCA_MS = 600      # tyle ciszy po mowie zamyka wypowiedź
+PRZED_MOWA_MS = 200       # zapas dołączany przed początkiem mowy
+PO_MOWIE_MS = 150         # zapas dołączany po końcu mowy
+MAX_CZAS_S = 10           # twardy limit długości wypowiedzi
+CZAS_OCZEKIWANIA_S = 10   # jak długo czekać na początek mowy
+
+MIN_PROG_RMS = 0.01       # bezwzględny próg energii
+WSPOLCZYNNIK_SZUMU = 3.0  # mowa = energia powyżej poziomu szumu razy ten współczynnik
+ADAPTACJA_SZUMU = 0.05    # tempo uczenia poziomu szumu (tylko na ramkach ciszy)
+
+# === 2. Klasyfikacja ramek ===
+class DetektorMowy:
+    """
+    Klasyfikuje ramki audio jako mowę lub ciszę
+
+    Tryby:
+    - "energia": RMS ramki porównywany z adaptacyjnym poziomem szumu
+    - "webrtc": WebRTC VAD (jeśli zainstalowany webrtcvad)
+    """
+
+    def __init__(self, samplerate: int, tryb: str = "energia", agresywnosc: int = 2):
+        if tryb == "webrtc" and not WEBRTC_AVAILABLE:
+            print("⚠️ webrtcvad niedostępny - używam detekcji energii")
+            tryb = "energia"
+
+        self.samplerate = samplerate
+        self.tryb = tryb
+        self.poziom_szumu = MIN_PROG_RMS / WSPOLCZYNNIK_SZUMU
+        self._vad = webrtcvad.Vad(agresywnosc) if tryb == "webrtc" else None
+
+    @property
+    def prog(self) -> float:
+        return max(MIN_PROG_RMS, self.poziom_szumu * WSPOLCZYNNIK_SZUMU)
+
+    def kalibruj(self, probki, dl_ramki: int):
+        """
+        Ustawia poziom szumu na podstawie fragmentu tła
+
+        Bierze najcichszą ramkę - odporne na mowę lub echo TTS we fragmencie.
+        """
+        n = len(probki) // dl_ramki
+        if n == 0:
+            return
+        ramki = np.asarray(probki[:n * dl_ramki]).reshape(n, dl_ramki)
+        self.poziom_szumu = float(np.sqrt(np.mean(np.square(ramki), axis=1)).min())
+
+    def czy_mowa(self, ramka) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(ramka))))
+
+        if self._vad is not None:
+            pcm = (np.clip(ramka, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+            mowa = self._vad.is_speech(pcm, self.samplerate)
+        else:
+            mowa = rms > self.prog
+
+        if not mowa:
+            self.poziom_szumu += ADAPTACJA_SZUMU * (rms - self.poziom_szumu)
+        return mowa
+
+# === 3. Wykrywanie początku i końca wypowiedzi ===
+class Endpointer:
+    """
+    Maszyna stanów: CZEKA → MOWA → KONIEC
+
+    Karmiona kolejnymi ramkami zwraca zdarzenie "start" lub "koniec"
+    razem z bezwzględną pozycją (w próbkach) początku/końca mowy.
+    """
+
+    CZEKA, MOWA, KONIEC = "czeka", "mowa", "koniec"
+
+    def __init__(self, detektor: DetektorMowy, start_ms: int = START_MS, cisza_ms: int = CISZA_KONCA_MS):
+        self.detektor = detektor
+        self.ramek_startu = max(1, start_ms // RAMKA_MS)
+        self.ramek_ciszy = max(1, cisza_ms // RAMKA_MS)
+        self.stan = self.CZEKA
+        self.poczatek = None
+        self.koniec = None
+        self._seria_mowy = 0
+        self._seria_ciszy = 0
+
+    def przetworz(self, ramka, pozycja: int):
+        """Przetwarza ramkę zaczynającą się na pozycji `pozycja`; zwraca zdarzenie lub None"""
+        mowa = self.detektor.czy_mowa(ramka)
+
+        if self.stan == self.CZEKA:
+            if mowa:
+                if self._seria_mowy == 0:
+                    self.poczatek = pozycja
+                self._seria_mowy += 1
+                if self._seria_mowy >= self.ramek_startu:
+                    self.stan = self.MOWA
+                    return "start"
+            else:
+                self._seria_mowy = 0
+                self.poczatek = None
+
+        elif self.stan == self.MOWA:
+            if mowa:
+                self._seria_ciszy = 0
+                self.koniec = None
+            else:
+                if self._seria_ciszy == 0:
+                    self.koniec = pozycja
+                self._seria_ciszy += 1
+                if self._seria_ciszy >= self.ramek_ciszy:
+                    self.stan = self.KONIEC
+                    return "koniec"
+
+        return None
+
+# === 4. Nagranie jednej wypowiedzi z bufora mikrofonu ===
+_detektory = {}
+
+def pobierz_detektor(samplerate: int, tryb: str = "energia") -> DetektorMowy:
+    """Detektor współdzielony między wywołaniami (zachowuje wyuczony poziom szumu)"""
+    klucz = (samplerate, tryb)
+    if klucz not in _detektory:
+        _detektory[klucz] = DetektorMowy(samplerate, tryb)
+    return _detektory[klucz]
+
+def nagraj_wypowiedz(mikrofon, max_czas: float = MAX_CZAS_S, czas_oczekiwania: float = CZAS_OCZEKIWANIA_S,
+                     cisza_ms: int = CISZA_KONCA_MS, tryb: str = "energia", callback_ramki=None) -> np.ndarray:
+    """
+    Czyta ramki z bufora mikrofonu aż do końca wypowiedzi
+
+    Zwraca widok (bez kopiowania) obejmujący tylko fragment z mową plus
+    krótkie zapasy na brzegach. Pusta tablica = nikt nie zaczął mówić
+    w czasie `czas_oczekiwania`.
+
+    Args:
+        mikrofon: aia_audio.mikrofon.Mikrofon
+        max_czas: maksymalna długość wypowiedzi (s)
+        czas_oczekiwania: ile czekać na początek mowy (s)
+        cisza_ms: cisza kończąca wypowiedź (ms)
+        tryb: "energia" lub "webrtc"
+        callback_ramki: opcjonalnie f(endpointer, pozycja) po każdej ramce;
+            zwrócenie True kończy nagrywanie przed czasem
+    """
+    sr = mikrofon.samplerate
+    dl_ramki = sr * RAMKA_MS // 1000
+    detektor = pobierz_detektor(sr, tryb)
+    endpointer = Endpointer(detektor, cisza_ms=cisza_ms)
+
+    kursor = mikrofon.pozycja
+    if detektor.tryb == "energia" and kursor > 0:
+        # Tło tuż przed startem nasłuchu - szybka kalibracja progu
+        detektor.kalibruj(mikrofon.okno(max(mikrofon.bufor.najstarsza_pozycja, kursor - sr // 2), kursor), dl_ramki)
+
+    limit_startu = kursor + int(czas_oczekiwania * sr)
+    limit_mowy = None
+
+    while True:
+        if not mikrofon.czekaj_na_probki(kursor + dl_ramki, timeout=1.0):
+            print("⚠️ Brak danych z mikrofonu")
+            break
+
+        zdarzenie = endpointer.przetworz(mikrofon.okno(kursor, kursor + dl_ramki), kursor)
+        kursor += dl_ramki
+
+        if zdarzenie == "start":
+            limit_mowy = endpointer.poczatek + int(max_czas * sr)
+        elif zdarzenie == "koniec":
+            break
+
+        if callback_ramki and callback_ramki(endpointer, kursor):
+            break
+        if endpointer.stan == Endpointer.CZEKA and kursor >= limit_startu:
+            return mikrofon.okno(kursor, kursor)
+        if limit_mowy is not None and kursor >= limit_mowy:
+            print(f"⏱️ Osiągnięto limit {max_czas}s wypowiedzi")
+            break
+
+    if endpointer.poczatek is None:
+        return mikrofon.okno(kursor, kursor)
+
+    poczatek = max(mikrofon.bufor.najstarsza_pozycja, endpointer.poczatek - sr * PRZED_MOWA_MS // 1000)
+    koniec = endpointer.koniec if endpointer.koniec is not None else kursor
+    koniec = min(kursor, koniec + sr * PO_MOWIE_MS // 1000)
+    return mikrofon.okno(poczatek, koniec)
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    print("🧪 Test endpointera na sztucznym sygnale")
+
+    sr = 16000
+    dl = sr * RAMKA_MS // 1000
+    szum = np.random.default_rng(0).normal(0, 0.002, sr).astype(np.float32)
+    ton = 0.3 * np.sin(2 * np.pi * 220 * np.arange(sr) / sr).astype(np.float32)
+    sygnal = np.concatenate([szum, ton, szum])
+
+    endpointer = Endpointer(DetektorMowy(sr))
+    for pozycja in range(0, len(sygnal) - dl + 1, dl):
+        zdarzenie = endpointer.przetworz(sygnal[pozycja:pozycja + dl], pozycja)
+        if zdarzenie:
+            print(f"  {zdarzenie} @ {pozycja / sr:.2f}s")
+
+    print(f"Mowa: {endpointer.poczatek / sr:.2f}s → {endpointer.koniec / sr:.2f}s (oczekiwane 1.00s → 2.00s)")
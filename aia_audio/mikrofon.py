@@ -0,0 +1,209 @@
+# aia_audio/mikrofon.py
+import atexit
+import threading
+import numpy as np
+import sounddevice as sd
+
+# === 1. Parametry ===
+SAMPLERATE = 16000
+BLOCKSIZE = 1024          # ramek na jedno wywołanie callbacku
+POJEMNOSC_SEKUND = 30     # ile sekund historii trzyma bufor
+
+# === 2. Bufor pierścieniowy ===
+class BuforPierscieniowy:
+    """
+    Prealokowany bufor pierścieniowy float32 (mono)
+
+    Każda próbka zapisywana jest dwukrotnie (pod indeksem i oraz i + pojemnosc),
+    więc dowolne okno nie dłuższe niż pojemność jest ciągłym fragmentem pamięci
+    i może zostać zwrócone jako widok NumPy bez kopiowania.
+
+    Pozycje są bezwzględne (liczba próbek zapisanych od startu), dzięki czemu
+    każdy czytelnik może trzymać własny kursor.
+    """
+
+    def __init__(self, pojemnosc: int):
+        self.pojemnosc = int(pojemnosc)
+        self._dane = np.zeros(2 * self.pojemnosc, dtype=np.float32)
+        self._zapisano = 0
+        self._warunek = threading.Condition()
+
+    @property
+    def pozycja(self) -> int:
+        """Bezwzględna pozycja końca danych (liczba zapisanych próbek)"""
+        return self._zapisano
+
+    @property
+    def najstarsza_pozycja(self) -> int:
+        """Najstarsza pozycja, która jest jeszcze w buforze"""
+        return max(0, self._zapisano - self.pojemnosc)
+
+    def zapisz(self, probki):
+        """Dopisuje próbki na końcu bufora (wywoływane z wątku audio)"""
+        probki = np.asarray(probki, dtype=np.float32).reshape(-1)
+        n = len(probki)
+        if n == 0:
+            return
+
+        if n > self.pojemnosc:
+            # Zmieści się tylko ogon - reszta i tak zostałaby nadpisana
+            self._zapisano += n - self.pojemnosc
+            probki = probki[-self.pojemnosc:]
+            n = self.pojemnosc
+
+        start = self._zapisano % self.pojemnosc
+        pierwsza = min(n, self.pojemnosc - start)
+        self._zapisz_fragment(start, probki[:pierwsza])
+        if pierwsza < n:
+            self._zapisz_fragment(0, probki[pierwsza:])
+
+        with self._warunek:
+            self._zapisano += n
+            self._warunek.notify_all()
+
+    def _zapisz_fragment(self, indeks, fragment):
+        koniec = indeks + len(fragment)
+        self._dane[indeks:koniec] = fragment
+        self._dane[indeks + self.pojemnosc:koniec + self.pojemnosc] = fragment
+
+    def okno(self, od: int, do: int) -> np.ndarray:
+        """
+        Zwraca widok próbek [od, do) bez kopiowania
+
+        Widok jest ważny, dopóki bufor nie zawinie się o pełną pojemność
+        (domyślnie 30 s). Jeśli dane mają żyć dłużej - skopiuj je.
+        """
+        if do > self._zapisano:
+            raise ValueError(f"Okno wykracza poza zapisane dane ({do} > {self._zapisano})")
+        if od < self.najstarsza_pozycja:
+            raise ValueError(f"Okno zostało już nadpisane ({od} < {self.najstarsza_pozycja})")
+        if do <= od:
+            return self._dane[:0]
+
+        start = od % self.pojemnosc
+        return self._dane[start:start + (do - od)]
+
+    def czekaj(self, pozycja: int, timeout: float = None) -> bool:
+        """Czeka aż w buforze pojawią się próbki do podanej pozycji"""
+        with self._warunek:
+            return self._warunek.wait_for(lambda: self._zapisano >= pozycja, timeout=timeout)
+
+# === 3. Mikrofon współdzielony ===
+class Mikrofon:
+    """
+    Trwały strumień mikrofonu zapisujący do bufora pierścieniowego
+
+    Urządzenie otwierane jest raz na cały czas życia procesu. Moduły STT
+    i nasłuchiwacz czytają z bufora okna czasowe zamiast otwierać własne
+    strumienie przy każdej wypowiedzi.
+    """
+
+    def __init__(self, samplerate: int = SAMPLERATE, pojemnosc_sekund: float = POJEMNOSC_SEKUND,
+                 blocksize: int = BLOCKSIZE):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.bufor = BuforPierscieniowy(int(samplerate * pojemnosc_sekund))
+        self._strumien = None
+        self._lock = threading.Lock()
+
+    def _callback(self, indata, frames, time, status):
+        if status:
+            print(f"⚠️ Błąd wejścia audio: {status}")
+        self.bufor.zapisz(indata[:, 0])
+
+    def uruchom(self):
+        """Otwiera strumień wejściowy (jeśli jeszcze nie działa)"""
+        with self._lock:
+            if self._strumien is not None:
+                return
+            self._strumien = sd.InputStream(
+                samplerate=self.samplerate,
+                channels=1,
+                dtype="float32",
+                blocksize=self.blocksize,
+                callback=self._callback
+            )
+            self._strumien.start()
+            print(f"🎙️ Mikrofon aktywny ({self.samplerate} Hz, bufor {self.bufor.pojemnosc / self.samplerate:.0f}s)")
+
+    def zatrzymaj(self):
+        """Zamyka strumień wejściowy"""
+        with self._lock:
+            if self._strumien is None:
+                return
+            try:
+                self._strumien.stop()
+                self._strumien.close()
+            finally:
+                self._strumien = None
+            print("🔇 Mikrofon zatrzymany")
+
+    @property
+    def aktywny(self) -> bool:
+        return self._strumien is not None
+
+    @property
+    def pozycja(self) -> int:
+        return self.bufor.pozycja
+
+    def sekundy_na_probki(self, sekundy: float) -> int:
+        return int(round(sekundy * self.samplerate))
+
+    def okno(self, od: int, do: int) -> np.ndarray:
+        """Widok próbek [od, do) - patrz BuforPierscieniowy.okno"""
+        return self.bufor.okno(od, do)
+
+    def ostatnie(self, sekundy: float) -> np.ndarray:
+        """Widok ostatnich `sekundy` sekund nagrania"""
+        koniec = self.bufor.pozycja
+        start = max(self.bufor.najstarsza_pozycja, koniec - self.sekundy_na_probki(sekundy))
+        return self.bufor.okno(start, koniec)
+
+    def czekaj_na_probki(self, pozycja: int, timeout: float = None) -> bool:
+        """Czeka aż nagranie dojdzie do podanej pozycji"""
+        return self.bufor.czekaj(pozycja, timeout=timeout)
+
+    def nagraj(self, sekundy: float, od: int = None) -> np.ndarray:
+        """
+        Czeka na `sekundy` nagrania począwszy od pozycji `od` (domyślnie: teraz)
+        i zwraca widok na ten fragment. Przy timeoucie zwraca to, co jest.
+        """
+        self.uruchom()
+        if od is None:
+            od = self.bufor.pozycja
+        do = od + self.sekundy_na_probki(sekundy)
+
+        if not self.czekaj_na_probki(do, timeout=sekundy + 1):
+            print("⚠️ Timeout podczas nagrywania")
+            do = self.bufor.pozycja
+
+        return self.okno(max(od, self.bufor.najstarsza_pozycja), do)
+
+# === 4. Instancja współdzielona ===
+_mikrofon = None
+_mikrofon_lock = threading.Lock()
+
+def pobierz_mikrofon() -> Mikrofon:
+    """Zwraca (i przy pierwszym wywołaniu uruchamia) współdzielony mikrofon"""
+    global _mikrofon
+    with _mikrofon_lock:
+        if _mikrofon is None:
+            _mikrofon = Mikrofon()
+            atexit.register(_mikrofon.zatrzymaj)
+    _mikrofon.uruchom()
+    return _mikrofon
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    print("🧪 Test bufora pierścieniowego")
+
+    bufor = BuforPierscieniowy(8)
+    bufor.zapisz(np.arange(6, dtype=np.float32))
+    bufor.zapisz(np.arange(6, 11, dtype=np.float32))
+    widok = bufor.okno(3, 11)
+    print(f"Okno [3, 11): {widok.tolist()} (widok: {widok.base is not None})")
+
+    print("\n🎙️ Test mikrofonu - 3 sekundy")
+    mik = pobierz_mikrofon()
+    audio = mik.nagraj(3)
+    print(f"📊 Nagrano {len(audio)} próbek, RMS: {np.sqrt(np.mean(audio ** 2)):.4f}")
@@ -12,6 +12,9 @@ MAX_BLEDY_PODRZAD = 3  # maksymalna liczba błędów STT z rzędu
 SLEEP_CZUWANIE = 0.5  # opóźnienie w trybie czuwania
 SLEEP_AKTYWNY = 0.3   # opóźnienie w trybie aktywnym
 
+# Detektor hasła dla trybu czuwania (tworzony w nasluchuj)
+_detektor_hasla = None
+
 def _loguj_z_czasem(wiadomosc):
     """Dodaje timestamp do logów"""
     czas = datetime.now().strftime("%H:%M:%S")
@@ -25,6 +28,42 @@ def _sprawdz_haslo_aktywujace(tekst):
             return True
     return False
 
+def _uzywa_wspolnego_mikrofonu(stt):
+    """Czy moduł STT czyta z aia_audio.mikrofon zamiast otwierać własny strumień"""
+    return getattr(stt, "WSPOLNY_MIKROFON", False)
+
+def _uzywa_trybu_strumieniowego(stt):
+    """Czy moduł STT udostępnia i ma włączone hipotezy częściowe"""
+    return hasattr(stt, "rozpoznaj_mowe_strumieniowo") and stt.tryb_strumieniowy()
+
+def _obsluguje_segmenty(stt):
+    """Czy moduł STT pozwala osobno nagrać segment i go przetranskrybować"""
+    return hasattr(stt, "nagraj_segment") and hasattr(stt, "transkrybuj")
+
+def _rozpoznaj_w_czuwaniu(stt, detektor):
+    """
+    Tryb czuwania: tani detektor hasła na każdym segmencie mowy,
+    pełne STT tylko po trafieniu (i co N-te odrzucenie - do statystyk FR)
+    """
+    segment = stt.nagraj_segment()
+    if len(segment) == 0:
+        return ""
+
+    trafienie = detektor.sprawdz(segment)
+    if not trafienie and not detektor.czy_weryfikowac_odrzucenie():
+        return ""
+
+    tekst = stt.transkrybuj(segment)
+    potwierdzone = _sprawdz_haslo_aktywujace(tekst)
+    detektor.zglos_weryfikacje(trafienie, potwierdzone)
+
+    if trafienie and not potwierdzone:
+        _loguj_z_czasem("⚠️ Detektor hasła: fałszywa akceptacja")
+    elif not trafienie and potwierdzone:
+        _loguj_z_czasem("⚠️ Detektor hasła przeoczył hasło (false reject) - aktywuję mimo to")
+
+    return tekst if (trafienie or potwierdzone) else ""
+
 def _sprawdz_komende_stop(tekst):
     """Sprawdza czy tekst zawiera komendę stop"""
     tekst_lower = tekst.lower()
@@ -34,27 +73,62 @@ def _sprawdz_komende_stop(tekst):
     return False
 
 # === 2. Funkcja ciągłego nasłuchu ===
-def nasluchuj(callback_tekstowy, stt):
+def nasluchuj(callback_tekstowy, stt, detektor_hasla=None):
     """
     Główna pętla nasłuchiwania z obsługą stanów
     Args:
         callback_tekstowy: funkcja callback która przyjmuje tekst
         stt: moduł STT do rozpoznawania mowy
+        detektor_hasla: opcjonalny DetektorHasla dla trybu czuwania
+            (domyślnie tworzony, jeśli STT obsługuje segmenty)
     """
+    global _detektor_hasla
     _loguj_z_czasem(f"🟢 Nasłuchiwanie aktywne... Słowa aktywujące: {', '.join(HASLO_AKTYWUJACE)}")
     _loguj_z_czasem(f"🛑 Komendy stop: {', '.join(KOMENDY_STOP)}")
     
+    # Współdzielony mikrofon nagrywa bez przerwy do bufora - otwórz go od razu,
+    # a pauzy między cyklami są zbędne (nic nie ginie, tylko rośnie opóźnienie)
+    wspolny_mikrofon = _uzywa_wspolnego_mikrofonu(stt)
+    if wspolny_mikrofon:
+        from aia_audio.mikrofon import pobierz_mikrofon
+        pobierz_mikrofon()
+    
+    # W czuwaniu pełne STT budzi dopiero lekki detektor hasła
+    if detektor_hasla is None and _obsluguje_segmenty(stt):
+        from aia_audio.detektor_hasla import DetektorHasla
+        detektor_hasla = DetektorHasla(HASLO_AKTYWUJACE)
+    _detektor_hasla = detektor_hasla
+    
+    def _pauza(aktywny):
+        if not wspolny_mikrofon:
+            time.sleep(SLEEP_CZUWANIE if not aktywny else SLEEP_AKTYWNY)
+    
     aktywny = False
     czas_aktywacji = None
     licznik_bledow = 0
     
+    def _obsluz_czesciowy(zatwierdzony, niepewny):
+        """
+        Reaguje na hipotezy częściowe zanim użytkownik skończy mówić
+
+        W aktywnym trybie komenda stop kończy nagrywanie od razu. Hasło
+        aktywujące obsługuje wynik końcowy - przerwanie nagrania po haśle
+        ucięłoby komendę wypowiedzianą jednym tchem ("Stefan, która godzina").
+        """
+        return aktywny and _sprawdz_komende_stop(zatwierdzony)
+    
     while True:
         try:
             # Rozpoznaj mowę
-            tekst = stt.rozpoznaj_mowe_z_mikrofonu()
+            if not aktywny and detektor_hasla is not None:
+                tekst = _rozpoznaj_w_czuwaniu(stt, detektor_hasla)
+            elif _uzywa_trybu_strumieniowego(stt):
+                tekst = stt.rozpoznaj_mowe_strumieniowo(_obsluz_czesciowy)
+            else:
+                tekst = stt.rozpoznaj_mowe_z_mikrofonu()
             
             if not tekst or not tekst.strip():
-                time.sleep(SLEEP_CZUWANIE if not aktywny else SLEEP_AKTYWNY)
+                _pauza(aktywny)
                 continue
                 
             # Reset licznika błędów po udanym rozpoznaniu
@@ -96,6 +170,8 @@ def nasluchuj(callback_tekstowy, stt):
                 # Sprawdź komendę stop
                 if _sprawdz_komende_stop(tekst):
                     _loguj_z_czasem("🛑 Komenda STOP wykryta – nasłuch przerwany.")
+                    if detektor_hasla is not None:
+                        _loguj_z_czasem(f"📊 Detektor hasła: {detektor_hasla.statystyki()}")
                     break
                 
                 # Sprawdź czy to znów słowo aktywujące (ignoruj)
@@ -130,13 +206,15 @@ def nasluchuj(callback_tekstowy, stt):
             continue
         
         # Krótka pauza między cyklami
-        time.sleep(SLEEP_CZUWANIE if not aktywny else SLEEP_AKTYWNY)
+        _pauza(aktywny)
 
 # === 3. Funkcje pomocnicze ===
 def ustaw_hasla_aktywujace(nowe_hasla):
     """Zmienia listę haseł aktywujących w runtime"""
     global HASLO_AKTYWUJACE
     HASLO_AKTYWUJACE = nowe_hasla
+    if _detektor_hasla is not None:
+        _detektor_hasla.ustaw_hasla(nowe_hasla)
     print(f"✅ Zaktualizowano hasła aktywujące: {', '.join(HASLO_AKTYWUJACE)}")
 
 def ustaw_komendy_stop(nowe_komendy):
@@ -145,6 +223,12 @@ def ustaw_komendy_stop(nowe_komendy):
     KOMENDY_STOP = nowe_komendy
     print(f"✅ Zaktualizowano komendy stop: {', '.join(KOMENDY_STOP)}")
 
+def statystyki_detektora_hasla():
+    """Zużycie CPU i liczniki false accept / false reject detektora hasła"""
+    if _detektor_hasla is None:
+        return {"status": "not_initialized"}
+    return _detektor_hasla.statystyki()
+
 def ustaw_timeout(nowy_timeout):
     """Zmienia timeout aktywności"""
     global TIMEOUT_AKTYWNY
@@ -0,0 +1,202 @@
+# core/automat_slow.py
+import time
+import threading
+from collections import deque
+from functools import lru_cache
+from core.leksykon import KLUCZE_KONTEKSTOW, SLOWA_RAG, SKLADNIKI_JSON, KONCOWKI, SKLADNIKI_PODSTAWOWE
+
+# === 1. Parametry ===
+MIN_DL_RDZENIA = 4          # krótsze słowa dopasowywane tylko w całości ("mam", "sól", "sos")
+SAMOGLOSKI = set("aąeęioóuy")
+
+def rdzen(slowo: str) -> str:
+    """Rdzeń do dopasowania odmian: bez końcowych samogłosek ("jajka" → "jajk")"""
+    if len(slowo) < MIN_DL_RDZENIA:
+        return slowo
+    koniec = len(slowo)
+    while koniec > MIN_DL_RDZENIA and slowo[koniec - 1] in SAMOGLOSKI:
+        koniec -= 1
+    return slowo[:koniec]
+
+def _skladniki_z_bazy():
+    """[(nazwa, [nazwa + synonimy])] z bazy składników"""
+    import json
+    try:
+        with open(SKLADNIKI_JSON, encoding="utf-8") as f:
+            return [(s["nazwa"], [s["nazwa"]] + s.get("synonimy", []))
+                    for s in json.load(f).get("skladniki", []) if s.get("nazwa")]
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Automat słów: brak bazy składników ({e})")
+        return []
+
+# === 2. Automat Aho-Corasick ===
+class AutomatSlow:
+    """
+    Wszystkie słowniki domenowe w jednym automacie Aho-Corasick
+
+    Wzorce to rdzenie fraz (ostatnie słowo frazy bez końcowych samogłosek),
+    każdy z listą etykiet (rodzaj, grupa, forma kanoniczna), np.
+    ("kontekst", "cooking", "pomidor") albo ("skladnik", None, "pomidor").
+    Tekst przechodzi przez automat raz, niezależnie od liczby słów kluczowych.
+
+    Dopasowanie liczy się tylko od początku słowa, a reszta słowa po
+    rdzeniu musi być końcówką fleksyjną (KONCOWKI) - "sos" nie pasuje
+    do "sosna", a "pomidor" pasuje do "pomidorami".
+    """
+
+    def __init__(self):
+        start = time.perf_counter()
+        self._przejscia = [{}]   # węzeł → {znak: węzeł}
+        self._porazki = [0]
+        self._wyjscia = [[]]     # węzeł → [(długość wzorca, dokładny, etykiety)]
+        self._wzorce = {}        # wzorzec → (dokładny, etykiety)
+
+        for kontekst, slowa in KLUCZE_KONTEKSTOW.items():
+            for slowo in slowa:
+                self._dodaj(slowo, ("kontekst", kontekst, slowo))
+        for kontekst, slowa in SLOWA_RAG.items():
+            for slowo in slowa:
+                self._dodaj(slowo, ("rag", kontekst, slowo))
+        # Nazwy podstawowe przed bazą - przy wspólnym rdzeniu wygrywa pierwsza
+        # forma kanoniczna, więc "chleb" zostaje "chleb", nie "chleb razowy"
+        for nazwa in SKLADNIKI_PODSTAWOWE:
+            self._dodaj(nazwa, ("skladnik", None, nazwa))
+        for nazwa, formy in _skladniki_z_bazy():
+            for forma in formy:
+                self._dodaj(forma, ("skladnik", None, nazwa))
+
+        for wzorzec, (dokladny, etykiety) in self._wzorce.items():
+            self._wstaw(wzorzec, dokladny, etykiety)
+        self._zbuduj_porazki()
+        print(f"✅ Automat słów: {len(self._wzorce)} wzorców, {len(self._przejscia)} węzłów "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def _dodaj(self, fraza: str, etykieta):
+        fraza = " ".join(fraza.lower().split())
+        if not fraza:
+            return
+        poczatek, _, ostatnie = fraza.rpartition(" ")
+        wzorzec = (poczatek + " " if poczatek else "") + rdzen(ostatnie)
+        dokladny = len(ostatnie) < MIN_DL_RDZENIA
+        poprzedni = self._wzorce.get(wzorzec)
+        if poprzedni is None:
+            self._wzorce[wzorzec] = (dokladny, [etykieta])
+        else:
+            # Ten sam rdzeń z dwóch źródeł - dokładny tylko gdy oba są dokładne;
+            # odmiany z jednej listy ("pomidor", "pomidory") dają jedną formę kanoniczną
+            if all(e[:2] != etykieta[:2] for e in poprzedni[1]):
+                poprzedni[1].append(etykieta)
+            self._wzorce[wzorzec] = (poprzedni[0] and dokladny, poprzedni[1])
+
+    def _wstaw(self, wzorzec, dokladny, etykiety):
+        wezel = 0
+        for znak in wzorzec:
+            nastepny = self._przejscia[wezel].get(znak)
+            if nastepny is None:
+                nastepny = len(self._przejscia)
+                self._przejscia[wezel][znak] = nastepny
+                self._przejscia.append({})
+                self._porazki.append(0)
+                self._wyjscia.append([])
+            wezel = nastepny
+        self._wyjscia[wezel].append((len(wzorzec), dokladny, tuple(etykiety)))
+
+    def _zbuduj_porazki(self):
+        """BFS po trie: dowiązania porażek + scalenie wyjść sufiksów"""
+        kolejka = deque(self._przejscia[0].values())
+        while kolejka:
+            wezel = kolejka.popleft()
+            for znak, dziecko in self._przejscia[wezel].items():
+                kolejka.append(dziecko)
+                cofniecie = self._porazki[wezel]
+                while cofniecie and znak not in self._przejscia[cofniecie]:
+                    cofniecie = self._porazki[cofniecie]
+                cel = self._przejscia[cofniecie].get(znak, 0)
+                self._porazki[dziecko] = cel if cel != dziecko else 0
+                self._wyjscia[dziecko] = self._wyjscia[dziecko] + self._wyjscia[self._porazki[dziecko]]
+
+    def dopasuj(self, tekst: str) -> list:
+        """
+        Jedno przejście po tekście
+
+        Returns:
+            list: [(rodzaj, grupa, forma kanoniczna), ...] w kolejności wystąpienia
+        """
+        tekst = tekst.lower()
+        n = len(tekst)
+
+        # Koniec słowa dla każdej pozycji (jedno przejście od końca)
+        koniec_slowa = [0] * (n + 1)
+        koniec_slowa[n] = n
+        for i in range(n - 1, -1, -1):
+            koniec_slowa[i] = koniec_slowa[i + 1] if tekst[i].isalpha() else i
+
+        wyniki = []
+        wezel = 0
+        for i, znak in enumerate(tekst):
+            while wezel and znak not in self._przejscia[wezel]:
+                wezel = self._porazki[wezel]
+            wezel = self._przejscia[wezel].get(znak, 0)
+            for dlugosc, dokladny, etykiety in self._wyjscia[wezel]:
+                poczatek = i - dlugosc + 1
+                if poczatek > 0 and tekst[poczatek - 1].isalpha():
+                    continue
+                reszta = tekst[i + 1:koniec_slowa[i + 1]]
+                if reszta and (dokladny or reszta not in KONCOWKI):
+                    continue
+                wyniki.extend(etykiety)
+        return wyniki
+
+_automat = None
+_automat_lock = threading.Lock()
+
+def pobierz_automat() -> AutomatSlow:
+    """Automat budowany raz, przy pierwszym użyciu (korekta i RAG wołają go z różnych wątków)"""
+    global _automat
+    with _automat_lock:
+        if _automat is None:
+            _automat = AutomatSlow()
+        return _automat
+
+# === 3. Analiza wypowiedzi ===
+@lru_cache(maxsize=64)
+def analizuj(tekst: str) -> dict:
+    """
+    Wykrywanie kontekstu, słowa kluczowe RAG i składniki z jednego przejścia
+
+    Wynik jest zapamiętywany - detect_context_auto, extract_*_keywords
+    i wyciagnij_skladniki dla tej samej wypowiedzi nie skanują jej ponownie.
+    Nie modyfikować zwróconego słownika.
+
+    Returns:
+        dict: {"konteksty": {kontekst: liczba różnych słów},
+               "rag": {kontekst: (słowa,)}, "skladniki": (nazwy,)}
+    """
+    konteksty = {kontekst: set() for kontekst in KLUCZE_KONTEKSTOW}
+    rag = {kontekst: [] for kontekst in SLOWA_RAG}
+    skladniki = []
+    for rodzaj, grupa, kanon in pobierz_automat().dopasuj(tekst):
+        if rodzaj == "kontekst":
+            konteksty[grupa].add(kanon)
+        elif rodzaj == "rag" and kanon not in rag[grupa]:
+            rag[grupa].append(kanon)
+        elif rodzaj == "skladnik" and kanon not in skladniki:
+            skladniki.append(kanon)
+    return {
+        "konteksty": {kontekst: len(slowa) for kontekst, slowa in konteksty.items()},
+        "rag": {kontekst: tuple(slowa) for kontekst, slowa in rag.items()},
+        "skladniki": tuple(skladniki)
+    }
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    pobierz_automat()
+    for tekst in ["Mam pomidory, jajka i trochę cebuli", "przepis na omlet z pomidorami",
+                  "włącz światło w salonie", "sosna przy domu", "przelew stu złotych na konto",
+                  "spotkanie w poniedziałek o piętnastej", "pierś kurczaka z sosem sojowym"]:
+        start = time.perf_counter()
+        wynik = analizuj(tekst)
+        us = (time.perf_counter() - start) * 1e6
+        print(f"  '{tekst}' ({us:.0f} µs)")
+        print(f"    konteksty: {wynik['konteksty']}")
+        print(f"    rag: { {k: v for k, v in wynik['rag'].items() if v} }, składniki: {wynik['skladniki']}")
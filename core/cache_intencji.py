@@ -0,0 +1,156 @@
+# core/cache_intencji.py
+import os
+import re
+import json
+import time
+import hashlib
+import unicodedata
+from core.pamiec import DB_DIR, get_db_connection
+
+# === 1. Parametry ===
+DB_CACHE_INTENCJI = os.path.join(DB_DIR, "cache_intencji.db")
+TTL_S = 7 * 24 * 3600   # wpis ważny tydzień
+MAX_WPISOW = 5000       # powyżej - usuwane najdawniej używane (LRU)
+
+# Litery, których NFKD nie rozkłada na literę bazową + znak diakrytyczny
+_ZAMIANY = str.maketrans({"ł": "l", "Ł": "l", "ø": "o", "đ": "d", "ß": "ss"})
+_NIE_SLOWO = re.compile(r"[^\w\s]+")
+_BIALE = re.compile(r"\s+")
+
+# === 2. Normalizacja wypowiedzi ===
+def normalizuj_tekst(tekst: str) -> str:
+    """
+    "Która godzina?!" i "ktora  godzina" → "ktora godzina"
+
+    Małe litery, bez polskich znaków, bez interpunkcji, pojedyncze spacje.
+    """
+    tekst = tekst.lower().translate(_ZAMIANY)
+    tekst = unicodedata.normalize("NFKD", tekst)
+    tekst = "".join(znak for znak in tekst if not unicodedata.combining(znak))
+    tekst = _NIE_SLOWO.sub(" ", tekst).replace("_", " ")
+    return _BIALE.sub(" ", tekst).strip()
+
+_hash_cache = {"klucz": None, "hash": None}
+
+def hash_tablicy(komendy) -> str:
+    """Skrót tabeli komend - inna tabela (plik albo dodaj_komende) = inne klucze"""
+    klucz = (id(komendy), len(komendy))
+    if _hash_cache["klucz"] != klucz:
+        tresc = json.dumps(komendy, ensure_ascii=False, sort_keys=True)
+        _hash_cache["hash"] = hashlib.sha1(tresc.encode("utf-8")).hexdigest()[:16]
+        _hash_cache["klucz"] = klucz
+    return _hash_cache["hash"]
+
+# === 3. Cache w SQLite ===
+class CacheIntencji:
+    """
+    Trwały cache LRU+TTL: (znormalizowany tekst, hash tabeli, metoda) → intencja
+
+    intencja None jest też zapamiętywana - LLM rozstrzygnął "brak_dopasowania".
+    Przy starcie usuwane są wpisy wygasłe i z innych wersji tabeli komend.
+    """
+
+    def __init__(self, db_path: str = DB_CACHE_INTENCJI, ttl_s: float = TTL_S, max_wpisow: int = MAX_WPISOW):
+        self.db_path = db_path
+        self.ttl_s = ttl_s
+        self.max_wpisow = max_wpisow
+        self.trafienia = 0
+        self.chybienia = 0
+        self.zapisy = 0
+        self._hash_startowy = None
+
+        with get_db_connection(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_intencji (
+                    tekst TEXT NOT NULL,
+                    tablica TEXT NOT NULL,
+                    metoda TEXT NOT NULL,
+                    intencja TEXT,            -- NULL = brak dopasowania
+                    utworzono REAL NOT NULL,
+                    uzyto REAL NOT NULL,
+                    PRIMARY KEY (tekst, tablica, metoda)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_uzyto ON cache_intencji(uzyto)")
+            conn.commit()
+
+    def uniewaznij_inne_tablice(self, hash_aktualny: str):
+        """Usuwa wpisy policzone dla innej wersji komendy_domyslne.json"""
+        if self._hash_startowy == hash_aktualny:
+            return
+        self._hash_startowy = hash_aktualny
+        with get_db_connection(self.db_path) as conn:
+            usuniete = conn.execute(
+                "DELETE FROM cache_intencji WHERE tablica != ? OR utworzono < ?",
+                (hash_aktualny, time.time() - self.ttl_s)
+            ).rowcount
+            conn.commit()
+        if usuniete:
+            print(f"🧹 Cache intencji: usunięto {usuniete} nieaktualnych wpisów")
+
+    def pobierz(self, tekst: str, tablica: str, metoda: str):
+        """Zwraca (znaleziono, intencja)"""
+        teraz = time.time()
+        with get_db_connection(self.db_path) as conn:
+            wiersz = conn.execute(
+                "SELECT intencja, utworzono FROM cache_intencji WHERE tekst = ? AND tablica = ? AND metoda = ?",
+                (normalizuj_tekst(tekst), tablica, metoda)
+            ).fetchone()
+
+            if wiersz is None or teraz - wiersz["utworzono"] > self.ttl_s:
+                self.chybienia += 1
+                return False, None
+
+            conn.execute(
+                "UPDATE cache_intencji SET uzyto = ? WHERE tekst = ? AND tablica = ? AND metoda = ?",
+                (teraz, normalizuj_tekst(tekst), tablica, metoda)
+            )
+            conn.commit()
+
+        self.trafienia += 1
+        return True, wiersz["intencja"]
+
+    def zapisz(self, tekst: str, tablica: str, metoda: str, intencja):
+        teraz = time.time()
+        with get_db_connection(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_intencji (tekst, tablica, metoda, intencja, utworzono, uzyto) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalizuj_tekst(tekst), tablica, metoda, intencja, teraz, teraz)
+            )
+            # LRU: przytnij do max_wpisow, usuwając najdawniej używane
+            conn.execute("""
+                DELETE FROM cache_intencji WHERE rowid IN (
+                    SELECT rowid FROM cache_intencji ORDER BY uzyto DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_wpisow,))
+            conn.commit()
+        self.zapisy += 1
+
+    def statystyki(self) -> dict:
+        zapytania = self.trafienia + self.chybienia
+        return {
+            "trafienia": self.trafienia,
+            "chybienia": self.chybienia,
+            "zapisy": self.zapisy,
+            "trafialnosc": round(self.trafienia / zapytania, 3) if zapytania else 0.0
+        }
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    import tempfile
+
+    print("🧪 Test cache intencji")
+    for tekst in ["Która godzina?!", "  co mogę  zrobić z jajek ", "ŻÓŁĆ, łódź"]:
+        print(f"  '{tekst}' → '{normalizuj_tekst(tekst)}'")
+
+    with tempfile.TemporaryDirectory() as katalog:
+        cache = CacheIntencji(os.path.join(katalog, "test.db"), max_wpisow=2)
+        cache.uniewaznij_inne_tablice("abc")
+        print(f"  Pusty: {cache.pobierz('która godzina', 'abc', 'simple')}")
+        cache.zapisz("Która godzina?", "abc", "simple", "zapytanie_godzina")
+        cache.zapisz("opowiedz dowcip", "abc", "simple", None)
+        print(f"  Po zapisie: {cache.pobierz('ktora godzina', 'abc', 'simple')}")
+        print(f"  Brak dopasowania: {cache.pobierz('Opowiedz dowcip!', 'abc', 'simple')}")
+        print(f"  Inna tabela: {cache.pobierz('ktora godzina', 'xyz', 'simple')}")
+        print(f"📊 {cache.statystyki()}")
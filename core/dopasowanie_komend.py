@@ -0,0 +1,154 @@
+# core/dopasowanie_komend.py
+import re
+import time
+
+# Parser wyrażeń regularnych z biblioteki standardowej (do wyciągania literałów)
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+
+# === 1. Parametry ===
+FLAGI = re.IGNORECASE
+MIN_DL_KOTWICY = 3  # krótszy literał prawie nic nie odsiewa
+
+def _kotwica(wzorzec: str):
+    """
+    Najdłuższy ciąg literałów, który MUSI wystąpić w każdym dopasowaniu
+
+    Brane są tylko literały z najwyższego poziomu wzorca (poza grupami
+    i alternatywami), więc kotwica jest warunkiem koniecznym dopasowania.
+    None = brak pewnej kotwicy (wzorzec sprawdzany zawsze).
+    """
+    try:
+        elementy = sre_parse.parse(wzorzec, FLAGI)
+    except Exception:
+        return None
+
+    najlepsza, biezaca = "", []
+    for op, arg in elementy:
+        if op is sre_parse.LITERAL:
+            biezaca.append(chr(arg))
+            continue
+        kandydat = "".join(biezaca)
+        if len(kandydat) > len(najlepsza):
+            najlepsza = kandydat
+        biezaca = []
+    kandydat = "".join(biezaca)
+    if len(kandydat) > len(najlepsza):
+        najlepsza = kandydat
+
+    return najlepsza.lower() if len(najlepsza) >= MIN_DL_KOTWICY else None
+
+# === 2. Dopasowywacz skompilowany ===
+class DopasowywaczKomend:
+    """
+    Tabela komend (wzorzec → intencja) skompilowana raz
+
+    - wzorce są prekompilowane (bez odczytów z wewnętrznego cache modułu re,
+      który przy >512 wzorcach zaczyna je wyrzucać i kompilować od nowa)
+    - każdy wzorzec ma kotwicę - literał, bez którego nie może pasować;
+      tanie sprawdzenie `kotwica in tekst` odsiewa większość wzorców
+      zanim uruchomi się silnik regex
+    - kolejność tabeli = priorytet: zwracana jest pierwsza pasująca komenda,
+      dokładnie jak w pętli z re.search
+    """
+
+    def __init__(self, komendy):
+        self.wpisy = []     # (kotwica lub None, skompilowany wzorzec, intencja)
+        self.pominiete = 0
+
+        for komenda in komendy:
+            try:
+                wzorzec = komenda["wzorzec"]
+                intencja = komenda["intencja"]
+                wyrazenie = re.compile(wzorzec, FLAGI)
+            except (KeyError, re.error):
+                self.pominiete += 1
+                continue
+            self.wpisy.append((_kotwica(wzorzec), wyrazenie, intencja))
+
+        self.zakotwiczone = sum(1 for kotwica, _, _ in self.wpisy if kotwica)
+
+    def dopasuj(self, tekst):
+        """Zwraca intencję pierwszej pasującej komendy albo None"""
+        tekst_lower = tekst.lower()
+        for kotwica, wyrazenie, intencja in self.wpisy:
+            if kotwica is not None and kotwica not in tekst_lower:
+                continue
+            if wyrazenie.search(tekst):
+                return intencja
+        return None
+
+# === 3. Cache dla tabeli komend ===
+_cache = {"klucz": None, "dopasowywacz": None}
+
+def pobierz_dopasowywacz(komendy) -> DopasowywaczKomend:
+    """
+    Dopasowywacz dla listy komend - kompilowany raz, przebudowywany
+    gdy zmieni się lista (inna lista albo dopisana komenda)
+    """
+    klucz = (id(komendy), len(komendy))
+    if _cache["klucz"] != klucz:
+        _cache["dopasowywacz"] = DopasowywaczKomend(komendy)
+        _cache["klucz"] = klucz
+    return _cache["dopasowywacz"]
+
+def uniewaznij():
+    """Wymusza przebudowę przy następnym dopasowaniu (np. po edycji wzorca)"""
+    _cache["klucz"] = None
+
+# === Test lokalny / mikro-benchmark ===
+if __name__ == "__main__":
+    import json
+
+    with open("config/komendy_domyslne.json", encoding="utf-8") as f:
+        KOMENDY = json.load(f)
+
+    def petla_re_search(komendy, tekst):
+        """Dotychczasowa implementacja (IntentRecognizer._try_regex)"""
+        for komenda in komendy:
+            try:
+                if re.search(komenda["wzorzec"], tekst, re.IGNORECASE):
+                    return komenda["intencja"]
+            except (KeyError, re.error):
+                continue
+        return None
+
+    teksty = [
+        "która godzina?",                              # wczesna komenda
+        "przepis na omlet z pomidorami",                # późna komenda
+        "opowiedz mi coś ciekawego o kosmosie proszę"   # brak dopasowania → LLM
+    ]
+
+    print("🧪 Zgodność z pętlą re.search")
+    dopasowywacz = DopasowywaczKomend(KOMENDY)
+    print(f"  Komend: {len(dopasowywacz.wpisy)}, z kotwicą literałową: {dopasowywacz.zakotwiczone}")
+    for tekst in teksty:
+        print(f"  '{tekst}' → {dopasowywacz.dopasuj(tekst)} (pętla: {petla_re_search(KOMENDY, tekst)})")
+
+    print("\n⏱️ Mikro-benchmark: opóźnienie dopasowania vs rozmiar tabeli")
+    print(f"{'komend':>7} | {'tekst':<12} | {'pętla µs':>9} | {'skompil. µs':>11} | przyspieszenie")
+    for mnoznik in (1, 4, 16, 64):
+        # Kopie tabeli z unikalnym sufiksem - oryginał zostaje na końcu (najgorszy przypadek)
+        tabela = [
+            {"wzorzec": f"{k['wzorzec']}.*xq{n}", "intencja": f"{k['intencja']}_{n}"}
+            for n in range(mnoznik - 1) for k in KOMENDY
+        ] + KOMENDY
+        dopasowywacz = DopasowywaczKomend(tabela)
+        powtorzenia = max(20, 2000 // mnoznik)
+
+        for tekst, etykieta in zip(teksty, ("wczesna", "późna", "brak")):
+            assert dopasowywacz.dopasuj(tekst) == petla_re_search(tabela, tekst)
+
+            start = time.perf_counter()
+            for _ in range(powtorzenia):
+                petla_re_search(tabela, tekst)
+            petla_us = (time.perf_counter() - start) / powtorzenia * 1e6
+
+            start = time.perf_counter()
+            for _ in range(powtorzenia):
+                dopasowywacz.dopasuj(tekst)
+            skompilowany_us = (time.perf_counter() - start) / powtorzenia * 1e6
+
+            print(f"{len(tabela):>7} | {etykieta:<12} | {petla_us:>9.1f} | {skompilowany_us:>11.1f} | {petla_us / skompilowany_us:.1f}x")
@@ -0,0 +1,206 @@
+# core/http_klient.py
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# === 1. Parametry ===
+POOL_CONNECTIONS = 4     # ile hostów trzymać w puli
+POOL_MAXSIZE = 8         # ile równoległych połączeń na host (korekta STT + RAG + odpowiedź)
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3      # 0.3 s, 0.6 s, 1.2 s
+RETRY_STATUS = (429, 502, 503, 504)
+
+# Pomiar bieżącego zapytania - osobny dla każdego wątku
+_lokalne = threading.local()
+
+def _pomiar():
+    pomiar = getattr(_lokalne, "pomiar", None)
+    if pomiar is None:
+        pomiar = _lokalne.pomiar = {}
+    return pomiar
+
+# === 2. Połączenia mierzące fazy zapytania ===
+class _PomiarPolaczenia:
+    """
+    Domieszka do połączeń urllib3 zapisująca znaczniki czasu:
+    TCP connect, TLS, wysłanie zapytania i nadejście nagłówków odpowiedzi
+    """
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        pomiar = _pomiar()
+        pomiar["polaczenie_ms"] = (time.perf_counter() - start) * 1000
+        pomiar["nowe_polaczenie"] = True
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        pomiar = _pomiar()
+        # connect() = TCP (_new_conn) + ewentualnie uzgadnianie TLS
+        pomiar["tls_ms"] = max(0.0, (time.perf_counter() - start) * 1000 - pomiar.get("polaczenie_ms", 0.0))
+
+    def request(self, *args, **kwargs):
+        result = super().request(*args, **kwargs)
+        _pomiar()["wyslano"] = time.perf_counter()
+        return result
+
+    def getresponse(self, *args, **kwargs):
+        odpowiedz = super().getresponse(*args, **kwargs)
+        pomiar = _pomiar()
+        pomiar["naglowki"] = time.perf_counter()
+        if "wyslano" in pomiar:
+            pomiar["ttfb_ms"] = (pomiar["naglowki"] - pomiar["wyslano"]) * 1000
+        return odpowiedz
+
+class _PolaczenieHTTP(_PomiarPolaczenia, HTTPConnection):
+    pass
+
+class _PolaczenieHTTPS(_PomiarPolaczenia, HTTPSConnection):
+    pass
+
+class _PulaHTTP(HTTPConnectionPool):
+    ConnectionCls = _PolaczenieHTTP
+
+class _PulaHTTPS(HTTPSConnectionPool):
+    ConnectionCls = _PolaczenieHTTPS
+
+class _AdapterPomiarowy(HTTPAdapter):
+    """HTTPAdapter, którego pule tworzą połączenia z pomiarem faz"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _PulaHTTP, "https": _PulaHTTPS}
+
+# === 3. Sesja z pomiarem ===
+class SesjaHTTP(requests.Session):
+    """
+    Długo żyjąca sesja requests: pula połączeń keep-alive, ponowienia
+    z backoffem i pomiar czasu (connect / TLS / TTFB / body) każdego zapytania
+
+    HTTP/2 nie jest dostępne w requests/urllib3 - keep-alive HTTP/1.1
+    i tak usuwa z kolejnych zapytań koszt TCP + TLS.
+    """
+
+    def __init__(self, nazwa: str, pool_maxsize: int = POOL_MAXSIZE, retry_total: int = RETRY_TOTAL):
+        super().__init__()
+        self.nazwa = nazwa
+        self._statystyki = {}
+        self._lock = threading.Lock()
+
+        ponowienia = Retry(
+            total=retry_total,
+            connect=retry_total,
+            read=0,  # odpowiedź mogła już zostać policzona po stronie API
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False
+        )
+        adapter = _AdapterPomiarowy(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize,
+                                    max_retries=ponowienia)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        _lokalne.pomiar = {}
+        start = time.perf_counter()
+        try:
+            return super().request(method, url, *args, **kwargs)
+        finally:
+            koniec = time.perf_counter()
+            pomiar = _lokalne.pomiar
+            pomiar["calkowity_ms"] = (koniec - start) * 1000
+            if "naglowki" in pomiar:
+                # Przy stream=True ciało czyta wywołujący - tu będzie ~0
+                pomiar["body_ms"] = (koniec - pomiar["naglowki"]) * 1000
+            pomiar.setdefault("nowe_polaczenie", False)
+            self._zapisz_statystyki(url, pomiar)
+
+    def _zapisz_statystyki(self, url, pomiar):
+        host = requests.utils.urlparse(url).netloc
+        with self._lock:
+            s = self._statystyki.setdefault(host, {
+                "zapytania": 0, "nowe_polaczenia": 0, "suma_ms": {}, "pomiary": {}
+            })
+            s["zapytania"] += 1
+            s["nowe_polaczenia"] += int(pomiar["nowe_polaczenie"])
+            # Fazy liczone tylko z zapytań, w których wystąpiły - connect/TLS
+            # tylko przy nowym połączeniu, keep-alive nie zaniża ich średniej
+            for faza in ("polaczenie_ms", "tls_ms", "ttfb_ms", "body_ms", "calkowity_ms"):
+                if faza in pomiar:
+                    s["suma_ms"][faza] = s["suma_ms"].get(faza, 0.0) + pomiar[faza]
+                    s["pomiary"][faza] = s["pomiary"].get(faza, 0) + 1
+
+    def statystyki(self) -> dict:
+        """
+        Średnie czasy faz per host + ile zapytań otworzyło nowe połączenie
+
+        polaczenie_ms i tls_ms to średnie z nowych połączeń (nowe_polaczenia),
+        pozostałe fazy - z zapytań, w których zostały zmierzone.
+        """
+        with self._lock:
+            return {
+                host: {
+                    "zapytania": s["zapytania"],
+                    "nowe_polaczenia": s["nowe_polaczenia"],
+                    "srednio_ms": {faza: round(suma / s["pomiary"][faza], 1) for faza, suma in s["suma_ms"].items()}
+                }
+                for host, s in self._statystyki.items()
+            }
+
+def ostatni_pomiar() -> dict:
+    """
+    Fazy ostatniego zapytania z bieżącego wątku, np.
+    {"polaczenie_ms": 35.2, "tls_ms": 48.0, "ttfb_ms": 820.4, "body_ms": 3.1,
+     "calkowity_ms": 907.3, "nowe_polaczenie": True}
+    """
+    return {k: (round(v, 1) if isinstance(v, float) else v)
+            for k, v in getattr(_lokalne, "pomiar", {}).items()
+            if k not in ("wyslano", "naglowki")}
+
+def opis_pomiaru(pomiar: dict = None) -> str:
+    """Krótki opis faz do logów konsolowych"""
+    pomiar = pomiar if pomiar is not None else ostatni_pomiar()
+    if pomiar.get("nowe_polaczenie"):
+        czesci = [f"TCP {pomiar.get('polaczenie_ms', 0):.0f}ms", f"TLS {pomiar.get('tls_ms', 0):.0f}ms"]
+    else:
+        czesci = ["keep-alive"]
+    czesci += [f"TTFB {pomiar.get('ttfb_ms', 0):.0f}ms", f"body {pomiar.get('body_ms', 0):.0f}ms"]
+    return ", ".join(czesci)
+
+# === 4. Sesje współdzielone ===
+_sesje = {}
+_sesje_lock = threading.Lock()
+
+def pobierz_sesje(nazwa: str = "domyslna", **kwargs) -> SesjaHTTP:
+    """Zwraca długo żyjącą sesję o danej nazwie (np. "openrouter", "ollama")"""
+    with _sesje_lock:
+        if nazwa not in _sesje:
+            _sesje[nazwa] = SesjaHTTP(nazwa, **kwargs)
+        return _sesje[nazwa]
+
+def statystyki_http() -> dict:
+    return {nazwa: sesja.statystyki() for nazwa, sesja in _sesje.items()}
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    import sys
+
+    url = sys.argv[1] if len(sys.argv) > 1 else "https://openrouter.ai/api/v1/models"
+    print(f"🧪 Test puli połączeń: {url}")
+
+    sesja = pobierz_sesje("test")
+    for i in range(3):
+        try:
+            sesja.get(url, timeout=10)
+            print(f"  #{i + 1}: {opis_pomiaru()} (łącznie {ostatni_pomiar()['calkowity_ms']:.0f}ms)")
+        except requests.RequestException as e:
+            print(f"  #{i + 1}: ❌ {e}")
+
+    print(f"📊 {statystyki_http()}")
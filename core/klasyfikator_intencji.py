@@ -0,0 +1,117 @@
+# core/klasyfikator_intencji.py
+import time
+import numpy as np
+
+# Embeddings z LangChain (ten sam model co w core/rag/rag_engine.py) - opcjonalne
+try:
+    from langchain_huggingface import HuggingFaceEmbeddings
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+# === 1. Parametry ===
+MODEL_EMBEDDINGS = "all-MiniLM-L6-v2"
+BRAK_DOPASOWANIA = "brak_dopasowania"
+MIN_MARGINES = 0.05   # najlepszy centroid musi wyprzedzać drugi - inaczej decyduje LLM
+
+def utworz_embeddings():
+    """Nowy obiekt embeddings (gdy nie ma współdzielonego z RAG)"""
+    if not EMBEDDINGS_AVAILABLE:
+        return None
+    print(f"📥 Ładowanie modelu embeddings dla intencji: {MODEL_EMBEDDINGS}")
+    return HuggingFaceEmbeddings(model_name=MODEL_EMBEDDINGS, model_kwargs={'device': 'cpu'})
+
+def _normalizuj(wektory):
+    wektory = np.asarray(wektory, dtype=np.float32)
+    normy = np.linalg.norm(wektory, axis=-1, keepdims=True)
+    return wektory / np.maximum(normy, 1e-12)
+
+# === 2. Klasyfikator najbliższego centroidu ===
+class KlasyfikatorCentroidowy:
+    """
+    Lokalna klasyfikacja intencji bez zapytania do LLM
+
+    Frazy przykładowe każdej intencji są embedowane raz przy budowie;
+    intencję reprezentuje znormalizowany centroid. Tekst użytkownika
+    wymaga jednego embed_query i iloczynu skalarnego z macierzą centroidów.
+    Pewność = podobieństwo cosinusowe do najbliższego centroidu.
+    """
+
+    def __init__(self, przyklady: dict, embeddings):
+        self.embeddings = embeddings
+        self.intencje = [intencja for intencja, frazy in przyklady.items() if frazy]
+
+        start = time.perf_counter()
+        wszystkie_frazy = [fraza for intencja in self.intencje for fraza in przyklady[intencja]]
+        wektory = _normalizuj(embeddings.embed_documents(wszystkie_frazy))
+
+        centroidy, poczatek = [], 0
+        for intencja in self.intencje:
+            n = len(przyklady[intencja])
+            centroidy.append(wektory[poczatek:poczatek + n].mean(axis=0))
+            poczatek += n
+        self.centroidy = _normalizuj(centroidy)
+
+        self.klasyfikacje = 0
+        self.eskalacje = 0
+        self.czas_ms = []
+        print(f"✅ Klasyfikator intencji: {len(self.intencje)} centroidów z {len(wszystkie_frazy)} fraz "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def bez_centroidu(self, dozwolone) -> set:
+        """Intencje, których klasyfikator nie zna (brak fraz przykładowych)"""
+        return set(dozwolone) - set(self.intencje)
+
+    def klasyfikuj(self, tekst: str, dozwolone=None):
+        """
+        Zwraca (intencja, pewność, margines). intencja == BRAK_DOPASOWANIA
+        oznacza, że tekst najbardziej przypomina pytania ogólne (do czystego LLM).
+        Margines = przewaga nad drugim najlepszym centroidem.
+
+        Args:
+            dozwolone: opcjonalny zbiór intencji branych pod uwagę
+        """
+        start = time.perf_counter()
+        wektor = _normalizuj(self.embeddings.embed_query(tekst))
+        podobienstwa = self.centroidy @ wektor
+
+        if dozwolone is not None:
+            maska = np.array([i in dozwolone or i == BRAK_DOPASOWANIA for i in self.intencje])
+            podobienstwa = np.where(maska, podobienstwa, -np.inf)
+
+        najlepszy = int(np.argmax(podobienstwa))
+        drugi = np.partition(podobienstwa, -2)[-2] if len(podobienstwa) > 1 else -np.inf
+        margines = float(podobienstwa[najlepszy] - drugi) if np.isfinite(drugi) else 1.0
+        self.klasyfikacje += 1
+        self.czas_ms.append((time.perf_counter() - start) * 1000)
+        return self.intencje[najlepszy], float(podobienstwa[najlepszy]), margines
+
+    def zglos_eskalacje(self):
+        self.eskalacje += 1
+
+    def statystyki(self) -> dict:
+        return {
+            "intencje": len(self.intencje),
+            "klasyfikacje": self.klasyfikacje,
+            "eskalacje_do_llm": self.eskalacje,
+            "mediana_ms": round(float(np.median(self.czas_ms)), 2) if self.czas_ms else None
+        }
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    print("🧪 Test klasyfikatora centroidowego")
+
+    przyklady = {
+        "zapytanie_godzina": ["Która godzina?", "Powiedz mi godzinę", "Jaki mamy czas?"],
+        "pozegnanie": ["Do zobaczenia!", "Na razie", "Do widzenia"],
+        BRAK_DOPASOWANIA: ["Opowiedz dowcip", "Jak działa samolot?"]
+    }
+
+    embeddings = utworz_embeddings()
+    if embeddings is None:
+        print("⚠️ langchain_huggingface niedostępny - pomijam test")
+    else:
+        klasyfikator = KlasyfikatorCentroidowy(przyklady, embeddings)
+        for tekst in ["która jest teraz godzina", "no to cześć, do jutra", "dlaczego niebo jest niebieskie"]:
+            print(f"  '{tekst}' → {klasyfikator.klasyfikuj(tekst)}")
+        print(f"📊 {klasyfikator.statystyki()}")
@@ -0,0 +1,162 @@
+# core/konfiguracja.py
+import os
+import json
+import time
+import threading
+from types import MappingProxyType
+from dataclasses import dataclass
+
+# === 1. Ścieżki i parametry ===
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "config.json")
+SECURE_PATH = os.path.join(BASE_DIR, "config", "secure.json")
+
+SPRAWDZANIE_CO_S = 1.0  # jak często (najwyżej) sprawdzać mtime pliku
+
+# === 2. Zamrażanie / odmrażanie struktur ===
+def _zamroz(obiekt):
+    """dict → MappingProxyType, list → tuple (rekurencyjnie)"""
+    if isinstance(obiekt, dict):
+        return MappingProxyType({k: _zamroz(v) for k, v in obiekt.items()})
+    if isinstance(obiekt, (list, tuple)):
+        return tuple(_zamroz(v) for v in obiekt)
+    return obiekt
+
+def _odmroz(obiekt):
+    """Głęboka, modyfikowalna kopia zamrożonej struktury"""
+    if isinstance(obiekt, MappingProxyType):
+        return {k: _odmroz(v) for k, v in obiekt.items()}
+    if isinstance(obiekt, tuple):
+        return [_odmroz(v) for v in obiekt]
+    return obiekt
+
+_PUSTA_SEKCJA = MappingProxyType({})
+
+# === 3. Niezmienny snapshot ===
+@dataclass(frozen=True)
+class SnapshotKonfiguracji:
+    """Sparsowany plik JSON w danej wersji (tylko do odczytu)"""
+    dane: MappingProxyType
+    mtime: float
+    wersja: int
+
+    def sekcja(self, nazwa: str) -> MappingProxyType:
+        """Np. sekcja("llm_config") - pusta, jeśli jej brak"""
+        return self.dane.get(nazwa, _PUSTA_SEKCJA)
+
+    def get(self, klucz, domyslna=None):
+        return self.dane.get(klucz, domyslna)
+
+    def jako_dict(self) -> dict:
+        """Modyfikowalna kopia dla kodu, który zmienia config w trakcie tury"""
+        return _odmroz(self.dane)
+
+# === 4. Plik obserwowany przez polling mtime ===
+class ObserwowanyPlik:
+    """
+    Trzyma snapshot pliku JSON i przeładowuje go, gdy zmieni się mtime
+
+    Sprawdzenie mtime jest tanie (jeden stat), a i tak wykonywane najwyżej
+    raz na SPRAWDZANIE_CO_S - tury rozmowy nie czytają już pliku z dysku.
+    Niepoprawny JSON (np. w trakcie zapisu przez GUI) zostawia poprzedni
+    snapshot - kolejna próba przy następnym sprawdzeniu.
+    """
+
+    def __init__(self, sciezka: str, sprawdzanie_co_s: float = SPRAWDZANIE_CO_S):
+        self.sciezka = sciezka
+        self.sprawdzanie_co_s = sprawdzanie_co_s
+        self._snapshot = SnapshotKonfiguracji(_PUSTA_SEKCJA, -1.0, 0)
+        self._ostatnie_sprawdzenie = 0.0
+        self._obserwatorzy = []
+        self._lock = threading.Lock()
+
+    def pobierz(self) -> SnapshotKonfiguracji:
+        teraz = time.monotonic()
+        if teraz - self._ostatnie_sprawdzenie >= self.sprawdzanie_co_s:
+            with self._lock:
+                if teraz - self._ostatnie_sprawdzenie >= self.sprawdzanie_co_s:
+                    self._ostatnie_sprawdzenie = teraz
+                    self._przeladuj_jesli_zmieniony()
+        return self._snapshot
+
+    def _przeladuj_jesli_zmieniony(self):
+        try:
+            mtime = os.stat(self.sciezka).st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime is None:
+            if self._snapshot.mtime != -1.0:
+                print(f"⚠️ Brak pliku {self.sciezka} - używam pustej konfiguracji")
+                self._ustaw(SnapshotKonfiguracji(_PUSTA_SEKCJA, -1.0, self._snapshot.wersja + 1))
+            return
+
+        if mtime == self._snapshot.mtime:
+            return
+
+        try:
+            with open(self.sciezka, "r", encoding="utf-8") as f:
+                dane = json.load(f)
+            if not isinstance(dane, dict):
+                raise ValueError("plik nie ma formatu słownika (dict)")
+        except Exception as e:
+            print(f"⚠️ Nie udało się wczytać {os.path.basename(self.sciezka)}: {e} - zostaje poprzednia wersja")
+            return
+
+        poprzedni = self._snapshot
+        self._ustaw(SnapshotKonfiguracji(_zamroz(dane), mtime, poprzedni.wersja + 1))
+        if poprzedni.wersja > 0:
+            print(f"🔄 Przeładowano {os.path.basename(self.sciezka)} (wersja {self._snapshot.wersja})")
+
+    def _ustaw(self, snapshot):
+        self._snapshot = snapshot
+        for callback in list(self._obserwatorzy):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ Błąd obserwatora konfiguracji: {e}")
+
+    def obserwuj(self, callback):
+        """callback(snapshot) wywoływany po każdym przeładowaniu"""
+        self._obserwatorzy.append(callback)
+
+# === 5. Instancje współdzielone ===
+_config = ObserwowanyPlik(CONFIG_PATH)
+_sekrety = ObserwowanyPlik(SECURE_PATH)
+
+def pobierz() -> SnapshotKonfiguracji:
+    """Aktualny snapshot config/config.json"""
+    return _config.pobierz()
+
+def sekcja(nazwa: str) -> MappingProxyType:
+    return _config.pobierz().sekcja(nazwa)
+
+def jako_dict() -> dict:
+    """Modyfikowalna kopia aktualnej konfiguracji (np. config jednej tury)"""
+    return _config.pobierz().jako_dict()
+
+def sekret(klucz: str, domyslna=None):
+    """Wartość z config/secure.json (cache jak dla config.json)"""
+    return _sekrety.pobierz().get(klucz, domyslna)
+
+def obserwuj(callback):
+    """Rejestruje callback(snapshot) na zmiany config/config.json"""
+    _config.obserwuj(callback)
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    print("🧪 Test konfiguracji")
+
+    snapshot = pobierz()
+    print(f"Wersja {snapshot.wersja}, sekcje: {list(snapshot.dane.keys())}")
+    print(f"LLM: {dict(sekcja('llm_config'))}")
+
+    try:
+        snapshot.sekcja("llm_config")["model"] = "inny"
+    except TypeError:
+        print("✅ Snapshot jest tylko do odczytu")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        pobierz()
+    print(f"⏱️ pobierz(): {(time.perf_counter() - start) / 10000 * 1e6:.2f} µs/wywołanie")
@@ -0,0 +1,199 @@
+# core/korektor_lokalny.py
+import re
+import time
+import unicodedata
+from core.leksykon import slownik, znane, tokeny, KLUCZE_KONTEKSTOW, SLOWA_RAG, SKLADNIKI_PODSTAWOWE
+
+# === 1. Parametry ===
+MIN_DL_SLOWA = 4           # krótsze słowa tylko ze słownika pomyłek (za dużo sąsiadów)
+PROG_PEWNOSCI = 0.8        # poniżej - korekta idzie do LLM (bramka w core/stt_processor.py)
+
+PEWNOSC_POMYLKA = 1.0      # wpis słownika pomyłek
+PEWNOSC_DIAKRYTYKI = 0.95  # "ktora" → "która" (ten sam wyraz bez polskich znaków)
+# SymSpell tylko w słownictwie bieżącego kontekstu i tylko odległość 1 - w całym
+# leksykonie poprawna mowa spoza niego ("bilet", "mamy") ma zbyt wielu sąsiadów
+PEWNOSC_ODL_1 = 0.85       # jedyny kandydat kontekstu w odległości 1 - stosowany
+PEWNOSC_NIEJEDNOZNACZNA = 0.3
+PEWNOSC_NIEZNANE = 0.0     # słowo spoza leksykonu bez kandydata
+
+# Pomyłki STT znane z praktyki (te same, które prompt korekty podaje LLM jako przykłady)
+POMYLKI = {
+    "general": {
+        "ktora": "która", "godina": "godzina", "robic": "robić", "sie": "się",
+        "prosze": "proszę", "dziekuje": "dziękuję", "moge": "mogę", "czesc": "cześć"
+    },
+    "cooking": {
+        "pomidol": "pomidor", "pomidoly": "pomidory", "hamlet": "omlet", "pu": "pół",
+        "marchefka": "marchewka", "potrzebuje": "potrzebuję", "maslo": "masło",
+        "maka": "mąka", "jajecznice": "jajecznicę", "salatka": "sałatka"
+    },
+    "calendar": {
+        "poniedzialek": "poniedziałek", "sroda": "środa", "piatek": "piątek",
+        "pietnastej": "piętnastej", "dzis": "dziś"
+    },
+    "smart_home": {
+        "włancz": "włącz", "wlacz": "włącz", "wylacz": "wyłącz", "wyłancz": "wyłącz",
+        "swiatło": "światło", "swiatlo": "światło", "temp": "temperaturę"
+    },
+    "finance": {
+        "zlotych": "złotych", "sprawdz": "sprawdź", "zaplac": "zapłać", "oszczednosci": "oszczędności"
+    }
+}
+
+_SLOWO = re.compile(r"[^\W\d_]+")
+_ZAMIANY = str.maketrans({"ł": "l", "Ł": "L"})
+
+def bez_diakrytykow(slowo: str) -> str:
+    slowo = unicodedata.normalize("NFKD", slowo.translate(_ZAMIANY))
+    return "".join(znak for znak in slowo if not unicodedata.combining(znak))
+
+def odleglosc(a: str, b: str) -> int:
+    """Odległość Damerau-Levenshteina (wariant OSA - przestawienie sąsiednich liter = 1)"""
+    if a == b:
+        return 0
+    poprzedni2, poprzedni = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        biezacy = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            koszt = 0 if a[i - 1] == b[j - 1] else 1
+            biezacy[j] = min(poprzedni[j] + 1, biezacy[j - 1] + 1, poprzedni[j - 1] + koszt)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                biezacy[j] = min(biezacy[j], poprzedni2[j - 2] + 1)
+        poprzedni2, poprzedni = poprzedni, biezacy
+    return poprzedni[-1]
+
+def _usuniecia(slowo: str) -> set:
+    """Słowo i jego warianty z jedną usuniętą literą (SymSpell, odległość 1)"""
+    return {slowo[:i] + slowo[i + 1:] for i in range(len(slowo))} | {slowo}
+
+def slownictwo_kontekstu(kontekst: str) -> frozenset:
+    """Słowa, na które SymSpell może poprawić w danym kontekście"""
+    frazy = list(KLUCZE_KONTEKSTOW.get(kontekst, [])) + list(SLOWA_RAG.get(kontekst, []))
+    if kontekst == "cooking":
+        from core.automat_slow import _skladniki_z_bazy
+        frazy += SKLADNIKI_PODSTAWOWE + [nazwa for nazwa, _ in _skladniki_z_bazy()]
+    return frozenset(slowo for fraza in frazy for slowo in tokeny(fraza) if len(slowo) >= MIN_DL_SLOWA)
+
+# === 2. Indeks SymSpell ===
+class KorektorLokalny:
+    """
+    Deterministyczna korekta STT bez LLM
+
+    1. słownik pomyłek (kontekst + ogólny) - trafienie = pewna poprawka
+    2. przywracanie polskich znaków: "zlotych" → "złotych"
+    3. SymSpell w odległości 1, osobny indeks usunięć dla słownictwa
+       każdego kontekstu (słowa kluczowe, dla "cooking" także składniki);
+       jedyny kandydat jest stosowany, kilku - słowo zostaje niepewne
+
+    Słowo spoza leksykonu bez kandydata zostaje bez zmian z pewnością 0 -
+    popraw() zwraca najniższą pewność, a bramka wysyła niepewny tekst do LLM.
+    """
+
+    def __init__(self, slowa=None):
+        start = time.perf_counter()
+        self.slowa = frozenset(slowa if slowa is not None else slownik())
+        self.po_diakrytykach = {}
+        for slowo in self.slowa:
+            self.po_diakrytykach.setdefault(bez_diakrytykow(slowo), set()).add(slowo)
+        self.indeksy = {}  # kontekst → {wariant: {słowo}}, budowane przy pierwszym użyciu
+        print(f"✅ Korektor lokalny: {len(self.slowa)} słów "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def _indeks(self, kontekst: str) -> dict:
+        indeks = self.indeksy.get(kontekst)
+        if indeks is None:
+            indeks = {}
+            for slowo in slownictwo_kontekstu(kontekst):
+                for wariant in _usuniecia(slowo):
+                    indeks.setdefault(wariant, set()).add(slowo)
+            self.indeksy[kontekst] = indeks
+        return indeks
+
+    def _kandydaci(self, slowo: str, kontekst: str) -> set:
+        """Słowa kontekstu w odległości 1"""
+        indeks = self._indeks(kontekst)
+        kandydaci = set()
+        for wariant in _usuniecia(slowo):
+            kandydaci |= indeks.get(wariant, set())
+        return {k for k in kandydaci if odleglosc(slowo, k) == 1}
+
+    def popraw_slowo(self, slowo: str, kontekst: str = "general"):
+        """(poprawka albo None, pewność)"""
+        for nazwa in (kontekst, "general"):
+            if slowo in POMYLKI.get(nazwa, {}):
+                return POMYLKI[nazwa][slowo], PEWNOSC_POMYLKA
+
+        if znane(slowo):
+            return None, 1.0
+        if len(slowo) < MIN_DL_SLOWA:
+            return None, PEWNOSC_NIEZNANE
+
+        z_diakrytykami = self.po_diakrytykach.get(bez_diakrytykow(slowo), set()) - {slowo}
+        if len(z_diakrytykami) == 1:
+            return next(iter(z_diakrytykami)), PEWNOSC_DIAKRYTYKI
+
+        kandydaci = self._kandydaci(slowo, kontekst)
+        if not kandydaci:
+            return None, PEWNOSC_NIEZNANE
+        if len(kandydaci) > 1:
+            return sorted(kandydaci)[0], PEWNOSC_NIEJEDNOZNACZNA
+        return next(iter(kandydaci)), PEWNOSC_ODL_1
+
+    def popraw(self, tekst: str, kontekst: str = "general"):
+        """
+        Returns:
+            (str, float, list): (tekst z pewnymi poprawkami, pewność całości,
+                                 [(słowo, poprawka, pewność), ...])
+        """
+        zmiany = []
+        pewnosc = [1.0]
+
+        def _zamien(dopasowanie):
+            oryginal = dopasowanie.group(0)
+            poprawka, p = self.popraw_slowo(oryginal.lower(), kontekst)
+            pewnosc.append(p)
+            if poprawka is None or p < PROG_PEWNOSCI:
+                return oryginal
+            zmiany.append((oryginal, poprawka, p))
+            return poprawka.capitalize() if oryginal[0].isupper() else poprawka
+
+        poprawiony = _SLOWO.sub(_zamien, tekst)
+        return poprawiony, min(pewnosc), zmiany
+
+_korektor = None
+
+def pobierz_korektor() -> KorektorLokalny:
+    """Indeks budowany raz, przy pierwszej korekcie"""
+    global _korektor
+    if _korektor is None:
+        _korektor = KorektorLokalny()
+    return _korektor
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    korektor = pobierz_korektor()
+    przypadki = [
+        ("mam pomidol jajka", "cooking"),
+        ("przepis na hamlet", "cooking"),
+        ("pu cebuli i marchefka", "cooking"),
+        ("ktora godina", "general"),
+        ("włancz swiatło w salonie", "smart_home"),
+        ("transfer sto zlotych", "finance"),
+        ("spotkanie poniedzialek", "calendar"),
+        ("mam papryla i cebula", "cooking"),
+        ("włącz klimatyzacje", "smart_home"),
+        ("przepis na jajecznicę z pomidorami", "cooking"),
+        ("opowiedz o kwantowej grawitacji", "general"),
+        # poprawna mowa spoza leksykonu - bez zmian
+        ("kup bilet", "general"),
+        ("ile mamy czasu", "general"),
+        ("zadzwoń do mamy", "general"),
+        ("włącz lampy", "smart_home"),
+        ("pokaż mapa", "general"),
+    ]
+    for tekst, kontekst in przypadki:
+        start = time.perf_counter()
+        poprawiony, pewnosc, zmiany = korektor.popraw(tekst, kontekst)
+        us = (time.perf_counter() - start) * 1e6
+        werdykt = "pewne" if pewnosc >= PROG_PEWNOSCI else "niepewne słowa - decyduje bramka"
+        print(f"  [{kontekst}] '{tekst}' → '{poprawiony}' (pewność {pewnosc:.2f}, {us:.0f} µs, {werdykt})")
@@ -0,0 +1,206 @@
+# core/leksykon.py
+import os
+import re
+import json
+from core.pamiec import BASE_DIR
+
+# === 1. Listy słów (jedno miejsce dla wykrywania kontekstu, RAG i bramki korekty STT) ===
+
+# Słowa kluczowe kontekstów - detect_context_auto (przez core/automat_slow.py)
+KLUCZE_KONTEKSTOW = {
+    "cooking": [
+        "przepis", "gotować", "ugotować", "smażyć", "piec", "upiec",
+        "składniki", "jajka", "pomidor", "cebula", "masło", "mąka",
+        "kalorie", "omlet", "zupa", "sałatka", "mam", "potrzebuję"
+    ],
+    "calendar": [
+        "spotkanie", "termin", "godzina", "dzisiaj", "jutro", "wczoraj",
+        "poniedziałek", "wtorek", "środa", "czwartek", "piątek", "sobota", "niedziela",
+        "stycznia", "lutego", "marca", "kwietnia", "maja", "czerwca"
+    ],
+    "smart_home": [
+        "włącz", "wyłącz", "ustaw", "temperatura", "światło", "muzyka",
+        "głośność", "klimatyzacja", "ogrzewanie", "rolety", "alarm"
+    ],
+    "finance": [
+        "przelew", "saldo", "konto", "bank", "złotych", "euro", "dolar",
+        "zapłać", "rachunek", "faktury", "kredyt", "oszczędności"
+    ]
+}
+
+# Słowa kluczowe zapytań RAG - extract_*_keywords (universal assistant, przez core/automat_slow.py)
+SLOWA_RAG = {
+    "cooking": [
+        'jajko', 'jajka', 'pomidor', 'pomidory', 'cebula', 'czosnek',
+        'masło', 'olej', 'mąka', 'cukier', 'sól', 'pieprz', 'marchew',
+        'omlet', 'jajecznica', 'zupa', 'kotlet', 'sałatka',
+        'ugotować', 'smażyć', 'przepis', 'składniki'
+    ],
+    "smart_home": [
+        'światło', 'lampa', 'klimatyzacja', 'telewizor', 'muzyka', 'alarm',
+        'salon', 'kuchnia', 'sypialnia', 'łazienka', 'biuro',
+        'włącz', 'wyłącz', 'ustaw', 'zmień', 'kontroluj'
+    ],
+    "calendar": [
+        'spotkanie', 'termin', 'dzisiaj', 'jutro', 'wczoraj', 'godzina',
+        'poniedziałek', 'wtorek', 'środa', 'czwartek', 'piątek', 'sobota', 'niedziela',
+        'dodaj', 'usuń', 'przenieś', 'sprawdź', 'przypomnij'
+    ],
+    "finance": [
+        'saldo', 'przelew', 'konto', 'pieniądze', 'złotych', 'euro',
+        'sprawdź', 'wyślij', 'zapłać', 'transfer', 'historia'
+    ]
+}
+
+# Podstawowe nazwy składników (wyciagnij_skladniki) - także krótkie formy, których
+# baza składników nie ma jako nazwy ani synonimu ("mleko", "sos", "chleb")
+SKLADNIKI_PODSTAWOWE = [
+    "awokado", "banan", "brokuły", "cebula", "chleb", "cukinia", "cytryna",
+    "czosnek", "imbir", "jajka", "jarmuż", "kapary", "kasza", "koperek",
+    "kurczak", "marchewka", "mleko", "ocet", "ogórek", "oliwa", "papryka",
+    "pieprz", "pomidor", "soczewica", "sos", "szpinak", "słonecznik", "tofu", "łosoś"
+]
+
+# Najczęstsze słowa polszczyzny mówionej (zaimki, spójniki, przyimki,
+# czasowniki posiłkowe, pytania, liczebniki) - rdzeń słownika OOV
+SLOWA_CZESTE = """
+a aby albo ale ani bardzo bez bo by być był była było były będzie będę chcę chcesz chce
+ci cię co coś czy czego czym dla do dobra dobrze dobry dzień dziękuję dzięki gdzie go
+i ich ile im ja jak jaka jaki jakie jako je jego jej jest jestem jesteś już
+ją kiedy kto która które który ma mam masz mają mi mnie mogę może można mój moja moje
+mu my na nad nam nas nie nic niż no o od on ona one oni ono po pod potem powiedz
+pokaż proszę przed przez przy raz są się siebie sobie jeszcze tak także tam te ten
+teraz też to tu tutaj ty u w we więc wszystko wy z za ze że żeby
+jeden dwa trzy cztery pięć sześć siedem osiem dziewięć dziesięć sto tysiąc pół
+dzisiaj jutro wczoraj rano wieczorem godzina godzinę minut minuty czas data
+cześć hej witaj siema dzień dobry do widzenia zobaczenia miłego dnia
+zrobić zrób robić ugotuj przygotuj zapisz odczytaj dodaj usuń sprawdź włącz wyłącz
+ustaw podaj opowiedz wyjaśnij znajdź szukaj pomóż pomoc potrzebuję chciałbym chciałabym
+który ile jaką jakiego czemu dlaczego skąd dokąd
+stefan aia system asystent wiadomość wiadomości notatka notatkę kalorie kalorii
+przepis przepisy przepisu danie dania obiad śniadanie kolacja
+""".split()
+
+# Słownictwo ogólne (pogoda, miasta, rozmowa) - zwykłe pytania do LLM
+# nie powinny wyglądać na błędy rozpoznawania
+SLOWA_OGOLNE = """
+pogoda pogodę pogody pogodzie deszcz deszczu pada padać śnieg śniegu słońce słonecznie
+pochmurno wiatr wieje burza mróz temperatura temperaturę stopni stopnie ciepło zimno gorąco
+prognoza prognozę weekend tydzień tygodniu miesiąc roku rok wiosna lato jesień zima
+polska polsce warszawa warszawie kraków krakowie gdańsk gdańsku wrocław wrocławiu
+poznań poznaniu łódź łodzi katowice katowicach lublin lublinie szczecin szczecinie
+miasto mieście dom domu praca pracy szkoła szkole sklep sklepu sklepie ulica ulicy
+dowcip dowcipy żart żarty kawał kawały zagadka zagadkę historia historię ciekawostka ciekawostkę
+pytanie pytania odpowiedź świat świecie ludzie człowiek dzieci dziecko rodzina przyjaciel
+muzyka muzyki piosenka piosenkę film filmy książka książkę gra gry mecz meczu sport wynik wyniki
+zdrowie lekarz lekarza samochód auto pociąg autobus samolot droga drogi pieniądze cena ceny
+woda wody kawa kawę herbata herbatę piwo wino jedzenie jeść pić głodny
+wiem wiesz wie znasz zna myślę myślisz sądzisz lubię lubisz lubi kocham chcemy możesz
+mów mówić powiedzieć powiedział słucham słyszysz rozumiem rozumiesz pamiętasz zapamiętaj
+działa działasz idzie pójść jechać jadę iść mieszkam mieszkasz nazywasz nazywam imię
+dobre dobra dobry zły złe duży duża mały mała nowy nowa stary stara ciekawy ciekawe
+fajny fajne ładny ładna najlepszy najlepsze szybko wolno dużo mało trochę więcej mniej
+wszystkie każdy inny inne ten tamten taki taka takie sam sama tylko nawet bardziej
+jutrzejsza dzisiejsza dzisiejszy jutrzejszy wieczór noc nocy ranek popołudnie
+tak nie dobrze okej ok dziękuję dzięki przepraszam proszę
+""".split()
+
+# === 2. Słownik (lista powyżej + baza składników + przepisy) ===
+SKLADNIKI_JSON = os.path.join(BASE_DIR, "data", "recipes", "skladniki_baza.json")
+PRZEPISY_JSON = os.path.join(BASE_DIR, "data", "recipes", "recipes_100.json")
+MIN_DL_RDZENIA = 4   # krótszy rdzeń nie wystarcza do uznania odmiany
+
+# Końcówki fleksyjne dopuszczalne po rdzeniu: "pomidor|ami", "cebul|ę", "jajk|a",
+# "składnik|ów", "włącz|yć", przymiotniki "pomidor|owy" - a "kont|akt" już nie
+# jest odmianą "konto"
+KONCOWKI = frozenset("""
+a ą e ę i o ó u y
+em iem om ów ach ami ie ia io iu ią ię ich im imi ym ymi ej ego emu owi
+yć ić ać eć
+owy owa owe owej owego owym owych owymi
+""".split()) | {""}
+
+_SLOWO = re.compile(r"[^\W\d_]+")
+
+def tokeny(tekst: str) -> list:
+    """Słowa (same litery, małe) - bez liczb i interpunkcji"""
+    return _SLOWO.findall(tekst.lower())
+
+def _slowa_z_plikow() -> set:
+    slowa = set()
+    try:
+        with open(SKLADNIKI_JSON, encoding="utf-8") as f:
+            for skladnik in json.load(f).get("skladniki", []):
+                slowa.update(tokeny(skladnik.get("nazwa", "")))
+                for synonim in skladnik.get("synonimy", []):
+                    slowa.update(tokeny(synonim))
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Leksykon: brak bazy składników ({e})")
+    try:
+        with open(PRZEPISY_JSON, encoding="utf-8") as f:
+            for przepis in json.load(f):
+                slowa.update(tokeny(przepis.get("title", "")))
+                slowa.update(tokeny(przepis.get("ingredients", "")))
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Leksykon: brak bazy przepisów ({e})")
+    return slowa
+
+_slownik = None
+
+def slownik() -> frozenset:
+    """Znane słowa (budowany raz, przy pierwszym użyciu)"""
+    global _slownik
+    if _slownik is None:
+        slowa = set(SLOWA_CZESTE) | set(SLOWA_OGOLNE)
+        for lista in list(KLUCZE_KONTEKSTOW.values()) + list(SLOWA_RAG.values()):
+            for fraza in lista:
+                slowa.update(tokeny(fraza))
+        slowa |= _slowa_z_plikow()
+        _slownik = frozenset(slowa)
+    return _slownik
+
+_rdzenie = None
+
+def _znane_rdzenie() -> frozenset:
+    """Rdzenie słów słownika: słowo bez końcówki fleksyjnej ("cebula" → "cebul", "cebula")"""
+    global _rdzenie
+    if _rdzenie is None:
+        _rdzenie = frozenset(
+            slowo[:dl] for slowo in slownik()
+            for dl in range(MIN_DL_RDZENIA, len(slowo) + 1) if slowo[dl:] in KONCOWKI
+        )
+    return _rdzenie
+
+def znane(slowo: str) -> bool:
+    """
+    Słowo ze słownika albo jego odmiana: rdzeń słowa ze słownika + końcówka
+    fleksyjna ("cebul|i", "pomidor|ami"). Błąd w końcówce nie przechodzi -
+    "pomidolu" i "marchefki" są nieznane
+    """
+    if slowo in slownik():
+        return True
+    rdzenie = _znane_rdzenie()
+    return any(slowo[:dl] in rdzenie and slowo[dl:] in KONCOWKI
+               for dl in range(MIN_DL_RDZENIA, len(slowo)))
+
+def wskaznik_oov(tekst: str):
+    """
+    Odsetek słów spoza słownika
+
+    Returns:
+        (float, list): (oov / wszystkie słowa, lista nieznanych słów)
+    """
+    slowa = tokeny(tekst)
+    if not slowa:
+        return 0.0, []
+    nieznane = [slowo for slowo in slowa if not znane(slowo)]
+    return len(nieznane) / len(slowa), nieznane
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    print(f"🧪 Leksykon: {len(slownik())} słów, {len(_znane_rdzenie())} rdzeni")
+    for tekst in ["która godzina", "ktora godina", "przepis na omlet z pomidorami",
+                  "przepis na hamlet", "włącz światło w salonie", "pu cebuli i marchefka",
+                  "mam pomidolu", "mam marchefki i jajka", "jaka jest pogoda w krakowie"]:
+        oov, nieznane = wskaznik_oov(tekst)
+        print(f"  '{tekst}' → OOV {oov:.2f} {nieznane}")
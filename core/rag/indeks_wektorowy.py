@@ -0,0 +1,307 @@
+# core/rag/indeks_wektorowy.py
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from core.pamiec import BASE_DIR
+
+# FAISS - opcjonalny (bez niego działa SimpleRAGEngine)
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# === 1. Parametry ===
+KATALOG_INDEKSU = os.path.join(BASE_DIR, "data", "rag_index")
+PLIK_INDEKSU = "przepisy.faiss"
+PLIK_MANIFESTU = "manifest.json"
+MODEL_EMBEDDINGS = "all-MiniLM-L6-v2"   # ten sam co core/klasyfikator_intencji.py
+WERSJA_MANIFESTU = 1
+POJEMNOSC_CACHE_ZAPYTAN = 256           # wektorów zapytań w pamięci (256 × 384 × 4 B ≈ 0.4 MB)
+
+def tekst_dokumentu(recipe: dict) -> str:
+    """Tekst przepisu, który jest embedowany"""
+    return (f"Przepis: {recipe['title']}. "
+            f"Składniki: {recipe['ingredients']}. "
+            f"Kategoria: {recipe['category']}.")
+
+def hash_przepisu(recipe: dict) -> str:
+    """Adres treści: zmiana tytułu, składników albo kategorii = nowy wektor"""
+    return hashlib.sha1(tekst_dokumentu(recipe).encode("utf-8")).hexdigest()
+
+def _normalizuj(wektory):
+    """Wektory jednostkowe - iloczyn skalarny = podobieństwo cosinusowe"""
+    wektory = np.ascontiguousarray(wektory, dtype=np.float32)
+    normy = np.linalg.norm(wektory, axis=-1, keepdims=True)
+    return wektory / np.maximum(normy, 1e-12)
+
+# === 2. Indeks na dysku ===
+class IndeksWektorowy:
+    """
+    Indeks FAISS przepisów zapisany na dysku + manifest z hashami treści
+
+    - przepisy.faiss: IndexFlatIP ze znormalizowanymi embeddingami,
+      wiersz i = przepis i z pliku przepisów
+    - manifest.json: model, wymiar i hash treści każdego wiersza
+
+    Przy starcie indeks jest mapowany z dysku (bez embedowania korpusu),
+    o ile manifest zgadza się z aktualnymi przepisami. Przebudowa embeduje
+    tylko przepisy nowe albo zmienione - wektory reszty są przepisywane
+    ze starego indeksu po hashu.
+    """
+
+    def __init__(self, katalog: str = KATALOG_INDEKSU, model: str = MODEL_EMBEDDINGS):
+        self.katalog = katalog
+        self.model = model
+        self.indeks = None
+        self.manifest = None
+        self._filtry = {}   # kategoria → (numery wierszy, IDSelectorBatch)
+
+    @property
+    def sciezka_indeksu(self):
+        return os.path.join(self.katalog, PLIK_INDEKSU)
+
+    @property
+    def sciezka_manifestu(self):
+        return os.path.join(self.katalog, PLIK_MANIFESTU)
+
+    def _wczytaj_manifest(self):
+        try:
+            with open(self.sciezka_manifestu, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("wersja") != WERSJA_MANIFESTU or manifest.get("model") != self.model:
+            return None
+        return manifest
+
+    def _czytaj_faiss(self):
+        """Mapowanie pliku zamiast wczytania (starsze FAISS: zwykły odczyt)"""
+        try:
+            return faiss.read_index(self.sciezka_indeksu, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except (RuntimeError, AttributeError):
+            return faiss.read_index(self.sciezka_indeksu)
+
+    def wczytaj(self, recipes: list) -> bool:
+        """
+        Indeks z dysku, jeśli jest aktualny dla podanych przepisów
+
+        Returns:
+            bool: False = brak indeksu albo przepisy się zmieniły (potrzebna przebudowa)
+        """
+        start = time.perf_counter()
+        manifest = self._wczytaj_manifest()
+        if manifest is None or manifest.get("wiersze") != [hash_przepisu(r) for r in recipes]:
+            return False
+        try:
+            indeks = self._czytaj_faiss()
+        except Exception as e:
+            print(f"⚠️ Uszkodzony indeks wektorowy ({e})")
+            return False
+        if indeks.ntotal != len(recipes):
+            return False
+
+        self.indeks, self.manifest = indeks, manifest
+        self._zbuduj_filtry(recipes)
+        print(f"✅ Indeks wektorowy z dysku: {indeks.ntotal} przepisów "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return True
+
+    def zbuduj(self, recipes: list, embeddings, pelna: bool = False) -> dict:
+        """
+        Przebudowa przyrostowa: embedowane są tylko nowe/zmienione przepisy
+
+        Args:
+            pelna: ignoruj stary indeks i embeduj wszystko
+
+        Returns:
+            dict: {"przepisy": n, "embedowane": n, "z_indeksu": n}
+        """
+        start = time.perf_counter()
+        hashe = [hash_przepisu(r) for r in recipes]
+
+        # Wektory z poprzedniego indeksu, po hashu treści
+        stare = {}
+        manifest = None if pelna else self._wczytaj_manifest()
+        if manifest is not None and os.path.exists(self.sciezka_indeksu):
+            try:
+                stary_indeks = faiss.read_index(self.sciezka_indeksu)
+                wektory = stary_indeks.reconstruct_n(0, stary_indeks.ntotal)
+                stare = dict(zip(manifest["wiersze"], wektory))
+            except Exception as e:
+                print(f"⚠️ Stary indeks nieczytelny - pełna przebudowa ({e})")
+
+        do_embedowania = [i for i, h in enumerate(hashe) if h not in stare]
+        nowe = {}
+        if do_embedowania:
+            teksty = [tekst_dokumentu(recipes[i]) for i in do_embedowania]
+            for i, wektor in zip(do_embedowania, _normalizuj(embeddings.embed_documents(teksty))):
+                nowe[hashe[i]] = wektor
+
+        wymiar = len(next(iter(nowe.values())) if nowe else next(iter(stare.values())))
+        macierz = np.empty((len(recipes), wymiar), dtype=np.float32)
+        for i, h in enumerate(hashe):
+            macierz[i] = nowe[h] if h in nowe else stare[h]
+
+        indeks = faiss.IndexFlatIP(wymiar)
+        indeks.add(macierz)
+
+        # Zapis atomowy: najpierw indeks, potem manifest (manifest = znacznik gotowości)
+        os.makedirs(self.katalog, exist_ok=True)
+        tymczasowy = f"{self.sciezka_indeksu}.tmp"
+        faiss.write_index(indeks, tymczasowy)
+        os.replace(tymczasowy, self.sciezka_indeksu)
+        manifest = {
+            "wersja": WERSJA_MANIFESTU,
+            "model": self.model,
+            "wymiar": wymiar,
+            "zbudowano": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "wiersze": hashe
+        }
+        tymczasowy = f"{self.sciezka_manifestu}.tmp"
+        with open(tymczasowy, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tymczasowy, self.sciezka_manifestu)
+
+        self.indeks, self.manifest = indeks, manifest
+        self._zbuduj_filtry(recipes)
+        wynik = {"przepisy": len(recipes), "embedowane": len(do_embedowania),
+                 "z_indeksu": len(recipes) - len(do_embedowania)}
+        print(f"✅ Indeks wektorowy zbudowany: {wynik} ({time.perf_counter() - start:.1f}s)")
+        return wynik
+
+    def _zbuduj_filtry(self, recipes):
+        """Selektor wierszy każdej kategorii - szukanie od razu w podzbiorze"""
+        wiersze = {}
+        for numer, recipe in enumerate(recipes):
+            wiersze.setdefault(recipe.get("category"), []).append(numer)
+        self._filtry = {}
+        for kategoria, numery in wiersze.items():
+            numery = np.asarray(numery, dtype=np.int64)
+            # Tablica numerów musi żyć razem z selektorem (FAISS jej nie kopiuje)
+            self._filtry[kategoria] = (numery, faiss.IDSelectorBatch(numery))
+
+    def szukaj(self, wektor, k: int, kategoria: str = None):
+        """
+        k najbliższych (w kategorii, jeśli podana) - bez pobierania nadmiaru
+
+        Returns:
+            list: [(numer przepisu, podobieństwo cosinusowe), ...] malejąco
+        """
+        if self.indeks is None or self.indeks.ntotal == 0:
+            return []
+        zapytanie = _normalizuj(np.asarray(wektor, dtype=np.float32).reshape(1, -1))
+        if kategoria:
+            if kategoria not in self._filtry:
+                return []
+            numery, selektor = self._filtry[kategoria]
+            podobienstwa, wyniki = self.indeks.search(zapytanie, min(k, len(numery)),
+                                                      params=faiss.SearchParameters(sel=selektor))
+        else:
+            podobienstwa, wyniki = self.indeks.search(zapytanie, min(k, self.indeks.ntotal))
+        return [(int(n), float(p)) for n, p in zip(wyniki[0], podobienstwa[0]) if n >= 0]
+
+    def podobienstwo(self, wektor, numer: int) -> float:
+        """Cosinus zapytania z jednym przepisem (spoza wyników szukaj)"""
+        zapytanie = _normalizuj(np.asarray(wektor, dtype=np.float32).ravel())
+        return float(np.dot(self.indeks.reconstruct(int(numer)), zapytanie))
+
+# === 3. Cache embeddingów zapytań ===
+def klucz_zapytania(skladniki, kategoria=None) -> tuple:
+    """Postać kanoniczna: małe litery, bez powtórzeń, posortowane + kategoria"""
+    kanon = sorted({" ".join(s.lower().split()) for s in skladniki} - {""})
+    return tuple(kanon), kategoria or ""
+
+def tekst_zapytania(klucz: tuple) -> str:
+    """Tekst embedowany dla klucza - ten sam klucz = ten sam tekst = ten sam wektor"""
+    skladniki, kategoria = klucz
+    query = f"Składniki: {', '.join(skladniki)}"
+    if kategoria:
+        query += f" kategoria: {kategoria}"
+    return query
+
+class CacheZapytan:
+    """
+    LRU wektorów zapytań w jednej prealokowanej macierzy float32
+
+    Klucz → numer wiersza macierzy (OrderedDict jako LRU). Wyrzucony klucz
+    oddaje swój wiersz następnemu, więc po rozgrzaniu nie ma żadnych
+    alokacji. Macierz powstaje przy pierwszym zapisie (wtedy znany jest wymiar).
+    """
+
+    def __init__(self, pojemnosc: int = POJEMNOSC_CACHE_ZAPYTAN):
+        self.pojemnosc = pojemnosc
+        self._macierz = None
+        self._wiersze = OrderedDict()   # klucz → wiersz macierzy
+        self._lock = threading.Lock()
+        self.trafienia = 0
+        self.chybienia = 0
+
+    def pobierz(self, klucz):
+        """Kopia wektora albo None (wiersz może zostać nadpisany po wyrzuceniu klucza)"""
+        with self._lock:
+            wiersz = self._wiersze.get(klucz)
+            if wiersz is None:
+                self.chybienia += 1
+                return None
+            self._wiersze.move_to_end(klucz)
+            self.trafienia += 1
+            return self._macierz[wiersz].copy()
+
+    def zapisz(self, klucz, wektor):
+        wektor = np.asarray(wektor, dtype=np.float32).ravel()
+        with self._lock:
+            if self._macierz is None:
+                self._macierz = np.zeros((self.pojemnosc, wektor.size), dtype=np.float32)
+            if klucz in self._wiersze:
+                wiersz = self._wiersze[klucz]
+                self._wiersze.move_to_end(klucz)
+            elif len(self._wiersze) < self.pojemnosc:
+                wiersz = len(self._wiersze)
+                self._wiersze[klucz] = wiersz
+            else:
+                _, wiersz = self._wiersze.popitem(last=False)
+                self._wiersze[klucz] = wiersz
+            self._macierz[wiersz] = wektor
+
+    def statystyki(self) -> dict:
+        zapytania = self.trafienia + self.chybienia
+        return {
+            "trafienia": self.trafienia,
+            "chybienia": self.chybienia,
+            "trafialnosc": round(self.trafienia / zapytania, 3) if zapytania else 0.0,
+            "zapisane": len(self._wiersze)
+        }
+
+# === Budowa offline (CLI) ===
+# python -m core.rag.indeks_wektorowy [--pelna]
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(__file__))
+    from recipe_loader import RecipeLoader
+
+    if not FAISS_AVAILABLE:
+        print("❌ Brak FAISS (pip install faiss-cpu)")
+        sys.exit(1)
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+    except ImportError:
+        print("❌ Brak langchain_huggingface")
+        sys.exit(1)
+
+    recipes = RecipeLoader(os.path.join(BASE_DIR, "data", "recipes")).load_recipes()
+    if not recipes:
+        sys.exit(1)
+
+    indeks = IndeksWektorowy()
+    if "--pelna" not in sys.argv and indeks.wczytaj(recipes):
+        print("✅ Indeks aktualny - nic do zrobienia")
+        sys.exit(0)
+
+    print(f"📥 Ładowanie modelu embeddings: {MODEL_EMBEDDINGS}")
+    embeddings = HuggingFaceEmbeddings(model_name=MODEL_EMBEDDINGS, model_kwargs={'device': 'cpu'})
+    indeks.zbuduj(recipes, embeddings, pelna="--pelna" in sys.argv)
@@ -1,75 +1,173 @@
 # core/rag/rag_engine.py
 import sys
 import os
+import time
+import heapq
 sys.path.append(os.path.dirname(__file__))
 from typing import List, Dict, Any, Optional
 from recipe_loader import RecipeLoader
+from core.leksykon import tokeny
+from core.automat_slow import rdzen, KONCOWKI, MIN_DL_RDZENIA
+
+WAGA_WEKTORA = 0.6   # ranking hybrydowy: cosinus vs dokładne pokrycie składników
 
 # Sprawdź dostępność LangChain
 try:
-    from langchain.schema import Document
-    from langchain.text_splitter import RecursiveCharacterTextSplitter
-    from langchain_community.vectorstores import FAISS
     from langchain_huggingface import HuggingFaceEmbeddings
-    LANGCHAIN_AVAILABLE = True
+    from indeks_wektorowy import (IndeksWektorowy, CacheZapytan, klucz_zapytania, tekst_zapytania,
+                                  MODEL_EMBEDDINGS, FAISS_AVAILABLE)
+    LANGCHAIN_AVAILABLE = FAISS_AVAILABLE
+    if not FAISS_AVAILABLE:
+        print("⚠️ FAISS nie jest zainstalowany. Używam prostego wyszukiwania.")
 except ImportError:
     print("⚠️ LangChain nie jest zainstalowany. Używam prostego wyszukiwania.")
     LANGCHAIN_AVAILABLE = False
 
 class SimpleRAGEngine:
-    """Prosty silnik RAG bez LangChain (fallback)"""
+    """
+    Prosty silnik RAG bez LangChain (fallback)
+
+    Indeks budowany raz w initialize():
+    - składniki każdego przepisu sparsowane i sprowadzone do rdzeni słów
+      ("pomidory" → "pomidor", ta sama reguła co core/automat_slow.py)
+    - indeks odwrócony: rdzeń słowa → id przepisów
+    - grupy synonimów z skladniki_baza.json ("jaja" ≈ "jajka" ≈ "jajko")
+
+    Słowo zapytania trafia w rdzeń z indeksu, gdy rdzeń jest jego prefiksem,
+    a reszta to końcówka fleksyjna (jak w core/automat_slow.py):
+    "pomidorami" → "pomidor", "kurczakiem" → "kurczak".
+
+    Zapytanie ocenia tylko przepisy z list postingów zamiast skanować całą bazę.
+    """
     
     def __init__(self):
         self.loader = RecipeLoader()
         self.recipes = []
         self.skladniki = {}
+        self._indeks = {}           # rdzeń słowa → set(id przepisu)
+        self._synonimy = {}         # fraza (rdzenie) → [warianty frazy (rdzenie)]
+        self._rdzenie = frozenset() # rdzenie z indeksu i synonimów
+        self._liczba_skladnikow = []
+        self._kategorie = {}        # kategoria → set(id przepisu)
     
     def initialize(self):
-        """Inicjalizacja danych"""
+        """Inicjalizacja danych + indeks odwrócony"""
         self.recipes = self.loader.load_recipes()
         self.skladniki = self.loader.load_skladniki()
+        self.zbuduj_indeks()
         return len(self.recipes) > 0
     
+    @staticmethod
+    def _fraza(tekst: str) -> tuple:
+        """Składnik → krotka rdzeni słów ("Mleko roślinne" → ("mlek", "roślinn"))"""
+        return tuple(rdzen(slowo) for slowo in tokeny(tekst))
+    
+    def zbuduj_indeks(self):
+        """Indeks dla self.recipes/self.skladniki (LangChainRAGEngine podaje swoje dane)"""
+        start = time.perf_counter()
+        self._indeks, self._kategorie, self._liczba_skladnikow = {}, {}, []
+        
+        for id_przepisu, recipe in enumerate(self.recipes):
+            skladniki = self.loader.parse_ingredients(recipe.get('ingredients', ''))
+            self._liczba_skladnikow.append(len(skladniki))
+            self._kategorie.setdefault(recipe.get('category'), set()).add(id_przepisu)
+            for skladnik in skladniki:
+                for slowo in self._fraza(skladnik):
+                    self._indeks.setdefault(slowo, set()).add(id_przepisu)
+        
+        self._synonimy = {}
+        for nazwa, dane in self.skladniki.items():
+            warianty = {self._fraza(forma) for forma in [nazwa] + dane.get('synonimy', [])} - {()}
+            for wariant in warianty:
+                self._synonimy.setdefault(wariant, set()).update(warianty)
+        self._rdzenie = frozenset(self._indeks) | {slowo for wariant in self._synonimy for slowo in wariant}
+        
+        print(f"✅ Indeks składników: {len(self._indeks)} słów, {len(self.recipes)} przepisów "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+    
+    def _rdzenie_slowa(self, slowo: str) -> list:
+        """Znane rdzenie, które są prefiksem słowa z końcówką fleksyjną (najdłuższy pierwszy)"""
+        rdzenie = [slowo[:dl] for dl in range(len(slowo), 0, -1)
+                   if (dl >= MIN_DL_RDZENIA or dl == len(slowo))
+                   and slowo[:dl] in self._rdzenie and slowo[dl:] in KONCOWKI]
+        return rdzenie or [rdzen(slowo)]
+    
+    def _przepisy_dla(self, skladnik: str) -> set:
+        """Id przepisów zawierających składnik (albo jego synonim)"""
+        slowa = tokeny(skladnik)
+        if not slowa:
+            # Pusty składnik pasuje do wszystkiego (przeglądanie kategorii: [''])
+            return set(range(len(self.recipes)))
+        
+        rdzenie = [self._rdzenie_slowa(slowo) for slowo in slowa]
+        fraza = tuple(r[0] for r in rdzenie)
+        warianty = self._synonimy.get(fraza)
+        if warianty is None:
+            # Bez synonimu: każde słowo dopasowane dowolnym pasującym rdzeniem
+            postingi = sorted((set().union(*(self._indeks.get(r, set()) for r in rdz)) for rdz in rdzenie), key=len)
+            return set.intersection(*postingi)
+        
+        wynik = set()
+        for wariant in warianty:
+            # Fraza wielowyrazowa: przecięcie postingów, od najkrótszego
+            postingi = sorted((self._indeks.get(slowo, set()) for slowo in wariant), key=len)
+            wynik |= set.intersection(*postingi)
+        return wynik
+    
+    def pokrycie(self, user_ingredients: List[str], category: str = None) -> Dict[int, int]:
+        """Ile składników użytkownika ma każdy przepis-kandydat: {id przepisu: liczba}"""
+        matches = {}
+        dozwolone = self._kategorie.get(category, set()) if category else None
+        for user_ing in user_ingredients:
+            kandydaci = self._przepisy_dla(user_ing)
+            if dozwolone is not None:
+                kandydaci &= dozwolone
+            for id_przepisu in kandydaci:
+                matches[id_przepisu] = matches.get(id_przepisu, 0) + 1
+        return matches
+    
     def find_recipes_by_ingredients(self, user_ingredients: List[str], category: str = None) -> List[Dict]:
         """Znajdź przepisy na podstawie składników użytkownika"""
-        matching_recipes = []
+        matches = self.pokrycie(user_ingredients, category)
         
-        for recipe in self.recipes:
-            # Filtruj po kategorii jeśli podana
-            if category and recipe.get('category') != category:
-                continue
-            
-            recipe_ingredients = self.loader.parse_ingredients(recipe['ingredients'])
-            
-            # Sprawdź ile składników się pokrywa
-            matches = 0
-            for user_ing in user_ingredients:
-                if any(user_ing.lower() in recipe_ing.lower() or recipe_ing.lower() in user_ing.lower() 
-                       for recipe_ing in recipe_ingredients):
-                    matches += 1
-            
-            if matches > 0:
-                recipe_copy = recipe.copy()
-                recipe_copy['match_score'] = matches
-                recipe_copy['match_percentage'] = round((matches / len(recipe_ingredients)) * 100, 1)
-                matching_recipes.append(recipe_copy)
+        matching_recipes = []
+        for id_przepisu in sorted(matches):
+            recipe_copy = dict(self.recipes[id_przepisu])
+            recipe_copy['match_score'] = matches[id_przepisu]
+            recipe_copy['match_percentage'] = round(
+                (matches[id_przepisu] / max(self._liczba_skladnikow[id_przepisu], 1)) * 100, 1)
+            matching_recipes.append(recipe_copy)
         
-        # Sortuj po wyniku dopasowania
+        # Sortuj po wyniku dopasowania (stabilnie - remisy w kolejności bazy)
         matching_recipes.sort(key=lambda x: x['match_score'], reverse=True)
         return matching_recipes
 
 class LangChainRAGEngine:
-    """Zaawansowany silnik RAG z LangChain"""
+    """
+    Zaawansowany silnik RAG z LangChain
+
+    Ranking hybrydowy: podobieństwo cosinusowe z indeksu wektorowego
+    (szukanie od razu w podzbiorze kategorii) mieszane z dokładnym
+    pokryciem składników z indeksu odwróconego SimpleRAGEngine.
+    """
     
     def __init__(self):
         self.loader = RecipeLoader()
         self.recipes = []
         self.skladniki = {}
-        self.vectorstore = None
+        self.indeks = IndeksWektorowy()
+        self.cache_zapytan = CacheZapytan()
+        self.dokladny = SimpleRAGEngine()
         self.embeddings = None
     
     def initialize(self):
-        """Inicjalizacja z embeddings"""
+        """
+        Inicjalizacja z embeddings
+        
+        Indeks wektorowy jest mapowany z dysku (data/rag_index). Embedowane są
+        tylko przepisy dodane/zmienione od ostatniej budowy - pełny indeks
+        buduje się offline: python -m core.rag.indeks_wektorowy
+        """
         try:
             print("🔄 Inicjalizacja RAG z LangChain...")
             
@@ -80,19 +178,21 @@ class LangChainRAGEngine:
             if not self.recipes:
                 return False
             
-            # Stwórz embeddings (uniwersalny model)
+            # Stwórz embeddings (uniwersalny model) - potrzebne do zapytań
             print("📥 Ładowanie modelu embeddings...")
             self.embeddings = HuggingFaceEmbeddings(
-                model_name="all-MiniLM-L6-v2",  # Szybki i uniwersalny model
+                model_name=MODEL_EMBEDDINGS,  # Szybki i uniwersalny model
                 model_kwargs={'device': 'cpu'}
             )
             
-            # Przygotuj dokumenty
-            documents = self._prepare_documents()
+            # Indeks z dysku albo przebudowa przyrostowa
+            if not self.indeks.wczytaj(self.recipes):
+                print("🔍 Indeks wektorowy nieaktualny - przebudowa przyrostowa...")
+                self.indeks.zbuduj(self.recipes, self.embeddings)
             
-            # Stwórz vector store
-            print("🔍 Tworzenie vector store...")
-            self.vectorstore = FAISS.from_documents(documents, self.embeddings)
+            # Indeks odwrócony składników - dokładne pokrycie do rankingu
+            self.dokladny.recipes, self.dokladny.skladniki = self.recipes, self.skladniki
+            self.dokladny.zbuduj_indeks()
             
             print("✅ RAG zainicjalizowany pomyślnie!")
             return True
@@ -101,61 +201,54 @@ class LangChainRAGEngine:
             print(f"❌ Błąd inicjalizacji RAG: {e}")
             return False
     
-    def _prepare_documents(self) -> List[Document]:
-        """Przygotuj dokumenty dla vector store"""
-        documents = []
-        
-        for recipe in self.recipes:
-            # Stwórz tekst dokumentu
-            content = f"Przepis: {recipe['title']}. "
-            content += f"Składniki: {recipe['ingredients']}. "
-            content += f"Kategoria: {recipe['category']}."
-            
-            # Metadata
-            metadata = {
-                'title': recipe['title'],
-                'category': recipe['category'],
-                'ingredients': recipe['ingredients']
-            }
-            
-            documents.append(Document(page_content=content, metadata=metadata))
-        
-        return documents
-    
     def find_recipes_by_ingredients(self, user_ingredients: List[str], category: str = None, k: int = 5) -> List[Dict]:
-        """Znajdź przepisy używając vector search"""
-        if not self.vectorstore:
-            print("❌ Vector store nie jest zainicjalizowany")
+        """
+        Znajdź przepisy używając vector search + dokładnego pokrycia składników
+        
+        Kandydaci: k najbliższych wektorowo w kategorii ∪ k z największym
+        pokryciem. Wynik = WAGA_WEKTORA × cosinus + (1 - WAGA_WEKTORA) × pokrycie
+        (odsetek składników użytkownika obecnych w przepisie).
+        """
+        if self.indeks.indeks is None:
+            print("❌ Indeks wektorowy nie jest zainicjalizowany")
             return []
         
         try:
-            # Stwórz query
-            query = f"Składniki: {', '.join(user_ingredients)}"
-            if category:
-                query += f" kategoria: {category}"
+            # Embedding query - z cache dla znanego zestawu składników (bez modelu)
+            klucz = klucz_zapytania(user_ingredients, category)
+            wektor = self.cache_zapytan.pobierz(klucz)
+            if wektor is None:
+                wektor = self.embeddings.embed_query(tekst_zapytania(klucz))
+                self.cache_zapytan.zapisz(klucz, wektor)
+            else:
+                print(f"♻️ Embedding zapytania z cache (trafialność {self.cache_zapytan.statystyki()['trafialnosc']:.0%})")
+            
+            # Wyszukaj podobne dokumenty - tylko w kategorii, dokładnie k
+            podobienstwa = dict(self.indeks.szukaj(wektor, k, kategoria=category))
             
-            # Wyszukaj podobne dokumenty
-            docs = self.vectorstore.similarity_search(query, k=k*2)  # Pobierz więcej na start
+            # Dokładne pokrycie składników (puste [''] = przeglądanie kategorii - bez pokrycia)
+            liczba = len({u.strip().lower() for u in user_ingredients} - {""})
+            pokrycie = self.dokladny.pokrycie(user_ingredients, category) if liczba else {}
+            for numer in heapq.nlargest(k, pokrycie, key=lambda n: (pokrycie[n], -n)):  # remis: kolejność bazy
+                if numer not in podobienstwa:
+                    podobienstwa[numer] = self.indeks.podobienstwo(wektor, numer)
             
             results = []
-            for doc in docs:
-                recipe_data = {
-                    'title': doc.metadata['title'],
-                    'ingredients': doc.metadata['ingredients'], 
-                    'category': doc.metadata['category'],
-                    'similarity_score': 0.8  # Placeholder
-                }
-                
-                # Filtruj po kategorii jeśli podana
-                if category and recipe_data['category'] != category:
-                    continue
-                
-                results.append(recipe_data)
-                
-                if len(results) >= k:
-                    break
+            for numer, podobienstwo in podobienstwa.items():
+                recipe = self.recipes[numer]
+                dopasowane = pokrycie.get(numer, 0)
+                results.append({
+                    'title': recipe['title'],
+                    'ingredients': recipe['ingredients'], 
+                    'category': recipe['category'],
+                    'similarity_score': round(podobienstwo, 4),
+                    'match_score': dopasowane,
+                    'hybrid_score': round(WAGA_WEKTORA * podobienstwo +
+                                          (1 - WAGA_WEKTORA) * (dopasowane / liczba if liczba else 0.0), 4)
+                })
             
-            return results
+            results.sort(key=lambda x: x['hybrid_score'], reverse=True)
+            return results[:k]
             
         except Exception as e:
             print(f"❌ Błąd wyszukiwania: {e}")
@@ -243,4 +336,18 @@ if __name__ == "__main__":
         if 'message' in result3:
             print(f"Brak wyników: {result3['message']}")
     
+    print("\n🔍 Test 4: Odmiana (narzędnik, miejscownik, liczba mnoga) - ta sama liczba przepisów")
+    prosty = SimpleRAGEngine()
+    if prosty.initialize():
+        for podstawowa, odmiany in [("pomidor", ["pomidory", "pomidorami", "pomidorach"]),
+                                    ("kurczak", ["kurczakiem", "kurczaki"]),
+                                    ("cebula", ["cebulą", "cebule"]),
+                                    ("jajka", ["jajkami", "jajko", "jaja"]),
+                                    ("brokuły", ["brokułami"]),
+                                    ("marchewka", ["marchewką", "marchewki"])]:
+            przed = len(prosty.find_recipes_by_ingredients([podstawowa]))
+            po = {odmiana: len(prosty.find_recipes_by_ingredients([odmiana])) for odmiana in odmiany}
+            znak = "✅" if all(n == przed for n in po.values()) else "❌"
+            print(f"  {znak} {podstawowa}: {przed} → {po}")
+    
     print("\n✅ Test RAG zakończony")
\ No newline at end of file
@@ -0,0 +1,135 @@
+# core/rejestr_modeli.py
+import time
+import threading
+
+# Stany modelu w rejestrze
+OCZEKUJE = "oczekuje"
+LADOWANIE = "ladowanie"
+ROZGRZEWANIE = "rozgrzewanie"
+GOTOWY = "gotowy"
+BLAD = "blad"
+
+# === 1. Rejestr modeli ===
+class RejestrModeli:
+    """
+    Ładuje modele STT/TTS w wątkach w tle i śledzi ich gotowość
+
+    Moduł silnika może udostępniać:
+    - zaladuj_model(): ładowanie modelu (bezpieczne wątkowo, idempotentne)
+    - rozgrzej(): próbne wnioskowanie rozgrzewające kernele i cache
+
+    Silniki bez tych funkcji (np. chmurowe) są od razu gotowe.
+    """
+
+    def __init__(self):
+        self._wpisy = {}
+        self._lock = threading.Lock()
+
+    def zaladuj_w_tle(self, nazwa: str, modul):
+        """Startuje ładowanie + rozgrzewkę modułu w wątku w tle"""
+        with self._lock:
+            if nazwa in self._wpisy:
+                return self._wpisy[nazwa]
+            wpis = {
+                "modul": getattr(modul, "__name__", str(modul)),
+                "stan": OCZEKUJE,
+                "czas_ladowania_s": None,
+                "czas_rozgrzewki_s": None,
+                "blad": None,
+                "_gotowe": threading.Event()
+            }
+            self._wpisy[nazwa] = wpis
+
+        watek = threading.Thread(target=self._przygotuj, args=(wpis, modul), name=f"preload-{nazwa}", daemon=True)
+        watek.start()
+        return wpis
+
+    def _przygotuj(self, wpis, modul):
+        try:
+            if hasattr(modul, "zaladuj_model"):
+                wpis["stan"] = LADOWANIE
+                start = time.perf_counter()
+                modul.zaladuj_model()
+                wpis["czas_ladowania_s"] = round(time.perf_counter() - start, 2)
+
+            if hasattr(modul, "rozgrzej"):
+                wpis["stan"] = ROZGRZEWANIE
+                start = time.perf_counter()
+                modul.rozgrzej()
+                wpis["czas_rozgrzewki_s"] = round(time.perf_counter() - start, 2)
+
+            wpis["stan"] = GOTOWY
+            if wpis["czas_ladowania_s"] is None and wpis["czas_rozgrzewki_s"] is None:
+                print(f"✅ Preload {wpis['modul']}: brak modelu lokalnego")
+            else:
+                print(f"✅ Preload {wpis['modul']}: ładowanie {wpis['czas_ladowania_s']}s, rozgrzewka {wpis['czas_rozgrzewki_s']}s")
+        except Exception as e:
+            # Model i tak spróbuje się załadować leniwie przy pierwszym użyciu
+            wpis["stan"] = BLAD
+            wpis["blad"] = str(e)
+            print(f"❌ Preload {wpis['modul']} nieudany: {e}")
+        finally:
+            wpis["_gotowe"].set()
+
+    def gotowy(self, nazwa: str) -> bool:
+        wpis = self._wpisy.get(nazwa)
+        return wpis is not None and wpis["stan"] == GOTOWY
+
+    def czekaj(self, nazwa: str = None, timeout: float = None) -> bool:
+        """
+        Czeka na zakończenie przygotowania modelu (lub wszystkich, gdy nazwa=None)
+
+        Zwraca True, jeśli wszystkie oczekiwane modele są gotowe.
+        """
+        wpisy = [self._wpisy[nazwa]] if nazwa in self._wpisy else ([] if nazwa else list(self._wpisy.values()))
+        koniec = None if timeout is None else time.monotonic() + timeout
+
+        for wpis in wpisy:
+            pozostalo = None if koniec is None else max(0.0, koniec - time.monotonic())
+            wpis["_gotowe"].wait(pozostalo)
+
+        return all(wpis["stan"] == GOTOWY for wpis in wpisy)
+
+    def status(self) -> dict:
+        """Stan gotowości wszystkich zarejestrowanych modeli"""
+        return {
+            nazwa: {k: v for k, v in wpis.items() if not k.startswith("_")}
+            for nazwa, wpis in self._wpisy.items()
+        }
+
+# === 2. Instancja współdzielona ===
+_rejestr = RejestrModeli()
+
+def zaladuj_w_tle(moduly: dict):
+    """
+    Startuje preload modułów, np. zaladuj_w_tle({"stt": stt, "tts": tts})
+    """
+    for nazwa, modul in moduly.items():
+        _rejestr.zaladuj_w_tle(nazwa, modul)
+
+def czekaj_na_gotowosc(nazwa: str = None, timeout: float = None) -> bool:
+    return _rejestr.czekaj(nazwa, timeout)
+
+def gotowy(nazwa: str) -> bool:
+    return _rejestr.gotowy(nazwa)
+
+def status_modeli() -> dict:
+    return _rejestr.status()
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    import types
+
+    print("🧪 Test rejestru modeli")
+
+    wolny = types.SimpleNamespace(
+        __name__="wolny_silnik",
+        zaladuj_model=lambda: time.sleep(0.5),
+        rozgrzej=lambda: time.sleep(0.2)
+    )
+    chmurowy = types.SimpleNamespace(__name__="chmurowy_silnik")
+
+    zaladuj_w_tle({"stt": wolny, "tts": chmurowy})
+    print(f"Od razu: {status_modeli()}")
+    print(f"Gotowe: {czekaj_na_gotowosc(timeout=5)}")
+    print(f"Po czekaniu: {status_modeli()}")
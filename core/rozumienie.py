@@ -22,6 +22,11 @@ except ImportError:
     print("⚠️ Moduł Ollama niedostępny")
 
 from core import logger
+from core.strumien_mowy import mow_strumieniowo
+from core import automat_slow
+from core.klasyfikator_intencji import MIN_MARGINES
+from core.cache_intencji import CacheIntencji, hash_tablicy
+from core.dopasowanie_komend import pobierz_dopasowywacz, uniewaznij as uniewaznij_dopasowywacz
 
 # ===================================================================
 # IMPORT UNIVERSAL INTELLIGENT ASSISTANT - NOWY SYSTEM
@@ -160,11 +165,15 @@ class IntentRecognizer:
     - regex_only: tylko wzorce regex
     - regex_plus_simple: regex + prosty LLM
     - regex_plus_few_shot: regex + few-shot LLM
+    - regex_plus_embedding: regex + lokalny klasyfikator (embeddings),
+      LLM tylko gdy pewność < confidence_threshold
     """
     
     def __init__(self, config):
+        self.recognition_config = dict(config.get("recognition_config", {}))
         self.method = config.get("recognition_config", {}).get("method", "regex_plus_simple")
         self.confidence_threshold = config.get("recognition_config", {}).get("confidence_threshold", 0.7)
+        self.embedding_margin = config.get("recognition_config", {}).get("embedding_margin", MIN_MARGINES)
         self.use_context = config.get("recognition_config", {}).get("use_context", False)
         self.debug_mode = config.get("recognition_config", {}).get("debug_mode", False)
         self.previous_context = ""
@@ -191,8 +200,28 @@ class IntentRecognizer:
                 print("❌ Debug: Regex_only - brak dopasowania")
             return None, "regex_only"
         
-        # KROK 3: Próbuj LLM classifier
-        if self.method in ["regex_plus_simple", "regex_plus_few_shot"]:
+        # KROK 3a: Lokalny klasyfikator - milisekundy zamiast zapytania do LLM
+        if self.method == "regex_plus_embedding":
+            klasyfikator = pobierz_klasyfikator_embedding()
+            if klasyfikator:
+                dozwolone = {k["intencja"] for k in dostepne_intencje if "intencja" in k}
+                bez_centroidu = klasyfikator.bez_centroidu(dozwolone)
+                if bez_centroidu:
+                    # Tekst dla intencji bez przykładów trafiłby do najbliższej "cudzej" - decyduje LLM
+                    if self.debug_mode:
+                        print(f"🔍 Debug: Embedding pominięty - intencje bez przykładów: {sorted(bez_centroidu)}")
+                else:
+                    intencja, pewnosc, margines = klasyfikator.klasyfikuj(tekst, dozwolone)
+                    if self.debug_mode:
+                        print(f"🔍 Debug: Embedding → {intencja} (pewność {pewnosc:.2f}, margines {margines:.2f})")
+                    if pewnosc >= self.confidence_threshold and margines >= self.embedding_margin:
+                        if intencja == "brak_dopasowania":
+                            return None, "embedding"
+                        return intencja, "embedding"
+                klasyfikator.zglos_eskalacje()
+        
+        # KROK 3b: Próbuj LLM classifier (dla embedding - eskalacja przy niskiej pewności)
+        if self.method in ["regex_plus_simple", "regex_plus_few_shot", "regex_plus_embedding"]:
             llm_result = self._try_llm_classifier(tekst, dostepne_intencje, config)
             if llm_result:
                 if self.debug_mode:
@@ -204,28 +233,67 @@ class IntentRecognizer:
         return None, "no_match"
     
     def _try_regex(self, tekst, dostepne_intencje):
-        """Próbuje dopasować regex patterns"""
-        for komenda in dostepne_intencje:
-            try:
-                wzorzec = komenda["wzorzec"]
-                intencja = komenda["intencja"]
-                if re.search(wzorzec, tekst, re.IGNORECASE):
-                    return intencja
-            except (KeyError, re.error):
-                continue
-        return None
+        """Próbuje dopasować regex patterns (tabela skompilowana raz - core.dopasowanie_komend)"""
+        return pobierz_dopasowywacz(dostepne_intencje).dopasuj(tekst)
     
     def _try_llm_classifier(self, tekst, dostepne_intencje, config):
-        """Próbuje LLM classifier"""
-        if self.method == "regex_plus_simple":
-            return klasyfikuj_intencje_llm_simple(tekst, dostepne_intencje, config)
+        """Próbuje LLM classifier (wynik zapamiętywany w cache intencji)"""
+        if self.method in ["regex_plus_simple", "regex_plus_embedding"]:
+            klasyfikator, metoda = klasyfikuj_intencje_llm_simple, "llm_simple"
         elif self.method == "regex_plus_few_shot":
-            return klasyfikuj_intencje_llm_few_shot(tekst, dostepne_intencje, config)
-        return None
+            klasyfikator, metoda = klasyfikuj_intencje_llm_few_shot, "llm_few_shot"
+        else:
+            return None
+        
+        cache = pobierz_cache_intencji()
+        if cache is None:
+            return klasyfikator(tekst, dostepne_intencje, config)
+        
+        tablica = hash_tablicy(dostepne_intencje)
+        try:
+            cache.uniewaznij_inne_tablice(tablica)
+            znaleziono, intencja = cache.pobierz(tekst, tablica, metoda)
+            if znaleziono:
+                if self.debug_mode:
+                    print(f"💾 Debug: Cache intencji → {intencja}")
+                return intencja
+        except Exception as e:
+            print(f"⚠️ Błąd odczytu cache intencji: {e}")
+        
+        szczegoly = {}
+        intencja = klasyfikator(tekst, dostepne_intencje, config, szczegoly)
+        
+        # Zapamiętuj tylko rozstrzygnięcia LLM - nie błędy połączenia
+        if szczegoly.get("rozstrzygniete"):
+            try:
+                cache.zapisz(tekst, tablica, metoda, intencja)
+            except Exception as e:
+                print(f"⚠️ Błąd zapisu cache intencji: {e}")
+        return intencja
 
-# Globalna instancja (zostanie utworzona w analizuj())
+# Globalna instancja (tworzona w analizuj(), odtwarzana tylko po zmianie recognition_config)
 intent_recognizer = None
 
+# Trwały cache klasyfikacji LLM (data/db/cache_intencji.db)
+_cache_intencji = None
+
+def pobierz_cache_intencji():
+    global _cache_intencji
+    if _cache_intencji is None:
+        try:
+            _cache_intencji = CacheIntencji()
+        except Exception as e:
+            print(f"⚠️ Cache intencji niedostępny: {e}")
+            return None
+    return _cache_intencji
+
+def pobierz_intent_recognizer(config):
+    """Zwraca współdzielony IntentRecognizer zgodny z aktualnym recognition_config"""
+    global intent_recognizer
+    if intent_recognizer is None or intent_recognizer.recognition_config != config.get("recognition_config", {}):
+        intent_recognizer = IntentRecognizer(config)
+    return intent_recognizer
+
 # ===================================================================
 # 🧠 SEKCJA 3: RAG SYSTEM - INICJALIZACJA I KONFIGURACJA  
 # ===================================================================
@@ -277,6 +345,23 @@ class RagEngineAdapter:
         except Exception as e:
             print(f"❌ Błąd RAG Adapter: {e}")
             return []
+    
+    def search_relevant_many(self, queries, max_results=5):
+        """Wiele słów kluczowych w jednym zapytaniu (przepisy z większą liczbą trafień wyżej)"""
+        queries = [q for q in queries if q and q.strip()]
+        if not self.recipe_rag or not queries:
+            return []
+        
+        try:
+            result = self.recipe_rag.suggest_recipes(queries, max_results=max_results)
+            recipes = result.get('all_recipes', [])
+            
+            print(f"🔍 RAG Adapter: {queries} → {len(recipes)} wyników")
+            return recipes
+            
+        except Exception as e:
+            print(f"❌ Błąd RAG Adapter: {e}")
+            return []
 
 # Stwórz adapter dla Universal Assistant
 if RAG_AVAILABLE and recipe_rag:
@@ -351,6 +436,32 @@ def zapytaj_llm_safe(tekst, config, max_retries=2):
     else:
         return zapytaj_openrouter_safe(tekst, config, max_retries)
 
+def strumieniowanie_wlaczone(config):
+    """llm_config.stream (domyślnie włączone) - odpowiedź mówiona zdanie po zdaniu"""
+    return config.get("llm_config", {}).get("stream", True)
+
+def zapytaj_llm_strumieniowo(tekst, config):
+    """
+    Generator fragmentów odpowiedzi LLM (Ollama lub OpenRouter)
+    
+    Błąd przed pierwszym fragmentem jest zgłaszany jako wyjątek - wołający
+    przechodzi wtedy na zwykłe zapytanie (zapytaj_llm_safe*), które ma
+    pełną obsługę fallbacków i limitów tokenów.
+    """
+    provider = config.get("llm_config", {}).get("provider", "openrouter")
+    
+    if provider == "ollama" and OLLAMA_AVAILABLE:
+        yield from llm_ollama.ollama_generate_stream(tekst, config)
+        return
+    
+    model = config["llm_config"]["model"]
+    temp_config = config.copy()
+    temp_config["llm_config"] = dict(config["llm_config"])
+    temp_config["llm_config"]["max_tokens"] = token_manager.get_safe_tokens(
+        model, config["llm_config"].get("max_tokens", 2048)
+    )
+    yield from llm_openrouter.odpowiedz_strumieniowo(tekst, temp_config)
+
 def zapytaj_openrouter_safe(tekst, config, max_retries=2):
     """
     Bezpieczne zapytanie OpenRouter LLM z auto-adjustem tokenów
@@ -442,8 +553,135 @@ def zapytaj_llm_safe_with_fallback(tekst, config, max_retries=2):
 # 🤖 SEKCJA 6: LLM INTENT CLASSIFIERS - RÓŻNE METODY
 # ===================================================================
 
-def klasyfikuj_intencje_llm_simple(tekst, dostepne_intencje, config):
-    """Prosty LLM classifier (stara wersja)"""
+# Frazy przykładowe per intencja: few-shot prompt dla LLM
+# oraz centroidy lokalnego klasyfikatora (regex_plus_embedding).
+# Każda intencja z komendy_domyslne.json musi mieć tu przykłady - intencja
+# bez centroidu wymusza eskalację do LLM (klasyfikator nie może jej wskazać).
+PRZYKLADY_INTENCJI = {
+    "zapytanie_pogoda": [
+        "Jaka jest pogoda?", "Czy będzie dziś padać?", "Jaka pogoda na jutro?",
+        "Ile jest stopni na dworze?"
+    ],
+    "zapytanie_godzina": [
+        "Która godzina?", "Która jest godzina?", "Którą mamy godzinę?",
+        "Powiedz mi godzinę", "Jaki mamy czas?"
+    ],
+    "zapytanie_data": [
+        "Jaki jest dzisiaj dzień?", "Którego dziś mamy?", "Jaka jest dzisiejsza data?",
+        "Jaki mamy dzień tygodnia?"
+    ],
+    "powitanie": [
+        "Dzień dobry", "Cześć", "Witaj", "Hej Stefan"
+    ],
+    "pozegnanie": [
+        "Do zobaczenia!", "Na razie", "Żegnaj", "Do widzenia", "Papa", "Dobranoc"
+    ],
+    "zapytanie_samopoczucie": [
+        "Jak się masz?", "Co u ciebie?", "Jak leci?", "Co słychać?", "Jak tam?"
+    ],
+    "status_systemu": [
+        "Jaki jest status systemu?", "Sprawdź system", "Czy wszystko działa poprawnie?",
+        "Jak działa system?"
+    ],
+    "zapisz_wiadomosc": [
+        "Zapisz wiadomość", "Dodaj notatkę: kupić mleko", "Utwórz nową wiadomość",
+        "Zanotuj, że jutro dzwonię do banku"
+    ],
+    "wyslij_wiadomosc": [
+        "Wyślij wiadomość do Ani", "Prześlij wiadomość", "Napisz do mamy, że się spóźnię"
+    ],
+    "odczytaj_wiadomosc": [
+        "Odczytaj wiadomość", "Przeczytaj wiadomość numer dwa", "Przeczytaj ostatnią wiadomość"
+    ],
+    "przeglad_wiadomosci": [
+        "Pokaż wiadomości", "Lista wiadomości", "Jakie mam zapisane komunikaty?"
+    ],
+    "otrzymane_wiadomosci": [
+        "Czy mam nowe wiadomości?", "Mam jakieś wiadomości?", "Czy ktoś do mnie pisał?"
+    ],
+    "usun_wiadomosc": [
+        "Usuń wiadomość", "Skasuj wiadomość numer trzy", "Wykasuj ostatnią wiadomość"
+    ],
+    "co_moge_zrobic_z_lodowki": [
+        "Co mogę zrobić z tego, co mam w lodówce?", "Co ugotować z produktów w lodówce?",
+        "Co przygotować z tych składników?"
+    ],
+    "zaproponuj_dania": [
+        "Zaproponuj danie z tego, co mam", "Pokaż dania ze składników w lodówce",
+        "Znajdź danie z moich składników"
+    ],
+    "dania_z_skladnikow": [
+        "Mam jajka, co zrobić?", "Co można z tego ugotować?",
+        "Co mogę przygotować?", "Mam pomidor, co zrobić?"
+    ],
+    "dania_wege": [
+        "Chcę danie wegetariańskie", "Szukam dania bez mięsa", "Potrzebuję przepisu wege"
+    ],
+    "dania_niskotluszczowe": [
+        "Chcę danie niskotłuszczowe", "Szukam dania bez tłuszczu", "Potrzebuję czegoś dietetycznego"
+    ],
+    "dania_niskocukrowe": [
+        "Chcę danie bez cukru", "Szukam dania keto", "Potrzebuję dania niskocukrowego"
+    ],
+    "kalorie_przepisu": [
+        "Ile kalorii ma ten przepis?", "Jaka jest wartość odżywcza tego dania?",
+        "Ile kalorii ma to danie?"
+    ],
+    "przepis_szczegolowy": [
+        "Przepis na omlet", "Jak zrobić naleśniki?", "Jak przygotować zupę pomidorową?"
+    ],
+    "skladniki_na_danie": [
+        "Jakie składniki na pizzę?", "Co potrzebuję na sernik?", "Produkty na bigos"
+    ],
+    "kalorie_produktu": [
+        "Ile kalorii ma jajko?", "Kalorie w pomidorze?", "Ile kalorii ma banan?"
+    ],
+    "zmien_model": [
+        "Zmień model na GPT", "Przełącz LLM na Claude", "Zmień model na Mistral"
+    ],
+    "brak_dopasowania": [
+        "Opowiedz dowcip", "Jak działa samolot?", "Kto wygrał wczorajszy mecz?"
+    ]
+}
+
+# Intencje, których przykłady trafiają do promptu few-shot - stały, mały zestaw,
+# żeby prompt nie rósł z liczbą komend
+INTENCJE_FEW_SHOT = (
+    "zapytanie_godzina", "zapytanie_samopoczucie", "pozegnanie",
+    "kalorie_produktu", "dania_z_skladnikow", "brak_dopasowania"
+)
+
+# Lokalny klasyfikator (budowany przy pierwszym użyciu)
+_klasyfikator_embedding = None
+_klasyfikator_niedostepny = False
+
+def pobierz_klasyfikator_embedding():
+    """
+    Klasyfikator centroidowy na embeddingach - współdzieli model MiniLM z RAG,
+    jeśli ten już go załadował. None, gdy embeddings są niedostępne.
+    """
+    global _klasyfikator_embedding, _klasyfikator_niedostepny
+    if _klasyfikator_embedding is not None or _klasyfikator_niedostepny:
+        return _klasyfikator_embedding
+
+    try:
+        from core.klasyfikator_intencji import KlasyfikatorCentroidowy, utworz_embeddings
+        embeddings = getattr(getattr(recipe_rag, "engine", None), "embeddings", None) or utworz_embeddings()
+        if embeddings is None:
+            raise ImportError("brak langchain_huggingface")
+        _klasyfikator_embedding = KlasyfikatorCentroidowy(PRZYKLADY_INTENCJI, embeddings)
+    except Exception as e:
+        print(f"⚠️ Klasyfikator embedding niedostępny ({e}) - używam LLM")
+        _klasyfikator_niedostepny = True
+    return _klasyfikator_embedding
+
+def klasyfikuj_intencje_llm_simple(tekst, dostepne_intencje, config, szczegoly=None):
+    """
+    Prosty LLM classifier (stara wersja)
+    
+    szczegoly (dict, opcjonalnie): ustawiane "rozstrzygniete": True, gdy LLM
+    zwrócił poprawną intencję albo "brak_dopasowania" (wynik do zapamiętania)
+    """
     
     intencje_lista = ", ".join([k["intencja"] for k in dostepne_intencje])
     
@@ -476,9 +714,13 @@ ODPOWIEDŹ (TYLKO nazwa intencji po polsku):"""
         # Sprawdź czy to prawidłowa intencja
         if intencja in [k["intencja"] for k in dostepne_intencje]:
             print(f"✅ Simple LLM rozpoznał: {intencja}")
+            if szczegoly is not None:
+                szczegoly["rozstrzygniete"] = True
             return intencja
         elif intencja == "brak_dopasowania":
             print(f"❌ Simple LLM nie rozpoznał intencji")
+            if szczegoly is not None:
+                szczegoly["rozstrzygniete"] = True
             return None
         else:
             print(f"⚠️ Simple LLM zwrócił nieprawidłową intencję: {intencja}")
@@ -488,42 +730,15 @@ ODPOWIEDŹ (TYLKO nazwa intencji po polsku):"""
         print(f"❌ Błąd simple klasyfikacji: {e}")
         return None
 
-def klasyfikuj_intencje_llm_few_shot(tekst, dostepne_intencje, config):
-    """Few-shot LLM classifier (ulepszona wersja)"""
+def klasyfikuj_intencje_llm_few_shot(tekst, dostepne_intencje, config, szczegoly=None):
+    """Few-shot LLM classifier (ulepszona wersja) - szczegoly jak w wersji simple"""
     
-    # Few-shot examples
-    examples = """PRZYKŁADY KLASYFIKACJI:
-
-    "Która godzina?" → zapytanie_godzina
-    "Która jest godzina?" → zapytanie_godzina  
-    "Którą mamy godzinę?" → zapytanie_godzina
-    "Powiedz mi godzinę" → zapytanie_godzina
-    "Jaki mamy czas?" → zapytanie_godzina
-
-    "Jak się masz?" → zapytanie_samopoczucie  
-    "Co u ciebie?" → zapytanie_samopoczucie
-    "Jak leci?" → zapytanie_samopoczucie
-    "Co słychać?" → zapytanie_samopoczucie
-    "Jak tam?" → zapytanie_samopoczucie
-
-    "Do zobaczenia!" → pozegnanie
-    "Na razie" → pozegnanie
-    "Żegnaj" → pozegnanie
-    "Do widzenia" → pozegnanie
-    "Papa" → pozegnanie
-
-    "Ile kalorii ma jajko?" → kalorie_produktu
-    "Kalorie w pomidorze?" → kalorie_produktu
-    "Ile kalorii to ma?" → kalorie_produktu
-
-    "Mam jajka, co zrobić?" → dania_z_skladnikow
-    "Co można z tego ugotować?" → dania_z_skladnikow
-    "Co mogę przygotować?" → dania_z_skladnikow
-    "Mam pomidor, co zrobić?" → dania_z_skladnikow
-
-    "Opowiedz dowcip" → brak_dopasowania
-    "Jak działa samolot?" → brak_dopasowania
-    "Czy jutro będzie padać deszcz?" → brak_dopasowania"""
+    # Few-shot examples (ze wspólnej tabeli przykładów, stały zestaw intencji)
+    dostepne = {k["intencja"] for k in dostepne_intencje if "intencja" in k} | {"brak_dopasowania"}
+    examples = "PRZYKŁADY KLASYFIKACJI:\n\n" + "\n\n".join(
+        "\n".join(f'    "{fraza}" → {intencja}' for fraza in PRZYKLADY_INTENCJI[intencja])
+        for intencja in INTENCJE_FEW_SHOT if intencja in dostepne
+    )
 
     intencje_lista = ", ".join([k["intencja"] for k in dostepne_intencje])
     
@@ -560,9 +775,13 @@ ODPOWIEDŹ:"""
         # Sprawdź czy to prawidłowa intencja
         if intencja in [k["intencja"] for k in dostepne_intencje]:
             print(f"✅ Few-shot LLM rozpoznał: {intencja}")
+            if szczegoly is not None:
+                szczegoly["rozstrzygniete"] = True
             return intencja
         elif intencja == "brak_dopasowania":
             print(f"❌ Few-shot LLM nie rozpoznał intencji")
+            if szczegoly is not None:
+                szczegoly["rozstrzygniete"] = True
             return None
         else:
             print(f"⚠️ Few-shot LLM zwrócił nieprawidłową intencję: {intencja}")
@@ -606,12 +825,11 @@ def analizuj(tekst, config, tts_module):
         # NOWY SYSTEM: SWITCHER METOD ROZPOZNAWANIA
         # ===============================================================
         
-        # Inicjalizuj recognizer z config
-        global intent_recognizer
-        intent_recognizer = IntentRecognizer(config)
+        # Recognizer współdzielony między turami (nowy tylko po zmianie config)
+        recognizer = pobierz_intent_recognizer(config)
         
         # Użyj wybranej metody klasyfikacji
-        intencja, method_used = intent_recognizer.classify_intent(tekst, KOMENDY, config)
+        intencja, method_used = recognizer.classify_intent(tekst, KOMENDY, config)
         
         if intencja:
             print(f"✅ Rozpoznano intencję ({method_used}): {intencja}")
@@ -648,9 +866,20 @@ def analizuj(tekst, config, tts_module):
             model_llm = config["llm_config"]["model"]
             provider = config.get("llm_config", {}).get("provider", "openrouter")
             
-            # Użyj bezpiecznej funkcji LLM z fallback
             polish_prompt = f"Odpowiadaj TYLKO po polsku. Użytkownik powiedział: '{tekst}'"
-            odpowiedz = zapytaj_llm_safe_with_fallback(polish_prompt, config)
+            
+            # Strumień: TTS mówi pierwsze zdanie, zanim LLM skończy generować
+            wypowiedziano = False
+            if strumieniowanie_wlaczone(config):
+                try:
+                    odpowiedz = mow_strumieniowo(zapytaj_llm_strumieniowo(polish_prompt, config), tts_module)
+                    wypowiedziano = bool(odpowiedz)
+                except Exception as e:
+                    print(f"⚠️ Strumieniowanie niedostępne ({e}) - zwykłe zapytanie")
+            
+            # Użyj bezpiecznej funkcji LLM z fallback
+            if not wypowiedziano:
+                odpowiedz = zapytaj_llm_safe_with_fallback(polish_prompt, config)
             
             # Dodaj prefix żeby było widać że to czysty LLM
             if not odpowiedz.startswith("❌"):
@@ -671,7 +900,8 @@ def analizuj(tekst, config, tts_module):
                     odpowiedz = "Przepraszam, wystąpił problem z połączeniem. Spróbuj ponownie."
             
             # NAPRAWIONE: Wypowiedz odpowiedź BEZ prefixów
-            tts_module.mow_tekstem(wypowiedz_bez_prefixow(odpowiedz))
+            if not wypowiedziano:
+                tts_module.mow_tekstem(wypowiedz_bez_prefixow(odpowiedz))
             
             # Loguj rozmowę LLM
             logger.loguj_rozmowe(
@@ -718,8 +948,9 @@ def wyciagnij_skladniki(tekst):
     """
     Wyciąga składniki z tekstu użytkownika
     
-    Przeszukuje tekst pod kątem znanych składników z bazy.
-    Używa prostego dopasowania stringów (case-insensitive).
+    Przeszukuje tekst pod kątem znanych składników (SKLADNIKI_PODSTAWOWE
+    z core/leksykon.py oraz nazwy i synonimy z skladniki_baza.json) - automat
+    z core/automat_slow.py, dopasowanie całych słów z odmianą ("pomidorami" → "pomidor").
     
     Args:
         tekst (str): Tekst użytkownika
@@ -727,22 +958,7 @@ def wyciagnij_skladniki(tekst):
     Returns:
         list: Lista znalezionych składników
     """
-    # Lista możliwych składników (z bazy danych)
-    mozliwe_skladniki = [
-        "awokado", "banan", "brokuły", "cebula", "chleb", "cukinia", "cytryna", 
-        "czosnek", "imbir", "jajka", "jarmuż", "kapary", "kasza", "koperek",
-        "kurczak", "marchewka", "mleko", "ocet", "ogórek", "oliwa", "papryka",
-        "pieprz", "pomidor", "soczewica", "sos", "szpinak", "słonecznik", "tofu", "łosoś"
-    ]
-    
-    znalezione = []
-    tekst_lower = tekst.lower()
-    
-    for skladnik in mozliwe_skladniki:
-        if skladnik in tekst_lower:
-            znalezione.append(skladnik)
-    
-    return znalezione
+    return list(automat_slow.analizuj(tekst)["skladniki"])
 
 def obsługa_rag_ogolna(tekst, intencja):
     """
@@ -881,6 +1097,37 @@ def oblicz_kalorie_produktu(tekst):
 # 🎭 SEKCJA 9: WYKONANIE INTENCJI - LOKALNE IMPLEMENTACJE
 # ===================================================================
 
+# Stałe odpowiedzi - wspólne dla wykonaj_intencje i rozgrzewania cache TTS
+POWITANIA = [
+    "Cześć! Jak mogę pomóc?",
+    "Witaj! W czym mogę Ci pomóc?",
+    "Hej! Gotowy do pracy!"
+]
+POZEGNANIA = [
+    "Do widzenia!",
+    "Miłego dnia!",
+    "Do zobaczenia!"
+]
+SAMOPOCZUCIE = [
+    "Dzięki za pytanie! Wszystko w porządku!",
+    "Świetnie się mam! Gotowy do pomocy!",
+    "Doskonale! Co mogę dla Ciebie zrobić?"
+]
+ODPOWIEDZI_PLACEHOLDER = {
+    "kalorie_przepisu": "Funkcja liczenia kalorii będzie wkrótce dostępna.",
+    "przepis_szczegolowy": "Szczegółowe przepisy będą dostępne w przyszłej wersji.",
+    "skladniki_na_danie": "Funkcja wyświetlania składników będzie wkrótce dostępna."
+}
+KOMUNIKATY_BLEDOW = [
+    "Przepraszam, wystąpił problem z połączeniem. Spróbuj ponownie.",
+    "Przepraszam, wystąpił błąd podczas wykonywania polecenia.",
+    "Przepraszam, system przepisów jest chwilowo niedostępny.",
+    "Wystąpił nieoczekiwany błąd systemu."
+]
+
+# Frazy do wstępnej syntezy w cache TTS (tts.potok.PotokTTS.rozgrzej_cache)
+FRAZY_STALE = POWITANIA + POZEGNANIA + SAMOPOCZUCIE + list(ODPOWIEDZI_PLACEHOLDER.values()) + KOMUNIKATY_BLEDOW
+
 def wykonaj_intencje(intencja, tekst, tts_module, config):
     """
     Wykonuje konkretną intencję z pełnym logowaniem
@@ -918,30 +1165,15 @@ def wykonaj_intencje(intencja, tekst, tts_module, config):
             
         elif intencja == "powitanie":
             import random
-            powitania = [
-                "Cześć! Jak mogę pomóc?",
-                "Witaj! W czym mogę Ci pomóc?",
-                "Hej! Gotowy do pracy!"
-            ]
-            odpowiedz = random.choice(powitania)
+            odpowiedz = random.choice(POWITANIA)
             
         elif intencja == "pozegnanie":
             import random
-            pozegnania = [
-                "Do widzenia!",
-                "Miłego dnia!",
-                "Do zobaczenia!"
-            ]
-            odpowiedz = random.choice(pozegnania)
+            odpowiedz = random.choice(POZEGNANIA)
             
         elif intencja == "zapytanie_samopoczucie":
             import random
-            samopoczucie = [
-                "Dzięki za pytanie! Wszystko w porządku!",
-                "Świetnie się mam! Gotowy do pomocy!",
-                "Doskonale! Co mogę dla Ciebie zrobić?"
-            ]
-            odpowiedz = random.choice(samopoczucie)
+            odpowiedz = random.choice(SAMOPOCZUCIE)
             
         # ===============================================================
         # GRUPA 9.2: INTENCJE SYSTEMOWE - STATUS I DIAGNOSTYKA
@@ -1016,14 +1248,8 @@ def wykonaj_intencje(intencja, tekst, tts_module, config):
         # ===============================================================
         # GRUPA 9.5: INTENCJE PLACEHOLDER - DO IMPLEMENTACJI
         # ===============================================================
-        elif intencja == "kalorie_przepisu":
-            odpowiedz = "Funkcja liczenia kalorii będzie wkrótce dostępna."
-            
-        elif intencja == "przepis_szczegolowy":
-            odpowiedz = "Szczegółowe przepisy będą dostępne w przyszłej wersji."
-            
-        elif intencja == "skladniki_na_danie":
-            odpowiedz = "Funkcja wyświetlania składników będzie wkrótce dostępna."
+        elif intencja in ODPOWIEDZI_PLACEHOLDER:
+            odpowiedz = ODPOWIEDZI_PLACEHOLDER[intencja]
             
         # ===============================================================
         # GRUPA 9.6: FALLBACK LLM - NIEZNANE INTENCJE
@@ -1088,6 +1314,7 @@ def dodaj_komende(wzorzec, intencja):
         intencja (str): Nazwa intencji
     """
     KOMENDY.append({"wzorzec": wzorzec, "intencja": intencja})
+    uniewaznij_dopasowywacz()  # tabela zostanie przekompilowana przy następnym dopasowaniu
     print(f"✅ Dodano komendę: {wzorzec} -> {intencja}")
 
 def lista_intencji():
@@ -1128,7 +1355,9 @@ def get_recognition_stats():
             "method": intent_recognizer.method,
             "confidence_threshold": intent_recognizer.confidence_threshold,
             "use_context": intent_recognizer.use_context,
-            "debug_mode": intent_recognizer.debug_mode
+            "debug_mode": intent_recognizer.debug_mode,
+            "embedding": _klasyfikator_embedding.statystyki() if _klasyfikator_embedding else None,
+            "cache_intencji": _cache_intencji.statystyki() if _cache_intencji else None
         }
     return {"status": "not_initialized"}
 
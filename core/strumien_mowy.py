@@ -0,0 +1,199 @@
+# core/strumien_mowy.py
+import re
+import time
+import queue
+import threading
+
+# === 1. Parametry ===
+MIN_ZNAKOW_ZDANIA = 12   # krótsze "zdania" doklejane są do następnego
+
+# Skróty, po których kropka nie kończy zdania
+SKROTY = {
+    "np", "itp", "itd", "tzn", "tzw", "tj", "ok", "godz", "min", "ul", "al",
+    "dr", "prof", "mgr", "inż", "nr", "str", "ww", "jw", "wg", "m.in", "p.n.e", "n.e",
+    "ew", "pt", "ds", "zł", "gr", "kg", "dag", "łyż", "szt", "ml"
+}
+
+# Koniec zdania: . ! ? … (także wielokrotne), opcjonalny cudzysłów/nawias, potem biały znak
+_KONIEC = re.compile(r'[.!?…]+["»”\')]*(?=\s)|\n')
+_MARKDOWN = re.compile(r"[*#`_]+")
+
+def oczysc_dla_tts(tekst: str) -> str:
+    """Usuwa znaczniki markdown, których TTS nie powinien czytać"""
+    tekst = _MARKDOWN.sub("", tekst)
+    tekst = re.sub(r"^\s*[-•]\s+", "", tekst, flags=re.MULTILINE)
+    return re.sub(r"\s+", " ", tekst).strip()
+
+# === 2. Segmentacja na zdania ===
+class SegmentatorZdan:
+    """
+    Składa fragmenty (tokeny) w pełne zdania
+
+    Zdanie jest gotowe, gdy po znaku końca pojawi się biały znak - dzięki
+    temu "3.5" czy "m.in." w środku tokenów nie tną zdania. Kropka po
+    skrócie (np., godz.), pojedynczej literze lub liczbie (punkty listy)
+    nie jest końcem zdania.
+    """
+
+    def __init__(self, min_znakow: int = MIN_ZNAKOW_ZDANIA):
+        self.min_znakow = min_znakow
+        self._bufor = ""
+
+    def _czy_koniec(self, tekst, pozycja_znaku):
+        """Czy kropka na pozycji pozycja_znaku kończy zdanie"""
+        if tekst[pozycja_znaku] != ".":
+            return True
+        poczatek = pozycja_znaku
+        while poczatek > 0 and not tekst[poczatek - 1].isspace():
+            poczatek -= 1
+        slowo = tekst[poczatek:pozycja_znaku].lower().strip("(\"'„")
+        if not slowo:
+            return True
+        if slowo in SKROTY or slowo.isdigit() or (len(slowo) == 1 and slowo.isalpha()):
+            return False
+        return True
+
+    def dodaj(self, fragment: str) -> list:
+        """Dokłada fragment, zwraca listę zdań, które właśnie się domknęły"""
+        self._bufor += fragment
+        zdania = []
+        start = 0
+        for koniec in _KONIEC.finditer(self._bufor):
+            if not self._czy_koniec(self._bufor, koniec.start()):
+                continue
+            zdanie = self._bufor[start:koniec.end()].strip()
+            if len(zdanie) < self.min_znakow:
+                continue  # zostaje w buforze i dołączy do następnego
+            zdania.append(zdanie)
+            start = koniec.end()
+        self._bufor = self._bufor[start:]
+        return zdania
+
+    def zakoncz(self) -> list:
+        """Reszta bufora po zakończeniu strumienia"""
+        reszta = self._bufor.strip()
+        self._bufor = ""
+        return [reszta] if reszta else []
+
+def podziel_na_zdania(tekst: str, min_znakow: int = MIN_ZNAKOW_ZDANIA) -> list:
+    """Cały tekst → lista zdań (ta sama reguła co dla strumienia)"""
+    segmentator = SegmentatorZdan(min_znakow)
+    return segmentator.dodaj(tekst + " ") + segmentator.zakoncz()
+
+# === 3. Strumień LLM → TTS ===
+def mow_strumieniowo(fragmenty, tts_module) -> str:
+    """
+    Czyta fragmenty z generatora LLM i mówi każde zdanie, gdy tylko się domknie
+
+    LLM generuje dalej w bieżącym wątku, a wątek TTS wypowiada kolejne
+    zdania z kolejki - pierwszy dźwięk pojawia się po pierwszym zdaniu,
+    nie po całej odpowiedzi.
+
+    Returns:
+        str: pełny tekst odpowiedzi
+
+    Raises:
+        wyjątek generatora, jeśli wystąpił przed pierwszym fragmentem
+        (wołający może wtedy użyć zwykłego zapytania); późniejszy błąd
+        kończy wypowiedź na tym, co już powstało
+    """
+    # Silnik z potokiem (tts/potok.py): zdania idą prosto do potoku,
+    # który syntezuje następne w trakcie odtwarzania poprzedniego.
+    # potok = None - silnik nie może go teraz użyć (np. brak MP3), zdania idą przez mow_tekstem
+    potok = getattr(tts_module, "potok", None)
+    if potok is not None:
+        return _mow_przez_potok(fragmenty, potok)
+
+    kolejka = queue.Queue()
+    start = time.time()
+    pierwsze_zdanie = []
+
+    def _mowca():
+        while True:
+            zdanie = kolejka.get()
+            if zdanie is None:
+                return
+            if not pierwsze_zdanie:
+                pierwsze_zdanie.append(time.time() - start)
+                print(f"🔊 Pierwsze zdanie do TTS po {pierwsze_zdanie[0]:.2f}s")
+            try:
+                tts_module.mow_tekstem(zdanie)
+            except Exception as e:
+                print(f"❌ Błąd TTS w strumieniu: {e}")
+
+    segmentator = SegmentatorZdan()
+    czesci = []
+    watek = None
+
+    try:
+        for fragment in fragmenty:
+            if watek is None:
+                watek = threading.Thread(target=_mowca, name="tts-strumien", daemon=True)
+                watek.start()
+            czesci.append(fragment)
+            for zdanie in segmentator.dodaj(fragment):
+                zdanie = oczysc_dla_tts(zdanie)
+                if zdanie:
+                    kolejka.put(zdanie)
+    except Exception as e:
+        if watek is None:
+            raise
+        print(f"⚠️ Strumień LLM przerwany: {e}")
+    finally:
+        if watek is not None:
+            for zdanie in segmentator.zakoncz():
+                zdanie = oczysc_dla_tts(zdanie)
+                if zdanie:
+                    kolejka.put(zdanie)
+            kolejka.put(None)
+            watek.join()
+
+    return "".join(czesci).strip()
+
+def _mow_przez_potok(fragmenty, potok) -> str:
+    """mow_strumieniowo dla silników z PotokTTS - te same reguły błędów"""
+    segmentator = SegmentatorZdan()
+    czesci = []
+
+    try:
+        for fragment in fragmenty:
+            czesci.append(fragment)
+            for zdanie in segmentator.dodaj(fragment):
+                potok.dodaj(oczysc_dla_tts(zdanie))
+    except Exception as e:
+        if not czesci:
+            raise
+        print(f"⚠️ Strumień LLM przerwany: {e}")
+    finally:
+        if czesci:
+            for zdanie in segmentator.zakoncz():
+                potok.dodaj(oczysc_dla_tts(zdanie))
+            potok.czekaj()
+
+    return "".join(czesci).strip()
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    print("🧪 Test segmentatora zdań")
+
+    odpowiedz = ("Oto przepis na omlet, np. z pomidorami. Potrzebujesz ok. 3 jajek i 0.5 szklanki mleka! "
+                 "Kroki:\n1. Roztrzep jajka.\n2. Smaż ok. 5 min. na maśle. Smacznego…")
+    segmentator = SegmentatorZdan()
+    for i in range(0, len(odpowiedz), 7):  # udawane tokeny po 7 znaków
+        for zdanie in segmentator.dodaj(odpowiedz[i:i + 7]):
+            print(f"  → {zdanie!r}")
+    for zdanie in segmentator.zakoncz():
+        print(f"  → {zdanie!r} (koniec)")
+
+    class MockTTS:
+        def mow_tekstem(self, tekst):
+            time.sleep(0.2)
+            print(f"  [MOCK TTS]: {tekst}")
+
+    def tokeny():
+        for slowo in odpowiedz.split(" "):
+            time.sleep(0.05)
+            yield slowo + " "
+
+    print("\n🧪 Strumień → TTS")
+    mow_strumieniowo(tokeny(), MockTTS())
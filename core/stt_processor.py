@@ -7,7 +7,101 @@
 # ===================================================================
 
 import time
+import threading
 from typing import Optional, Dict, Any
+from core.leksykon import wskaznik_oov
+from core.automat_slow import analizuj
+
+# ===================================================================
+# BRAMKA KOREKTY - czy transkrypcja w ogóle wymaga LLM
+# ===================================================================
+
+# Progi pewności faster-whisper (średni log-prob tokenów segmentu)
+PROG_LOGPROB_PEWNY = -0.35      # powyżej: transkrypcja pewna
+PROG_LOGPROB_NIEPEWNY = -0.8    # poniżej: korekta zawsze
+PROG_NO_SPEECH = 0.4            # powyżej: podejrzenie szumu/halucynacji
+PROG_OOV_PEWNY = 0.34           # pewne STT toleruje pojedyncze nieznane słowo (imiona, nazwy)
+PROG_OOV_REGEX = 0.25           # komenda z dziką kartą ("przepis na .*") pasuje też do "przepis na hamlet"
+
+# Metadane ostatniej transkrypcji (zapisuje je silnik STT, który je zna)
+_metadane_stt = {}
+_statystyki_bramki = {"sprawdzone": 0, "pominiete_llm": 0, "powody": {}}
+_bramka_lock = threading.Lock()
+
+def zapisz_metadane_stt(tekst: str, avg_logprob: float, no_speech_prob: float):
+    """Wołane przez silnik STT po transkrypcji (np. stt_faster_whisper)"""
+    _metadane_stt.clear()
+    _metadane_stt.update(tekst=tekst.strip(), avg_logprob=avg_logprob, no_speech_prob=no_speech_prob)
+
+def _metadane_dla(tekst: str):
+    """Metadane tylko jeśli dotyczą dokładnie tego tekstu"""
+    metadane = dict(_metadane_stt)
+    return metadane if metadane.get("tekst") == tekst.strip() else None
+
+def _komenda_regex(tekst: str):
+    from core.rozumienie import KOMENDY
+    from core.dopasowanie_komend import pobierz_dopasowywacz
+    return pobierz_dopasowywacz(KOMENDY).dopasuj(tekst)
+
+def wymaga_korekty(raw_text: str, config: Dict[str, Any], oryginal: str = None,
+                   pewnosc_lokalna: float = None):
+    """
+    Decyzja bramki przed wywołaniem LLM
+
+    Sygnały (od najtańszego):
+    1. tekst pasuje do komendy z komendy_domyslne.json i prawie nie ma
+       nieznanych słów - jest zrozumiały
+    2. pewność faster-whisper (avg_logprob / no_speech_prob), jeśli dostępna
+    3. pewność korekty lokalnej (core/korektor_lokalny.py), a gdy korekta
+       lokalna jest wyłączona - odsetek słów spoza leksykonu (core/leksykon.py)
+
+    Args:
+        oryginal: transkrypcja przed korektą lokalną - do niej należą metadane STT
+        pewnosc_lokalna: najniższa pewność słowa z KorektorLokalny.popraw()
+
+    Returns:
+        (bool, str): (czy wołać LLM, powód)
+    """
+    if not config.get("stt_config", {}).get("correction_gate", True):
+        return True, "bramka wyłączona"
+
+    # Niepewny dekoder zawsze idzie do LLM - także gdy (poprawiony) tekst wygląda jak komenda
+    metadane = _metadane_dla(oryginal or raw_text)
+    if metadane is not None and (metadane["no_speech_prob"] > PROG_NO_SPEECH or
+                                 metadane["avg_logprob"] < PROG_LOGPROB_NIEPEWNY):
+        return True, f"niepewne STT (logprob {metadane['avg_logprob']:.2f})"
+
+    oov, nieznane = wskaznik_oov(raw_text)
+    if oov <= PROG_OOV_REGEX and _komenda_regex(raw_text):
+        return False, "komenda regex"
+
+    if metadane is not None and metadane["avg_logprob"] >= PROG_LOGPROB_PEWNY and oov <= PROG_OOV_PEWNY:
+        return False, "pewne STT"
+
+    if pewnosc_lokalna is not None:
+        from core.korektor_lokalny import PROG_PEWNOSCI
+        if pewnosc_lokalna >= PROG_PEWNOSCI:
+            return False, "korekta lokalna pewna"
+        return True, f"niepewna korekta lokalna ({pewnosc_lokalna:.2f}) {nieznane[:3]}"
+    if oov == 0.0:
+        return False, "wszystkie słowa znane"
+    return True, f"OOV {oov:.2f} {nieznane[:3]}"
+
+def _zapisz_decyzje(wolaj_llm: bool, powod: str):
+    klucz = powod.split(" (")[0] if not wolaj_llm else "korekta LLM"
+    with _bramka_lock:
+        _statystyki_bramki["sprawdzone"] += 1
+        _statystyki_bramki["pominiete_llm"] += int(not wolaj_llm)
+        _statystyki_bramki["powody"][klucz] = _statystyki_bramki["powody"].get(klucz, 0) + 1
+
+def statystyki_bramki() -> Dict[str, Any]:
+    """Ile wywołań LLM korekty uniknięto i dlaczego"""
+    with _bramka_lock:
+        return {
+            "sprawdzone": _statystyki_bramki["sprawdzone"],
+            "pominiete_llm": _statystyki_bramki["pominiete_llm"],
+            "powody": dict(_statystyki_bramki["powody"])
+        }
 
 def popraw_stt_uniwersalny(raw_text: str, config: Dict[str, Any], context_type: str = "general") -> str:
     """
@@ -29,6 +123,26 @@ def popraw_stt_uniwersalny(raw_text: str, config: Dict[str, Any], context_type:
         - "finance": Kontekst finansowy
     """
     
+    # Korekta lokalna (słownik pomyłek, polskie znaki, SymSpell kontekstu - mikrosekundy);
+    # stosuje tylko pewne poprawki, a jej pewność jest sygnałem bramki
+    poprawiony, pewnosc, zmiany = raw_text, None, []
+    if config.get("stt_config", {}).get("local_correction", True):
+        from core.korektor_lokalny import pobierz_korektor
+        poprawiony, pewnosc, zmiany = pobierz_korektor().popraw(raw_text, context_type)
+        if zmiany:
+            print(f"🔤 STT poprawiony lokalnie: '{raw_text}' → '{poprawiony}' {[(z[0], z[1]) for z in zmiany]}")
+    
+    # Bramka: czysta transkrypcja nie potrzebuje rundy do LLM
+    wolaj_llm, powod = wymaga_korekty(poprawiony, config, oryginal=raw_text, pewnosc_lokalna=pewnosc)
+    if not wolaj_llm:
+        powod = "korekta lokalna" if zmiany else powod
+        _zapisz_decyzje(False, powod)
+        statystyki = statystyki_bramki()
+        print(f"⚡ STT bez korekty LLM ({powod}) - uniknięto {statystyki['pominiete_llm']}/{statystyki['sprawdzone']} wywołań")
+        return poprawiony
+    # LLM dostaje oryginalną transkrypcję (bez lokalnych podmian)
+    _zapisz_decyzje(True, powod)
+    
     # Import tylko gdy potrzebny (avoid circular imports)
     from core.rozumienie import zapytaj_llm_safe
     
@@ -218,47 +332,8 @@ def detect_context_auto(text: str) -> str:
         str: Wykryty kontekst
     """
     
-    text_lower = text.lower()
-    
-    # Cooking keywords
-    cooking_keywords = [
-        "przepis", "gotować", "ugotować", "smażyć", "piec", "upiec", 
-        "składniki", "jajka", "pomidor", "cebula", "masło", "mąka",
-        "kalorie", "omlet", "zupa", "sałatka", "mam", "potrzebuję"
-    ]
-    
-    # Calendar keywords  
-    calendar_keywords = [
-        "spotkanie", "termin", "godzina", "dzisiaj", "jutro", "wczoraj",
-        "poniedziałek", "wtorek", "środa", "czwartek", "piątek", "sobota", "niedziela",
-        "stycznia", "lutego", "marca", "kwietnia", "maja", "czerwca"
-    ]
-    
-    # Smart home keywords
-    smarthome_keywords = [
-        "włącz", "wyłącz", "ustaw", "temperatura", "światło", "muzyka",
-        "głośność", "klimatyzacja", "ogrzewanie", "rolety", "alarm"
-    ]
-    
-    # Finance keywords
-    finance_keywords = [
-        "przelew", "saldo", "konto", "bank", "złotych", "euro", "dolar",
-        "zapłać", "rachunek", "faktury", "kredyt", "oszczędności"
-    ]
-    
-    # Count matches
-    cooking_score = sum(1 for kw in cooking_keywords if kw in text_lower)
-    calendar_score = sum(1 for kw in calendar_keywords if kw in text_lower)  
-    smarthome_score = sum(1 for kw in smarthome_keywords if kw in text_lower)
-    finance_score = sum(1 for kw in finance_keywords if kw in text_lower)
-    
-    # Return context with highest score
-    scores = {
-        "cooking": cooking_score,
-        "calendar": calendar_score, 
-        "smart_home": smarthome_score,
-        "finance": finance_score
-    }
+    # Count matches - wszystkie listy słów w jednym przejściu (core/automat_slow.py)
+    scores = analizuj(text)["konteksty"]
     
     max_context = max(scores, key=scores.get)
     
@@ -8,8 +8,62 @@
 # ===================================================================
 
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from typing import Dict, Any, List, Optional, Tuple
 from core.stt_processor import popraw_stt_uniwersalny, detect_context_auto
+from core.automat_slow import analizuj, rdzen
+
+# ===================================================================
+# ORKIESTRACJA ETAPÓW - korekta STT i RAG równolegle
+# ===================================================================
+
+# Domyślne terminy etapów (nadpisywane przez config["pipeline_config"])
+TERMIN_KOREKTY_S = 6.0
+TERMIN_RAG_S = 8.0
+
+# Wspólna pula wątków dla etapów (korekta STT + RAG na surowym tekście)
+_etapy = ThreadPoolExecutor(max_workers=4, thread_name_prefix="etap")
+
+def _termin(config: Dict[str, Any], klucz: str, domyslny: float) -> float:
+    return float(config.get("pipeline_config", {}).get(klucz, domyslny))
+
+def _wynik_etapu(future, termin_s: float, nazwa: str, domyslny):
+    """
+    Wynik etapu w terminie albo wartość domyślna
+
+    Etap po terminie jest anulowany, jeśli jeszcze nie ruszył; działającego
+    wątku nie da się przerwać - etap kończy się w tle, a jego wynik jest pomijany.
+    """
+    try:
+        return future.result(timeout=termin_s)
+    except FuturesTimeoutError:
+        future.cancel()
+        print(f"⏰ Etap '{nazwa}' przekroczył termin {termin_s:.1f}s - pomijam")
+    except Exception as e:
+        print(f"❌ Etap '{nazwa}' zakończony błędem: {e}")
+    return domyslny
+
+def rag_keywords_signature(text: str, context: str) -> frozenset:
+    """
+    Słowa kluczowe, od których zależy wynik query_universal_rag
+
+    Ten sam podpis dla tekstu surowego i poprawionego = ten sam wynik RAG,
+    więc zapytania nie trzeba powtarzać.
+    """
+    extractors = {
+        "cooking": extract_cooking_keywords,
+        "smart_home": extract_smarthome_keywords,
+        "calendar": extract_calendar_keywords,
+        "finance": extract_finance_keywords
+    }
+    # Korekta często dokłada tylko interpunkcję ("omlet" → "omlet,") - to te same słowa
+    def _keywords(extract):
+        return {kw.strip(".,!?;:\"'()") for kw in extract(text)} - {""}
+
+    if context in extractors:
+        return frozenset(_keywords(extractors[context]))
+    # general (i nieznane) - przeszukiwane są wszystkie bazy
+    return frozenset((ctx, kw) for ctx, extract in extractors.items() for kw in _keywords(extract))
 
 # ===================================================================
 # GŁÓWNA FUNKCJA UNIWERSALNEGO ASYSTENTA
@@ -40,45 +94,54 @@ def universal_intelligent_assistant(voice_input: str, config: Dict[str, Any], tt
         detected_context = detect_context_auto(voice_input)
         print(f"🔍 Wykryty kontekst: {detected_context.upper()}")
         
-        # === KROK 2: STT POST-PROCESSING ===
-        print(f"🔧 Krok 1/3: STT Post-processing ({detected_context})...")
-        corrected_text = popraw_stt_uniwersalny(voice_input, config, detected_context)
+        # === KROK 2+3: STT POST-PROCESSING i RAG (surowy tekst) RÓWNOLEGLE ===
+        print(f"🔧 Krok 1/3: STT Post-processing ({detected_context}) + 🔍 Krok 2/3: Universal RAG Query...")
+        korekta = _etapy.submit(popraw_stt_uniwersalny, voice_input, config, detected_context)
+        rag_surowy = _etapy.submit(query_universal_rag, voice_input, detected_context, config)
+        
+        corrected_text = _wynik_etapu(korekta, _termin(config, "termin_korekty_s", TERMIN_KOREKTY_S),
+                                      "korekta STT", voice_input)
         
         if corrected_text != voice_input:
             print(f"✅ STT poprawiony: '{voice_input}' → '{corrected_text}'")
         else:
             print(f"✅ STT bez zmian: '{corrected_text}'")
         
-        # === KROK 3: RAG QUERY (UNIWERSALNY) ===
-        print(f"🔍 Krok 2/3: Universal RAG Query...")
-        rag_data = query_universal_rag(corrected_text, detected_context, config)
+        termin_rag = _termin(config, "termin_rag_s", TERMIN_RAG_S)
+        if (corrected_text == voice_input or
+                rag_keywords_signature(corrected_text, detected_context) == rag_keywords_signature(voice_input, detected_context)):
+            # Korekta nie zmieniła słów kluczowych - wynik RAG z surowego tekstu jest aktualny
+            print("♻️ RAG: te same słowa kluczowe po korekcie - używam wyniku z surowego tekstu")
+            rag_data = _wynik_etapu(rag_surowy, termin_rag, "RAG", [])
+        else:
+            rag_surowy.cancel()
+            print("🔍 RAG: korekta zmieniła słowa kluczowe - zapytanie dla poprawionego tekstu")
+            rag_data = _wynik_etapu(_etapy.submit(query_universal_rag, corrected_text, detected_context, config),
+                                    termin_rag, "RAG", [])
         
         # === KROK 4: LLM + DYNAMIC CONTEXT ===
         print(f"🧠 Krok 3/3: LLM + Dynamic Context...")
         
         if rag_data:
             print(f"✅ RAG HIT: Znaleziono {len(rag_data)} wyników dla {detected_context}")
-            response = llm_with_rag_mode_universal(corrected_text, rag_data, detected_context, config)
+            response = llm_with_rag_mode_universal(corrected_text, rag_data, detected_context, config, tts_module)
         else:
             print(f"⚠️ RAG MISS: Brak danych w bazie - tryb LLM solo dla {detected_context}")
-            response = llm_solo_mode_universal(corrected_text, detected_context, config)
+            response = llm_solo_mode_universal(corrected_text, detected_context, config, tts_module)
         
         # === FINALIZACJA ===
+        # Odpowiedź została już wypowiedziana (zdanie po zdaniu) w trybie LLM
         elapsed_time = time.time() - start_time
         print(f"🎯 Odpowiedź wygenerowana ({elapsed_time:.1f}s)")
         
-        # TTS Response
-        if tts_module and hasattr(tts_module, 'mow'):
-            tts_module.mow(response)
-        
         return response
         
     except Exception as e:
         print(f"❌ Błąd Universal Assistant: {e}")
         fallback_response = get_context_fallback_message(detected_context)
         
-        if tts_module and hasattr(tts_module, 'mow'):
-            tts_module.mow(fallback_response)
+        if tts_module and hasattr(tts_module, 'mow_tekstem'):
+            tts_module.mow_tekstem(fallback_response)
             
         return fallback_response
 
@@ -130,19 +193,27 @@ def query_universal_rag(query_text: str, context: str, config: Dict[str, Any]) -
         return []
 
 def query_cooking_rag(query_text: str, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """RAG dla kontekstu kulinarnego"""
+    """RAG dla kontekstu kulinarnego - zainicjalizowany RecipeRAG z core.rozumienie"""
     try:
-        from rag.rag_engine import RagEngine
-        rag = RagEngine(config.get("rag_config", {}))
-        
-        keywords = extract_cooking_keywords(query_text)
+        # Import leniwy: core.rozumienie importuje ten moduł
+        from core.rozumienie import rag_adapter
+        if rag_adapter is None:
+            print("⚠️ Cooking RAG niedostępny")
+            return []
+        
+        # Składniki z bazy + słowa kulinarne z leksykonu, jedno na rdzeń - bez słów
+        # wypełniających ("mam", "zrobić") i bez podwójnego liczenia odmian ("jajko", "jajka")
+        analiza = analizuj(query_text)
+        keywords = {}
+        for slowo in analiza["skladniki"] + analiza["rag"]["cooking"]:
+            keywords.setdefault(rdzen(slowo), slowo)
+        keywords = list(keywords.values())
         print(f"🍳 Cooking RAG keywords: {keywords}")
+        if not keywords:
+            return []
         
-        results = []
-        for keyword in keywords:
-            search_results = rag.search_relevant(keyword)
-            if search_results:
-                results.extend(search_results)
+        # Wszystkie słowa kluczowe w jednym zapytaniu
+        results = rag_adapter.search_relevant_many(keywords, max_results=5)
         
         return remove_duplicates(results)[:5]
         
@@ -258,50 +329,26 @@ def query_general_rag(query_text: str, config: Dict[str, Any]) -> List[Dict[str,
 
 def extract_cooking_keywords(text: str) -> List[str]:
     """Ekstraktuje słowa kluczowe dla kontekstu kulinarnego"""
-    ingredients = [
-        'jajko', 'jajka', 'pomidor', 'pomidory', 'cebula', 'czosnek',
-        'masło', 'olej', 'mąka', 'cukier', 'sól', 'pieprz', 'marchew'
-    ]
-    
-    dishes = ['omlet', 'jajecznica', 'zupa', 'kotlet', 'sałatka']
-    actions = ['ugotować', 'smażyć', 'przepis', 'składniki']
-    
-    return extract_keywords_from_lists(text, ingredients + dishes + actions)
+    return extract_context_keywords(text, "cooking")
 
 def extract_smarthome_keywords(text: str) -> List[str]:
     """Ekstraktuje słowa kluczowe dla smart home"""
-    devices = ['światło', 'lampa', 'klimatyzacja', 'telewizor', 'muzyka', 'alarm']
-    rooms = ['salon', 'kuchnia', 'sypialnia', 'łazienka', 'biuro']
-    actions = ['włącz', 'wyłącz', 'ustaw', 'zmień', 'kontroluj']
-    
-    return extract_keywords_from_lists(text, devices + rooms + actions)
+    return extract_context_keywords(text, "smart_home")
 
 def extract_calendar_keywords(text: str) -> List[str]:
     """Ekstraktuje słowa kluczowe dla kalendarza"""
-    time_words = ['spotkanie', 'termin', 'dzisiaj', 'jutro', 'wczoraj', 'godzina']
-    days = ['poniedziałek', 'wtorek', 'środa', 'czwartek', 'piątek', 'sobota', 'niedziela']
-    actions = ['dodaj', 'usuń', 'przenieś', 'sprawdź', 'przypomnij']
-    
-    return extract_keywords_from_lists(text, time_words + days + actions)
+    return extract_context_keywords(text, "calendar")
 
 def extract_finance_keywords(text: str) -> List[str]:
     """Ekstraktuje słowa kluczowe dla finansów"""
-    financial = ['saldo', 'przelew', 'konto', 'pieniądze', 'złotych', 'euro']
-    actions = ['sprawdź', 'wyślij', 'zapłać', 'transfer', 'historia']
-    
-    return extract_keywords_from_lists(text, financial + actions)
+    return extract_context_keywords(text, "finance")
 
-def extract_keywords_from_lists(text: str, keyword_lists: List[str]) -> List[str]:
-    """Helper function do ekstrakcji keywords"""
-    text_lower = text.lower()
-    found_keywords = []
-    
-    for keyword in keyword_lists:
-        if keyword in text_lower:
-            found_keywords.append(keyword)
+def extract_context_keywords(text: str, context: str) -> List[str]:
+    """Helper function do ekstrakcji keywords (słowa z core/leksykon.py w formie podstawowej)"""
+    found_keywords = list(analizuj(text)["rag"][context])
     
     # Dodaj także pojedyncze słowa
-    words = text_lower.split()
+    words = text.lower().split()
     for word in words:
         if len(word) > 3 and word not in found_keywords:
             found_keywords.append(word)
@@ -312,9 +359,42 @@ def extract_keywords_from_lists(text: str, keyword_lists: List[str]) -> List[str
 # UNIWERSALNY LLM SYSTEM
 # ===================================================================
 
-def llm_with_rag_mode_universal(user_query: str, rag_data: List[Dict], context: str, config: Dict[str, Any]) -> str:
+def _odpowiedz_llm(prompt: str, context: str, config: Dict[str, Any], tts_module=None) -> str:
+    """
+    Zapytanie LLM + wypowiedź odpowiedzi
+
+    Przy llm_config.stream pierwsze zdanie trafia do TTS, zanim LLM
+    skończy generować; gdy strumień nie ruszy - zwykłe zapytanie.
+    """
+    from core.rozumienie import zapytaj_llm_safe, zapytaj_llm_strumieniowo, strumieniowanie_wlaczone
+    from core.strumien_mowy import mow_strumieniowo
+    
+    mowi = tts_module is not None and hasattr(tts_module, 'mow_tekstem')
+    
+    if mowi and strumieniowanie_wlaczone(config):
+        try:
+            response = mow_strumieniowo(zapytaj_llm_strumieniowo(prompt, config), tts_module)
+            if response:
+                return clean_llm_response(response)
+        except Exception as e:
+            print(f"⚠️ Strumieniowanie niedostępne ({e}) - zwykłe zapytanie")
+    
+    try:
+        response = clean_llm_response(zapytaj_llm_safe(prompt, config))
+    except Exception as e:
+        print(f"❌ Błąd LLM ({context}): {e}")
+        response = get_context_error_message(context)
+    
+    if mowi:
+        tts_module.mow_tekstem(response)
+    return response
+
+def llm_with_rag_mode_universal(user_query: str, rag_data: List[Dict], context: str, config: Dict[str, Any],
+                                tts_module=None) -> str:
     """
     LLM w trybie z danymi RAG - uniwersalny dla wszystkich kontekstów
+    
+    Z tts_module odpowiedź jest od razu wypowiadana (strumieniowo, gdy włączone)
     """
     
     # Sformatuj dane RAG
@@ -340,16 +420,9 @@ INSTRUKCJE:
 
 ODPOWIEDŹ:"""
 
-    try:
-        from core.rozumienie import zapytaj_llm_safe
-        response = zapytaj_llm_safe(prompt, config)
-        return clean_llm_response(response)
-        
-    except Exception as e:
-        print(f"❌ Błąd LLM RAG mode ({context}): {e}")
-        return get_context_error_message(context)
+    return _odpowiedz_llm(prompt, context, config, tts_module)
 
-def llm_solo_mode_universal(user_query: str, context: str, config: Dict[str, Any]) -> str:
+def llm_solo_mode_universal(user_query: str, context: str, config: Dict[str, Any], tts_module=None) -> str:
     """
     LLM w trybie solo (bez RAG) - uniwersalny dla wszystkich kontekstów
     """
@@ -373,14 +446,7 @@ INSTRUKCJE:
 
 ODPOWIEDŹ:"""
 
-    try:
-        from core.rozumienie import zapytaj_llm_safe
-        response = zapytaj_llm_safe(prompt, config)
-        return clean_llm_response(response)
-        
-    except Exception as e:
-        print(f"❌ Błąd LLM solo mode ({context}): {e}")
-        return get_context_error_message(context)
+    return _odpowiedz_llm(prompt, context, config, tts_module)
 
 # ===================================================================
 # CONTEXT-SPECIFIC HELPERS
@@ -419,16 +485,19 @@ def get_context_fallback_intro(context: str) -> str:
     }
     return intros.get(context, "Brak danych w bazie, ale mogę pomóc z doświadczenia.")
 
+# Stałe komunikaty - także wstępnie syntezowane do cache TTS przy starcie
+CONTEXT_FALLBACK_MESSAGES = {
+    "cooking": "Przepraszam, mam problem z asystentem kulinarnym. Spróbuj ponownie.",
+    "smart_home": "Przepraszam, mam problem z kontrolą domu. Sprawdź połączenie.",
+    "calendar": "Przepraszam, mam problem z kalendarzem. Spróbuj ponownie.",
+    "finance": "Przepraszam, mam problem z danymi finansowymi. Sprawdź bezpieczeństwo.",
+    "general": "Przepraszam, wystąpił problem techniczny. Spróbuj ponownie."
+}
+DEFAULT_FALLBACK_MESSAGE = "Przepraszam, wystąpił problem. Spróbuj ponownie."
+
 def get_context_fallback_message(context: str) -> str:
     """Zwraca wiadomość fallback przy błędzie"""
-    messages = {
-        "cooking": "Przepraszam, mam problem z asystentem kulinarnym. Spróbuj ponownie.",
-        "smart_home": "Przepraszam, mam problem z kontrolą domu. Sprawdź połączenie.",
-        "calendar": "Przepraszam, mam problem z kalendarzem. Spróbuj ponownie.",
-        "finance": "Przepraszam, mam problem z danymi finansowymi. Sprawdź bezpieczeństwo.",
-        "general": "Przepraszam, wystąpił problem techniczny. Spróbuj ponownie."
-    }
-    return messages.get(context, "Przepraszam, wystąpił problem. Spróbuj ponownie.")
+    return CONTEXT_FALLBACK_MESSAGES.get(context, DEFAULT_FALLBACK_MESSAGE)
 
 def get_context_error_message(context: str) -> str:
     """Zwraca wiadomość błędu dla kontekstu"""
@@ -459,7 +528,7 @@ def format_rag_item_by_context(item: Dict, context: str, index: int) -> str:
     """Formatuje pojedynczy item RAG według kontekstu"""
     
     if context == "cooking":
-        name = item.get('name', item.get('przepis', f'Przepis {index}'))
+        name = item.get('title', item.get('name', item.get('przepis', f'Przepis {index}')))
         calories = item.get('calories', item.get('kalorie', ''))
         ingredients = item.get('ingredients', item.get('skladniki', ''))
         
@@ -580,7 +649,7 @@ def test_universal_assistant():
     
     # Mock TTS
     class MockTTS:
-        def mow(self, text):
+        def mow_tekstem(self, text):
             print(f"🔊 TTS: {text[:100]}...")
     
     mock_tts = MockTTS()
@@ -157,6 +157,7 @@ recognition_methods = {
     "regex_only": "🏃‍♂️ Tylko Regex (najszybsze)",
     "regex_plus_simple": "🤖 Regex + Prosty LLM (standardowe)", 
     "regex_plus_few_shot": "🧠 Regex + Few-shot LLM (najlepsze)",
+    "regex_plus_embedding": "⚡ Regex + Embeddings lokalnie (LLM tylko przy niepewności)",
 }
 
 current_method = recognition_config.get("method", "regex_plus_simple")
@@ -171,6 +172,7 @@ recognition_method = st.selectbox(
     • Regex Only: Tylko wzorce - bardzo szybkie, ograniczone
     • Regex + Simple: Wzorce + prosty LLM - dobry kompromis  
     • Regex + Few-shot: Wzorce + inteligentny LLM - najlepsze rozumienie
+    • Regex + Embeddings: Wzorce + lokalny klasyfikator - milisekundy, LLM tylko gdy niepewny
     """
 )
 
@@ -207,6 +209,8 @@ elif recognition_method == "regex_plus_simple":
     st.info("🔄 **Regex + Simple LLM**: Standardowa metoda. Regex + prosty prompt do LLM")
 elif recognition_method == "regex_plus_few_shot":
     st.success("🎯 **Regex + Few-shot LLM**: Najlepsza metoda. Regex + inteligentny LLM z przykładami")
+elif recognition_method == "regex_plus_embedding":
+    st.info("⚡ **Regex + Embeddings**: Regex + lokalny klasyfikator (MiniLM). Do LLM trafiają tylko teksty poniżej progu pewności")
 
 # ===================================================================
 # 🔧 SEKCJA 6: KOMPONENTY SYSTEMU - STT, TTS
@@ -9,12 +9,22 @@
 import requests
 import json
 import time
+import threading
 from typing import Dict, Any, Optional
+from core.http_klient import pobierz_sesje
 
 class OllamaError(Exception):
     """Błędy związane z Ollama"""
     pass
 
+# Serwer lokalny - jedna próba ponowienia wystarczy, reszta to rewalidacja
+sesja = pobierz_sesje("ollama", retry_total=1)
+
+# Cache walidacji: base_url → {"modele": set, "sprawdzono": czas}
+TTL_WALIDACJI_S = 300
+_walidacja = {}
+_walidacja_lock = threading.Lock()
+
 def sprawdz_polaczenie(base_url: str = "http://localhost:11434") -> bool:
     """
     Sprawdza czy serwer Ollama działa
@@ -26,7 +36,7 @@ def sprawdz_polaczenie(base_url: str = "http://localhost:11434") -> bool:
         bool: True jeśli serwer odpowiada
     """
     try:
-        response = requests.get(f"{base_url}/api/tags", timeout=5)
+        response = sesja.get(f"{base_url}/api/tags", timeout=5)
         return response.status_code == 200
     except requests.RequestException:
         return False
@@ -42,13 +52,44 @@ def lista_modeli(base_url: str = "http://localhost:11434") -> list:
         list: Lista nazw modeli
     """
     try:
-        response = requests.get(f"{base_url}/api/tags", timeout=10)
+        response = sesja.get(f"{base_url}/api/tags", timeout=10)
         response.raise_for_status()
         
         data = response.json()
-        return [model["name"] for model in data.get("models", [])]
+        modele = [model["name"] for model in data.get("models", [])]
     except requests.RequestException as e:
         raise OllamaError(f"Nie można pobrać listy modeli: {e}")
+    
+    with _walidacja_lock:
+        _walidacja[base_url] = {"modele": set(modele), "sprawdzono": time.monotonic()}
+    return modele
+
+def _zwaliduj(base_url: str, model: str, wymus: bool = False):
+    """
+    Sprawdza serwer i dostępność modelu - jednym GET /api/tags,
+    i tylko gdy brak świeżego wyniku (TTL) albo po błędzie (wymus=True)
+    """
+    with _walidacja_lock:
+        stan = _walidacja.get(base_url)
+    if (not wymus and stan and model in stan["modele"]
+            and time.monotonic() - stan["sprawdzono"] < TTL_WALIDACJI_S):
+        return
+    
+    try:
+        dostepne_modele = lista_modeli(base_url)
+    except OllamaError:
+        raise OllamaError("Serwer Ollama nie odpowiada. Sprawdź czy działa: ollama serve")
+    
+    if model not in dostepne_modele:
+        raise OllamaError(f"Model '{model}' nie jest dostępny. Dostępne: {dostepne_modele}")
+
+def uniewaznij_walidacje(base_url: str = None):
+    """Wymusza ponowne sprawdzenie serwera przy następnym zapytaniu"""
+    with _walidacja_lock:
+        if base_url is None:
+            _walidacja.clear()
+        else:
+            _walidacja.pop(base_url, None)
 
 def ollama_generate(prompt: str, config: Dict[str, Any]) -> str:
     """
@@ -72,14 +113,8 @@ def ollama_generate(prompt: str, config: Dict[str, Any]) -> str:
     max_tokens = llm_config.get("max_tokens", 2048)
     temperature = llm_config.get("temperature", 0.7)
     
-    # Sprawdź połączenie
-    if not sprawdz_polaczenie(base_url):
-        raise OllamaError("Serwer Ollama nie odpowiada. Sprawdź czy działa: ollama serve")
-    
-    # Sprawdź czy model istnieje
-    dostepne_modele = lista_modeli(base_url)
-    if model not in dostepne_modele:
-        raise OllamaError(f"Model '{model}' nie jest dostępny. Dostępne: {dostepne_modele}")
+    # Serwer i model sprawdzane raz (cache z TTL) - zwykła tura to jedno zapytanie HTTP
+    _zwaliduj(base_url, model)
     
     # Przygotuj żądanie
     url = f"{base_url}/api/generate"
@@ -98,7 +133,10 @@ def ollama_generate(prompt: str, config: Dict[str, Any]) -> str:
     try:
         print(f"🧠 Pytam Ollama {model} (local)...")
         
-        response = requests.post(url, json=data, timeout=60)
+        response = sesja.post(url, json=data, timeout=60)
+        if response.status_code == 404:
+            # Model zniknął (np. ollama rm) - sprawdź od nowa, żeby podać dostępne
+            _zwaliduj(base_url, model, wymus=True)
         response.raise_for_status()
         
         result = response.json()
@@ -120,6 +158,72 @@ def ollama_generate(prompt: str, config: Dict[str, Any]) -> str:
     except requests.exceptions.Timeout:
         raise OllamaError("Timeout - model zbyt długo generuje odpowiedź")
     except requests.exceptions.ConnectionError:
+        uniewaznij_walidacje(base_url)
+        raise OllamaError("Brak połączenia z serwerem Ollama")
+    except requests.exceptions.HTTPError as e:
+        raise OllamaError(f"Błąd HTTP: {e}")
+    except json.JSONDecodeError:
+        raise OllamaError("Nieprawidłowa odpowiedź JSON z serwera")
+
+def ollama_generate_stream(prompt: str, config: Dict[str, Any]):
+    """
+    Generator fragmentów odpowiedzi ("stream": true, NDJSON - obiekt na linię)
+    
+    Yields:
+        str: kolejne fragmenty tekstu w miarę generowania
+        
+    Raises:
+        OllamaError: Jeśli wystąpi błąd API
+    """
+    llm_config = config.get("llm_config", {})
+    base_url = llm_config.get("base_url", "http://localhost:11434")
+    model = llm_config.get("model", "llama3.1:8b")
+    
+    _zwaliduj(base_url, model)
+    
+    data = {
+        "model": model,
+        "prompt": prompt,
+        "stream": True,
+        "options": {
+            "num_predict": llm_config.get("max_tokens", 2048),
+            "temperature": llm_config.get("temperature", 0.7)
+        }
+    }
+    
+    start_time = time.time()
+    print(f"🧠 Pytam Ollama {model} strumieniowo (local)...")
+    
+    try:
+        response = sesja.post(f"{base_url}/api/generate", json=data, timeout=60, stream=True)
+        if response.status_code == 404:
+            _zwaliduj(base_url, model, wymus=True)
+        response.raise_for_status()
+        
+        with response:
+            pierwszy = True
+            for linia in response.iter_lines():
+                if not linia:
+                    continue
+                wynik = json.loads(linia)
+                if "error" in wynik:
+                    raise OllamaError(f"Błąd modelu: {wynik['error']}")
+                
+                fragment = wynik.get("response", "")
+                if fragment:
+                    if pierwszy:
+                        print(f"⚡ Ollama: pierwszy token po {time.time() - start_time:.2f}s")
+                        pierwszy = False
+                    yield fragment
+                if wynik.get("done"):
+                    break
+        
+        print(f"✅ Ollama: strumień zakończony w {time.time() - start_time:.1f}s")
+        
+    except requests.exceptions.Timeout:
+        raise OllamaError("Timeout - model zbyt długo generuje odpowiedź")
+    except requests.exceptions.ConnectionError:
+        uniewaznij_walidacje(base_url)
         raise OllamaError("Brak połączenia z serwerem Ollama")
     except requests.exceptions.HTTPError as e:
         raise OllamaError(f"Błąd HTTP: {e}")
@@ -4,6 +4,18 @@ import json
 import os
 import time
 from datetime import datetime
+from core import konfiguracja
+from core.http_klient import pobierz_sesje, ostatni_pomiar, opis_pomiaru
+
+API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+class OpenRouterError(Exception):
+    """Błędy zapytań strumieniowych do OpenRouter"""
+    pass
+
+# Jedna sesja na cały proces: keep-alive + pula połączeń + ponowienia z backoffem
+# (korekta STT, klasyfikacja i odpowiedź w jednej turze idą tym samym połączeniem)
+sesja = pobierz_sesje("openrouter")
 
 # === Cache dla odpowiedzi (opcjonalne) ===
 response_cache = {}
@@ -16,16 +28,10 @@ def _get_api_key():
     if api_key:
         return api_key
     
-    # 2. secure.json
-    try:
-        if os.path.exists("config/secure.json"):
-            with open("config/secure.json", "r", encoding="utf-8") as f:
-                secure = json.load(f)
-                api_key = secure.get("api_key")
-                if api_key:
-                    return api_key
-    except Exception as e:
-        print(f"⚠️ Błąd odczytu secure.json: {e}")
+    # 2. secure.json (snapshot z core.konfiguracja - bez odczytu przy każdym zapytaniu)
+    api_key = konfiguracja.sekret("api_key")
+    if api_key:
+        return api_key
     
     # 3. Streamlit secrets
     try:
@@ -128,14 +134,15 @@ def odpowiedz(prompt, config, conversation_history=None, use_cache=False):
     print(f"🧠 Pytam {data['model']} (tokens: {data['max_tokens']})...")
     
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions", 
+        response = sesja.post(
+            API_URL, 
             headers=headers, 
             json=data,
             timeout=30  # 30 sekund timeout
         )
         
         elapsed = time.time() - start_time
+        ostatni_czas_http = ostatni_pomiar()
         
         if response.ok:
             result = response.json()
@@ -151,7 +158,7 @@ def odpowiedz(prompt, config, conversation_history=None, use_cache=False):
                     prompt_tokens = usage.get("prompt_tokens", 0)
                     completion_tokens = usage.get("completion_tokens", 0)
                     
-                    print(f"✅ Odpowiedź w {elapsed:.1f}s (🔤{prompt_tokens}→{completion_tokens} tokens)")
+                    print(f"✅ Odpowiedź w {elapsed:.1f}s (🔤{prompt_tokens}→{completion_tokens} tokens; {opis_pomiaru(ostatni_czas_http)})")
                     
                     # Zapisz do cache
                     if use_cache:
@@ -186,6 +193,71 @@ def odpowiedz(prompt, config, conversation_history=None, use_cache=False):
         print(f"❌ {error_msg}")
         return error_msg
 
+def odpowiedz_strumieniowo(prompt, config, conversation_history=None):
+    """
+    Generator fragmentów odpowiedzi (Server-Sent Events, "stream": true)
+    
+    Yields:
+        str: kolejne fragmenty tekstu w miarę generowania
+        
+    Raises:
+        OpenRouterError: brak klucza, błąd HTTP lub błąd zwrócony w strumieniu
+    """
+    api_key = _get_api_key()
+    if not api_key:
+        raise OpenRouterError("brak klucza API OpenRouter")
+    
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "HTTP-Referer": "https://github.com/your-repo",
+        "X-Title": "AIA Assistant"
+    }
+    data = _prepare_request_data(_prepare_messages(prompt, config, conversation_history), config)
+    data["stream"] = True
+    
+    print(f"🧠 Pytam {data['model']} strumieniowo (tokens: {data['max_tokens']})...")
+    start_time = time.time()
+    
+    try:
+        response = sesja.post(API_URL, headers=headers, json=data, timeout=30, stream=True)
+    except requests.RequestException as e:
+        raise OpenRouterError(f"{type(e).__name__}: {e}")
+    
+    with response:
+        if not response.ok:
+            try:
+                detail = response.json().get("error", {}).get("message", response.text)
+            except Exception:
+                detail = response.text[:200]
+            raise OpenRouterError(f"Błąd API OpenRouter: {response.status_code} - {detail}")
+        
+        pierwszy = True
+        for linia in response.iter_lines():
+            # Puste linie rozdzielają zdarzenia, ":" to komentarze keep-alive
+            if not linia or linia.startswith(b":"):
+                continue
+            if not linia.startswith(b"data:"):
+                continue
+            
+            dane = linia[5:].strip()
+            if dane == b"[DONE]":
+                break
+            
+            zdarzenie = json.loads(dane)
+            if "error" in zdarzenie:
+                raise OpenRouterError(zdarzenie["error"].get("message", str(zdarzenie["error"])))
+            
+            choices = zdarzenie.get("choices") or [{}]
+            fragment = choices[0].get("delta", {}).get("content")
+            if fragment:
+                if pierwszy:
+                    print(f"⚡ Pierwszy token po {time.time() - start_time:.2f}s ({opis_pomiaru()})")
+                    pierwszy = False
+                yield fragment
+    
+    print(f"✅ Strumień zakończony w {time.time() - start_time:.1f}s")
+
 def test_connection(config):
     """Testuje połączenie z OpenRouter"""
     print("🧪 Test połączenia z OpenRouter...")
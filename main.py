@@ -7,7 +7,6 @@
 # Obsługuje: cooking, smart_home, calendar, finance, general, alarms
 # ===================================================================
 
-import json
 import os
 import torch
 from stt import stt_whisper, stt_vosk, stt_google, stt_faster_whisper
@@ -15,9 +14,15 @@ from llm import llm_openrouter
 from aia_audio import nasluchiwacz
 from core import rozumienie
 from core import logger
+from core import rejestr_modeli
+from core import konfiguracja
 
 # NOWY IMPORT - Universal Intelligent Assistant
-from core.universal_intelligent_assistant import integrate_with_existing_rozumienie
+from core.universal_intelligent_assistant import integrate_with_existing_rozumienie, CONTEXT_FALLBACK_MESSAGES
+
+# Maksymalny czas czekania na modele przed pierwszym nasłuchem - potem
+# start bez nich, a model dokończy ładowanie przy pierwszym użyciu
+TERMIN_GOTOWOSCI_S = 60.0
 
 # === 0. Informacja o GPU ===
 if torch.cuda.is_available():
@@ -26,25 +31,31 @@ else:
     print("⚠️ GPU nieaktywne – przełączono na CPU")
 
 # === 1. Wczytanie konfiguracji ===
-with open("config/config.json", encoding="utf-8") as f:
-    config = json.load(f)
+# Snapshot z core.konfiguracja - zmiany z GUI są widoczne bez restartu
+config = konfiguracja.jako_dict()
 
+API_KEY_STREAMLIT = None
 try:
     import streamlit as st
-    config["api_key"] = st.secrets.get("OPENROUTER_API_KEY")
+    API_KEY_STREAMLIT = st.secrets.get("OPENROUTER_API_KEY")
     print("🔑 Klucz API pobrany z .streamlit/secrets.toml")
 except:
-    try:
-        with open("config/secure.json", encoding="utf-8") as f:
-            secure = json.load(f)
-            if isinstance(secure, dict):
-                config["api_key"] = secure.get("api_key")
-                print("🔑 Klucz API pobrany z config/secure.json")
-            else:
-                raise ValueError("secure.json nie ma formatu słownika (dict)")
-    except Exception as e:
-        print(f"❌ Brak klucza API: {e}")
-        config["api_key"] = None
+    if konfiguracja.sekret("api_key"):
+        print("🔑 Klucz API pobrany z config/secure.json")
+    else:
+        print("❌ Brak klucza API w config/secure.json")
+config["api_key"] = API_KEY_STREAMLIT or konfiguracja.sekret("api_key")
+
+def config_tury():
+    """
+    Konfiguracja jednej tury rozmowy: świeża kopia snapshotu
+
+    Kopia, bo część kodu modyfikuje config w trakcie tury (max_tokens itp.).
+    Wybór silników STT/TTS nadal wymaga restartu.
+    """
+    config_biezacy = konfiguracja.jako_dict()
+    config_biezacy["api_key"] = API_KEY_STREAMLIT or konfiguracja.sekret("api_key")
+    return config_biezacy
 
 # === 2. Tryb uruchomienia ===
 tryb = config["local_config"].get("tryb", "standardowy")
@@ -84,6 +95,13 @@ else:
 # === LLM ===
 llm = llm_openrouter
 
+# === Preload modeli w tle (reszta inicjalizacji idzie równolegle) ===
+rejestr_modeli.zaladuj_w_tle({"stt": stt, "tts": tts})
+
+# === Cache TTS: stałe frazy syntezowane w tle, potem grane z dysku ===
+if getattr(tts, "potok", None) is not None:
+    tts.potok.rozgrzej_cache(rozumienie.FRAZY_STALE + list(CONTEXT_FALLBACK_MESSAGES.values()))
+
 # === 4. Logowanie użycia komponentów ===
 print(f"📊 Logowanie komponentów systemu...")
 logger.loguj_stt_usage(stt_nazwa)
@@ -97,6 +115,11 @@ if tryb == "testowy":
     print(f"🤖 Universal AI: cooking, smart_home, calendar, finance, general")
     print("🛑 Aby zakończyć, powiedz: 'dobra stop' lub naciśnij Ctrl+C")
     
+    # Pierwsza wypowiedź ma mieć już czas ustalony, nie czas ładowania modeli
+    if not rejestr_modeli.czekaj_na_gotowosc(timeout=TERMIN_GOTOWOSCI_S):
+        print(f"⚠️ Nie wszystkie modele gotowe po {TERMIN_GOTOWOSCI_S:.0f} s "
+              f"(dokończą ładowanie przy pierwszym użyciu): {rejestr_modeli.status_modeli()}")
+    
     try:
         # ===================================================================
         # GŁÓWNA ZMIANA: Użycie Universal Intelligent Assistant
@@ -104,7 +127,7 @@ if tryb == "testowy":
         # STARE: nasluchiwacz.nasluchuj(lambda tekst: rozumienie.analizuj(tekst, config, tts), stt)
         # NOWE: Universal system z auto-detection kontekstu
         nasluchiwacz.nasluchuj(
-            lambda tekst: integrate_with_existing_rozumienie(tekst, config, tts), 
+            lambda tekst: integrate_with_existing_rozumienie(tekst, config_tury(), tts), 
             stt
         )
         
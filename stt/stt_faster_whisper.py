@@ -2,17 +2,21 @@
 import os
 import torch
 import numpy as np
-import queue
-import sounddevice as sd
 from faster_whisper import WhisperModel
-import json
+import re
+import time
+import threading
+from core import konfiguracja
+from core.stt_processor import zapisz_metadane_stt
+from aia_audio.mikrofon import pobierz_mikrofon, SAMPLERATE
+from aia_audio.detektor_mowy import nagraj_wypowiedz, Endpointer, CISZA_KONCA_MS, PRZED_MOWA_MS
 
 # === 1. Parametry ===
 SCIEZKA_MODELU = "models/faster-whisper-small"
 NAZWA_MODELU = "small"
-SAMPLERATE = 16000
-DURATION = 10  # czas nagrania w sekundach
+DURATION = 10  # maksymalna długość wypowiedzi w sekundach
 MIN_AUDIO_LENGTH = 0.5  # minimalna długość audio do transkrypcji (sekundy)
+INTERWAL_CZESCIOWY_MS = 400  # co ile ponawiać dekodowanie w trybie strumieniowym
 
 # === 2. Wykrycie GPU/CPU i precyzji ===
 if torch.cuda.is_available():
@@ -26,19 +30,23 @@ else:
 
 # === 3. Model ładowany tylko raz ===
 model = None
+_model_lock = threading.Lock()  # preload w tle i pierwsze zapytanie mogą trafić naraz
 
 def wczytaj_config():
-    """Wczytuje konfigurację STT jeśli istnieje"""
+    """Konfiguracja STT z aktualnego snapshotu (core.konfiguracja - bez odczytu z dysku)"""
     try:
-        with open("config/config.json", "r", encoding="utf-8") as f:
-            config = json.load(f)
-        stt_config = config.get("stt_config", {})
+        stt_config = konfiguracja.sekcja("stt_config")
         return {
             "duration": stt_config.get("duration", DURATION),
             "model_size": stt_config.get("model_size", NAZWA_MODELU),
             "language": stt_config.get("language", "pl"),
             "beam_size": stt_config.get("beam_size", 5),
-            "temperature": stt_config.get("temperature", 0.0)
+            "temperature": stt_config.get("temperature", 0.0),
+            "silence_ms": stt_config.get("silence_ms", CISZA_KONCA_MS),
+            "vad": stt_config.get("vad", "energia"),
+            "vad_filter": stt_config.get("vad_filter", False),
+            "streaming": stt_config.get("streaming", False),
+            "partial_interval_ms": stt_config.get("partial_interval_ms", INTERWAL_CZESCIOWY_MS)
         }
     except:
         return {
@@ -46,7 +54,12 @@ def wczytaj_config():
             "model_size": NAZWA_MODELU,
             "language": "pl",
             "beam_size": 5,
-            "temperature": 0.0
+            "temperature": 0.0,
+            "silence_ms": CISZA_KONCA_MS,
+            "vad": "energia",
+            "vad_filter": False,
+            "streaming": False,
+            "partial_interval_ms": INTERWAL_CZESCIOWY_MS
         }
 
 def zaladuj_model():
@@ -54,6 +67,12 @@ def zaladuj_model():
     if model is not None:
         return
 
+    with _model_lock:
+        if model is None:
+            _zaladuj_model()
+
+def _zaladuj_model():
+    global model
     config = wczytaj_config()
     model_size = config["model_size"]
     sciezka = f"models/faster-whisper-{model_size}"
@@ -70,13 +89,16 @@ def zaladuj_model():
 
     print(f"✅ Faster-Whisper gotowy ({URZADZENIE}, {PRECISION})")
 
-# === 4. Kolejka i callback do mikrofonu ===
-q = queue.Queue()
+def rozgrzej():
+    """Próbna transkrypcja sekundy ciszy - rozgrzewa kernele i alokatory"""
+    zaladuj_model()
+    segments, _ = model.transcribe(np.zeros(SAMPLERATE, dtype=np.float32), language="pl", beam_size=1)
+    list(segments)  # transcribe jest leniwe - dekodowanie rusza dopiero przy iteracji
 
-def callback(indata, frames, time, status):
-    if status:
-        print(f"⚠️ Błąd wejścia audio: {status}")
-    q.put(indata.copy())
+# === 4. Przetwarzanie audio ===
+# Nagranie pochodzi ze współdzielonego mikrofonu (aia_audio.mikrofon),
+# który trzyma urządzenie otwarte przez cały czas działania procesu
+WSPOLNY_MIKROFON = True
 
 def _sprawdz_poziom_audio(audio_data):
     """Sprawdza czy audio nie jest za ciche"""
@@ -98,35 +120,43 @@ def _normalizuj_audio(audio_data):
     return audio_data.astype(np.float32)
 
 # === 5. Rozpoznawanie mowy z mikrofonu ===
+def nagraj_segment(config=None):
+    """
+    Nagrywa jedną wypowiedź - od początku mowy do ciszy kończącej
+
+    Zwraca widok na bufor mikrofonu zawierający tylko fragment z mową
+    (pusta tablica, jeśli nikt nic nie powiedział).
+    """
+    config = config or wczytaj_config()
+    return nagraj_wypowiedz(
+        pobierz_mikrofon(),
+        max_czas=config["duration"],
+        cisza_ms=config["silence_ms"],
+        tryb=config["vad"]
+    )
+
 def rozpoznaj_mowe_z_mikrofonu() -> str:
     zaladuj_model()
     config = wczytaj_config()
-    duration = config["duration"]
     
-    print(f"🎙️ Nagrywam {duration}s... (Faster-Whisper)")
+    print(f"🎙️ Słucham... (Faster-Whisper, max {config['duration']}s)")
 
     try:
-        # Wyczyść kolejkę przed nagrywaniem
-        while not q.empty():
-            q.get_nowait()
+        return transkrybuj(nagraj_segment(config), config)
+    except Exception as e:
+        print(f"❌ Błąd Faster-Whisper STT: {e}")
+        return ""
 
-        with sd.InputStream(samplerate=SAMPLERATE, channels=1, callback=callback):
-            frames = []
-            chunks_needed = int(SAMPLERATE * duration / 1024)
-            
-            for i in range(chunks_needed):
-                try:
-                    data = q.get(timeout=duration + 1)  # timeout na wypadek problemów
-                    frames.append(data)
-                except queue.Empty:
-                    print("⚠️ Timeout podczas nagrywania")
-                    break
-
-        if not frames:
+def transkrybuj(audio_data, config=None) -> str:
+    """Transkrybuje gotowy fragment audio (float32, 16 kHz)"""
+    zaladuj_model()
+    config = config or wczytaj_config()
+
+    try:
+        if len(audio_data) == 0:
             return ""
 
-        # Przetworzenie audio
-        audio_data = np.concatenate(frames, axis=0)
+        # Przetworzenie audio (normalizacja tworzy nową tablicę - bufor nietknięty)
         audio_data = _normalizuj_audio(audio_data)
 
         # Sprawdź czy audio nie jest za ciche
@@ -146,15 +176,22 @@ def rozpoznaj_mowe_z_mikrofonu() -> str:
             beam_size=config["beam_size"],
             temperature=config["temperature"],
             condition_on_previous_text=False,
-            vad_filter=True,  # Voice Activity Detection
+            # Segment jest już przycięty przez endpointer - wewnętrzny VAD tylko na życzenie
+            vad_filter=config["vad_filter"],
             vad_parameters=dict(min_silence_duration_ms=500)
         )
         
+        segments = list(segments)
         tekst = " ".join([seg.text for seg in segments]).strip()
         
         if tekst:
             confidence = getattr(info, 'language_probability', 0)
             print(f"🎯 Rozpoznano (pewność: {confidence:.2f}): {tekst}")
+            
+            # Pewność dekodowania dla bramki korekty STT (średnia ważona długością segmentów)
+            dlugosci = [max(seg.end - seg.start, 0.01) for seg in segments]
+            avg_logprob = sum(seg.avg_logprob * d for seg, d in zip(segments, dlugosci)) / sum(dlugosci)
+            zapisz_metadane_stt(tekst, avg_logprob, max(seg.no_speech_prob for seg in segments))
         
         return tekst
 
@@ -162,8 +199,129 @@ def rozpoznaj_mowe_z_mikrofonu() -> str:
         print(f"❌ Błąd Faster-Whisper STT: {e}")
         return ""
 
+# === 6. Tryb strumieniowy - hipotezy częściowe ===
+def _normalizuj_slowo(slowo):
+    return re.sub(r"[^\w]", "", slowo.lower())
+
+class LocalAgreement:
+    """
+    Zatwierdzanie słów w stylu LocalAgreement-2
+
+    Okno audio dekodowane jest od nowa co kilkaset ms. Słowo zostaje
+    zatwierdzone, gdy dwie kolejne hipotezy zgadzają się co do niego
+    (wspólny prefiks). Zatwierdzone słowa już się nie zmieniają.
+    """
+
+    def __init__(self):
+        self.zatwierdzone = []
+        self.niepewne = []
+        self._poprzednia = []
+
+    def aktualizuj(self, slowa):
+        """Przyjmuje nową hipotezę (listę słów); zwraca listę nowo zatwierdzonych słów"""
+        wspolne = 0
+        for stare, nowe in zip(self._poprzednia, slowa):
+            if _normalizuj_slowo(stare) != _normalizuj_slowo(nowe):
+                break
+            wspolne += 1
+
+        nowo_zatwierdzone = []
+        if wspolne > len(self.zatwierdzone):
+            nowo_zatwierdzone = slowa[len(self.zatwierdzone):wspolne]
+            self.zatwierdzone.extend(nowo_zatwierdzone)
+
+        self._poprzednia = slowa
+        self.niepewne = slowa[len(self.zatwierdzone):]
+        return nowo_zatwierdzone
+
+    @property
+    def tekst_zatwierdzony(self):
+        return " ".join(self.zatwierdzone)
+
+    @property
+    def tekst_niepewny(self):
+        return " ".join(self.niepewne)
+
+def _dekoduj_szybko(audio_data, config):
+    """Lekka transkrypcja dla hipotez częściowych (greedy, bez znaczników czasu)"""
+    segments, _ = model.transcribe(
+        _normalizuj_audio(audio_data),
+        language=config["language"],
+        beam_size=1,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        without_timestamps=True,
+        vad_filter=False
+    )
+    return " ".join(seg.text for seg in segments).split()
+
+def tryb_strumieniowy() -> bool:
+    """Czy w konfiguracji włączono hipotezy częściowe (stt_config.streaming)"""
+    return bool(wczytaj_config()["streaming"])
+
+def rozpoznaj_mowe_strumieniowo(callback_czesciowy=None) -> str:
+    """
+    Rozpoznawanie z hipotezami częściowymi w trakcie mówienia
+
+    Args:
+        callback_czesciowy: f(zatwierdzony: str, niepewny: str) wołana po każdym
+            dekodowaniu; zwrócenie True kończy nagrywanie od razu i zwraca
+            bieżącą hipotezę (np. po wykryciu komendy stop)
+
+    Returns:
+        str: tekst końcowy (pełne dekodowanie całej wypowiedzi)
+    """
+    zaladuj_model()
+    config = wczytaj_config()
+    mikrofon = pobierz_mikrofon()
+    agreement = LocalAgreement()
+    interwal = config["partial_interval_ms"] / 1000
+    stan = {"ostatnie_dekodowanie": 0.0, "przerwano": False}
+
+    def _po_ramce(endpointer, pozycja):
+        if endpointer.stan != Endpointer.MOWA:
+            return False
+        # Dekoduj tylko, gdy pętla nadąża za mikrofonem i minął interwał
+        if mikrofon.pozycja - pozycja > mikrofon.sekundy_na_probki(interwal):
+            return False
+        if time.monotonic() - stan["ostatnie_dekodowanie"] < interwal:
+            return False
+
+        poczatek = max(mikrofon.bufor.najstarsza_pozycja,
+                       endpointer.poczatek - mikrofon.sekundy_na_probki(PRZED_MOWA_MS / 1000))
+        agreement.aktualizuj(_dekoduj_szybko(mikrofon.okno(poczatek, pozycja), config))
+        stan["ostatnie_dekodowanie"] = time.monotonic()
+
+        print(f"… {agreement.tekst_zatwierdzony} [{agreement.tekst_niepewny}]")
+        if callback_czesciowy and callback_czesciowy(agreement.tekst_zatwierdzony, agreement.tekst_niepewny):
+            stan["przerwano"] = True
+            return True
+        return False
+
+    print(f"🎙️ Słucham strumieniowo... (Faster-Whisper, max {config['duration']}s)")
+
+    try:
+        segment = nagraj_wypowiedz(
+            mikrofon,
+            max_czas=config["duration"],
+            cisza_ms=config["silence_ms"],
+            tryb=config["vad"],
+            callback_ramki=_po_ramce
+        )
+
+        if stan["przerwano"]:
+            tekst = " ".join(agreement.zatwierdzone + agreement.niepewne)
+            print(f"⚡ Przerwano na hipotezie częściowej: {tekst}")
+            return tekst
+
+        return transkrybuj(segment, config)
+
+    except Exception as e:
+        print(f"❌ Błąd Faster-Whisper STT (strumieniowo): {e}")
+        return ""
+
 def ustaw_czas_nagrania(nowy_czas):
-    """Zmienia czas nagrania w runtime"""
+    """Zmienia maksymalny czas wypowiedzi w runtime"""
     global DURATION
     DURATION = max(1, min(nowy_czas, 30))  # 1-30 sekund
     print(f"✅ Czas nagrania ustawiony na {DURATION}s")
@@ -174,12 +332,12 @@ def info_modelu():
         return "Model nie załadowany"
     return f"Faster-Whisper: {NAZWA_MODELU}, {URZADZENIE}, {PRECISION}"
 
-# === 6. Test lokalny ===
+# === 7. Test lokalny ===
 if __name__ == "__main__":
     print("🧪 Test Faster-Whisper STT")
     print(f"Konfiguracja: {wczytaj_config()}")
     
     while True:
         input("Naciśnij Enter aby nagrać (Ctrl+C aby zakończyć)...")
-        wynik = rozpoznaj_mowe_z_mikrofonu()
+        wynik = rozpoznaj_mowe_strumieniowo() if tryb_strumieniowy() else rozpoznaj_mowe_z_mikrofonu()
         print(f"📝 Wynik: '{wynik}'\n")
\ No newline at end of file
@@ -1,16 +1,19 @@
 import os
-import queue
+import threading
 import json
 import zipfile
 import urllib.request
-import sounddevice as sd
+import numpy as np
 from vosk import Model, KaldiRecognizer
+from aia_audio.mikrofon import pobierz_mikrofon
 
 # === 1. Parametry ===
 SCIEZKA_MODELU = "models/vosk-pl"
 URL_MODELU = "https://alphacephei.com/vosk/models/vosk-model-small-pl-0.22.zip"
 ZIP_MODELU = "models/vosk-pl.zip"
 SAMPLERATE = 16000
+BLOCKSIZE = 8000  # próbek przekazywanych do rozpoznawacza naraz
+TIMEOUT_BLOKU = BLOCKSIZE / SAMPLERATE + 1.0  # sekundy - dłużej bez próbek = mikrofon nie nagrywa
 
 # === 2. Automatyczne pobieranie i przygotowanie modelu ===
 def pobierz_model_vosk():
@@ -30,31 +33,59 @@ def pobierz_model_vosk():
     print("✅ Model Vosk PL gotowy.")
 
 # === 3. Ładowanie modelu i inicjalizacja ===
-pobierz_model_vosk()
-model = Model(SCIEZKA_MODELU)
-recognizer = KaldiRecognizer(model, SAMPLERATE)
-q = queue.Queue()
+# Model ładowany przy pierwszym użyciu (lub w tle przez core.rejestr_modeli),
+# a nie przy imporcie modułu
+model = None
+recognizer = None
+_model_lock = threading.Lock()
 
-# === 4. Callback audio ===
-def callback(indata, frames, time, status):
-    if status:
-        print(f"⚠️ Błąd wejścia audio: {status}")
-    q.put(bytes(indata))
+def zaladuj_model():
+    global model, recognizer
+    if recognizer is not None:
+        return
+
+    with _model_lock:
+        if recognizer is None:
+            pobierz_model_vosk()
+            print(f"📦 Ładowanie modelu Vosk z: {SCIEZKA_MODELU}")
+            model = Model(SCIEZKA_MODELU)
+            recognizer = KaldiRecognizer(model, SAMPLERATE)
+            print("✅ Model Vosk gotowy.")
+
+def rozgrzej():
+    """Próbne rozpoznanie sekundy ciszy (bez wpływu na stan rozpoznawacza)"""
+    zaladuj_model()
+    recognizer.AcceptWaveform(bytes(2 * SAMPLERATE))
+    recognizer.Reset()
+
+# === 4. Współdzielony mikrofon (aia_audio.mikrofon) ===
+WSPOLNY_MIKROFON = True
+
+def _na_pcm16(probki):
+    """Konwertuje float32 [-1, 1] na bajty PCM int16 oczekiwane przez Vosk"""
+    return (np.clip(probki, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
 
 # === 5. Rozpoznawanie mowy z mikrofonu ===
 def rozpoznaj_mowe_z_mikrofonu() -> str:
     print("🎤 Nasłuchuję (Vosk)... Powiedz coś.")
     try:
-        with sd.RawInputStream(samplerate=SAMPLERATE, blocksize=8000, dtype="int16",
-                               channels=1, callback=callback):
-            tekst = ""
-            while True:
-                data = q.get()
-                if recognizer.AcceptWaveform(data):
-                    result = recognizer.Result()
-                    tekst_json = json.loads(result)
-                    tekst = tekst_json.get("text", "")
-                    break
+        zaladuj_model()
+        mikrofon = pobierz_mikrofon()
+        kursor = mikrofon.pozycja
+        tekst = ""
+        while True:
+            if not mikrofon.czekaj_na_probki(kursor + BLOCKSIZE, timeout=TIMEOUT_BLOKU):
+                # Mikrofon przestał dostarczać dane - oddaj to, co już rozpoznane
+                print("⚠️ Brak danych z mikrofonu")
+                tekst = json.loads(recognizer.FinalResult()).get("text", "")
+                break
+            data = _na_pcm16(mikrofon.okno(kursor, kursor + BLOCKSIZE))
+            kursor += BLOCKSIZE
+            if recognizer.AcceptWaveform(data):
+                result = recognizer.Result()
+                tekst_json = json.loads(result)
+                tekst = tekst_json.get("text", "")
+                break
         return tekst.strip()
     except Exception as e:
         print(f"❌ Błąd Vosk STT: {e}")
@@ -1,15 +1,15 @@
 import os
+import threading
 import torch
 import numpy as np
-import queue
-import sounddevice as sd
 from faster_whisper import WhisperModel
+from aia_audio.mikrofon import pobierz_mikrofon, SAMPLERATE
+from aia_audio.detektor_mowy import nagraj_wypowiedz
 
 # === 1. Ścieżka i parametry modelu ===
 SCIEZKA_MODELU = "models/faster-whisper-small"
 NAZWA_MODELU = "small"
-SAMPLERATE = 16000
-DURATION = 5  # czas nagrania w sekundach
+DURATION = 5  # maksymalna długość wypowiedzi w sekundach
 
 # === 2. Wykrycie GPU/CPU i wybór precyzji ===
 if torch.cuda.is_available():
@@ -21,12 +21,19 @@ else:
 
 # === 3. Model ładowany tylko raz ===
 model = None
+_model_lock = threading.Lock()
 
 def zaladuj_model():
     global model
     if model is not None:
         return
 
+    with _model_lock:
+        if model is None:
+            _zaladuj_model()
+
+def _zaladuj_model():
+    global model
     if not os.path.isdir(SCIEZKA_MODELU):
         print(f"📥 Model '{NAZWA_MODELU}' nie znaleziony, trwa pobieranie...")
         model = WhisperModel(NAZWA_MODELU, device=URZADZENIE, compute_type=PRECISION)
@@ -37,13 +44,14 @@ def zaladuj_model():
 
     print("✅ Model gotowy do użycia.")
 
-# === 4. Kolejka na dane z mikrofonu ===
-q = queue.Queue()
+def rozgrzej():
+    """Próbna transkrypcja sekundy ciszy - rozgrzewa kernele i alokatory"""
+    zaladuj_model()
+    segments, _ = model.transcribe(np.zeros(SAMPLERATE, dtype=np.float32), language="pl", beam_size=1)
+    list(segments)
 
-def callback(indata, frames, time, status):
-    if status:
-        print("⚠️", status)
-    q.put(indata.copy())
+# === 4. Współdzielony mikrofon (aia_audio.mikrofon) ===
+WSPOLNY_MIKROFON = True
 
 # === 5. Główna funkcja do rozpoznania mowy ===
 def rozpoznaj_mowe_z_mikrofonu() -> str:
@@ -51,17 +59,9 @@ def rozpoznaj_mowe_z_mikrofonu() -> str:
     print("🎙️ Nagrywam... (Whisper)")
 
     try:
-        with sd.InputStream(samplerate=SAMPLERATE, channels=1, callback=callback):
-            frames = []
-            for _ in range(0, int(SAMPLERATE * DURATION / 1024)):
-                data = q.get()
-                frames.append(data)
-
-        audio_data = np.concatenate(frames, axis=0)
-
-        if audio_data.ndim > 1:
-            audio_data = np.mean(audio_data, axis=1)
-        audio_data = audio_data.astype(np.float32)
+        audio_data = nagraj_wypowiedz(pobierz_mikrofon(), max_czas=DURATION)
+        if len(audio_data) == 0:
+            return ""
 
         segments, _ = model.transcribe(audio_data, language="pl")
         text = " ".join([seg.text for seg in segments])
@@ -0,0 +1,173 @@
+# tts/cache_audio.py
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import soundfile as sf
+from core.pamiec import BASE_DIR
+
+# === 1. Parametry ===
+KATALOG_CACHE = os.path.join(BASE_DIR, "data", "tts_cache")
+MAX_DYSK_BAJTOW = 200 * 1024 * 1024     # klipy FLAC na dysku
+MAX_PAMIEC_BAJTOW = 32 * 1024 * 1024    # zdekodowane PCM w RAM
+MAX_ZNAKOW = 160                        # dłuższe zdania (unikalne odpowiedzi LLM) nie są zapisywane
+
+def klucz_frazy(silnik: str, glos: str, tempo: str, tekst: str) -> str:
+    """Adres treści: ten sam silnik + głos + tempo + tekst = ten sam klip"""
+    tresc = "\x1f".join((silnik, glos or "", tempo or "", tekst.strip()))
+    return hashlib.sha1(tresc.encode("utf-8")).hexdigest()
+
+# === 2. Cache: LRU w pamięci nad magazynem FLAC na dysku ===
+class CacheAudio:
+    """
+    Cache klipów TTS: klucz_frazy → (pcm float32, samplerate)
+
+    - pamięć: OrderedDict jako LRU, limit w bajtach zdekodowanego PCM
+    - dysk: jeden plik FLAC (16 bit) na klucz; mtime = ostatnie użycie,
+      po przekroczeniu MAX_DYSK_BAJTOW usuwane są najdawniej używane
+    """
+
+    def __init__(self, katalog: str = KATALOG_CACHE, max_dysk: int = MAX_DYSK_BAJTOW,
+                 max_pamiec: int = MAX_PAMIEC_BAJTOW):
+        self.katalog = katalog
+        self.max_dysk = max_dysk
+        self.max_pamiec = max_pamiec
+        self._pamiec = OrderedDict()
+        self._pamiec_bajty = 0
+        self._lock = threading.Lock()
+        self.trafienia_pamiec = 0
+        self.trafienia_dysk = 0
+        self.chybienia = 0
+
+        os.makedirs(self.katalog, exist_ok=True)
+        self._dysk_bajty = sum(os.path.getsize(sciezka) for sciezka in self._pliki())
+
+    def _pliki(self):
+        return [os.path.join(self.katalog, nazwa) for nazwa in os.listdir(self.katalog) if nazwa.endswith(".flac")]
+
+    def _sciezka(self, klucz: str) -> str:
+        return os.path.join(self.katalog, f"{klucz}.flac")
+
+    def _do_pamieci(self, klucz, pcm, samplerate):
+        if klucz in self._pamiec:
+            self._pamiec.move_to_end(klucz)
+            return
+        self._pamiec[klucz] = (pcm, samplerate)
+        self._pamiec_bajty += pcm.nbytes
+        while self._pamiec_bajty > self.max_pamiec and len(self._pamiec) > 1:
+            _, (stary, _) = self._pamiec.popitem(last=False)
+            self._pamiec_bajty -= stary.nbytes
+
+    def pobierz(self, klucz: str):
+        """(pcm, samplerate) albo None"""
+        with self._lock:
+            if klucz in self._pamiec:
+                self._pamiec.move_to_end(klucz)
+                self.trafienia_pamiec += 1
+                return self._pamiec[klucz]
+
+            sciezka = self._sciezka(klucz)
+            if not os.path.exists(sciezka):
+                self.chybienia += 1
+                return None
+
+            try:
+                pcm, samplerate = sf.read(sciezka, dtype="float32")
+                os.utime(sciezka)  # LRU na dysku
+            except Exception as e:
+                print(f"⚠️ Uszkodzony klip w cache TTS ({e}) - usuwam")
+                self._usun_plik(sciezka)
+                self.chybienia += 1
+                return None
+
+            self._do_pamieci(klucz, pcm, samplerate)
+            self.trafienia_dysk += 1
+            return pcm, samplerate
+
+    def zawiera(self, klucz: str) -> bool:
+        with self._lock:
+            return klucz in self._pamiec or os.path.exists(self._sciezka(klucz))
+
+    def zapisz(self, klucz: str, pcm: np.ndarray, samplerate: int):
+        pcm = np.asarray(pcm, dtype=np.float32)
+        sciezka = self._sciezka(klucz)
+        with self._lock:
+            self._do_pamieci(klucz, pcm, samplerate)
+            if os.path.exists(sciezka):
+                return
+            try:
+                tymczasowa = f"{sciezka}.{threading.get_ident()}.tmp"
+                sf.write(tymczasowa, np.clip(pcm, -1.0, 1.0), samplerate, format="FLAC", subtype="PCM_16")
+                os.replace(tymczasowa, sciezka)
+                self._dysk_bajty += os.path.getsize(sciezka)
+            except Exception as e:
+                print(f"⚠️ Nie zapisano klipu TTS na dysk: {e}")
+                return
+            if self._dysk_bajty > self.max_dysk:
+                self._przytnij_dysk()
+
+    def _usun_plik(self, sciezka):
+        try:
+            rozmiar = os.path.getsize(sciezka)
+            os.remove(sciezka)
+            self._dysk_bajty -= rozmiar
+        except OSError:
+            pass
+
+    def _przytnij_dysk(self):
+        """Usuwa najdawniej używane klipy do 90% limitu (żeby nie przycinać przy każdym zapisie)"""
+        pliki = sorted(self._pliki(), key=os.path.getmtime)
+        cel = int(self.max_dysk * 0.9)
+        usuniete = 0
+        for sciezka in pliki:
+            if self._dysk_bajty <= cel:
+                break
+            self._usun_plik(sciezka)
+            usuniete += 1
+        print(f"🧹 Cache TTS: usunięto {usuniete} najdawniej używanych klipów")
+
+    def statystyki(self) -> dict:
+        zapytania = self.trafienia_pamiec + self.trafienia_dysk + self.chybienia
+        return {
+            "trafienia_pamiec": self.trafienia_pamiec,
+            "trafienia_dysk": self.trafienia_dysk,
+            "chybienia": self.chybienia,
+            "trafialnosc": round((zapytania - self.chybienia) / zapytania, 3) if zapytania else 0.0,
+            "pamiec_mb": round(self._pamiec_bajty / 1e6, 1),
+            "dysk_mb": round(self._dysk_bajty / 1e6, 1)
+        }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def pobierz_cache() -> CacheAudio:
+    """Wspólny cache dla wszystkich silników (klucz zawiera nazwę silnika)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CacheAudio()
+        return _cache
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    import tempfile
+
+    print("🧪 Test cache audio TTS")
+    with tempfile.TemporaryDirectory() as katalog:
+        cache = CacheAudio(katalog, max_dysk=60_000, max_pamiec=100_000)
+        sr = 22050
+        for i in range(5):
+            klucz = klucz_frazy("test", "glos", "+0%", f"Fraza numer {i}.")
+            cache.zapisz(klucz, np.random.uniform(-0.3, 0.3, sr), sr)  # szum - FLAC go nie skompresuje
+            time.sleep(0.01)
+
+        pierwszy = klucz_frazy("test", "glos", "+0%", "Fraza numer 0.")
+        ostatni = klucz_frazy("test", "glos", "+0%", "Fraza numer 4.")
+        print(f"  W pamięci ostatni: {cache.pobierz(ostatni) is not None}")
+
+        cache2 = CacheAudio(katalog, max_dysk=60_000)  # nowy proces - tylko dysk
+        print(f"  Z dysku ostatni: {cache2.pobierz(ostatni) is not None}, pierwszy (usunięty): {cache2.pobierz(pierwszy) is not None}")
+        print(f"📊 {cache.statystyki()}")
+        print(f"📊 {cache2.statystyki()}")
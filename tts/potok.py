@@ -0,0 +1,487 @@
+# tts/potok.py
+import io
+import time
+import queue
+import atexit
+import threading
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+from core.strumien_mowy import podziel_na_zdania
+from tts.cache_audio import pobierz_cache, klucz_frazy, MAX_ZNAKOW
+
+# === 1. Parametry ===
+BLOK_ZAPISU = 2048  # próbki na jeden write() do strumienia
+
+# libsndfile >= 1.1 dekoduje MP3 (Edge, ElevenLabs, gTTS zwracają MP3)
+MP3_DOSTEPNE = "MP3" in sf.available_formats()
+
+def dekoduj(bajty: bytes):
+    """Plik audio w pamięci (MP3/WAV/FLAC) → (pcm float32, samplerate)"""
+    pcm, samplerate = sf.read(io.BytesIO(bajty), dtype="float32")
+    return pcm, samplerate
+
+# Nagłówek ramki MP3 (warstwa III): bitrate [kbps] i częstotliwość wg wersji MPEG
+_BITRATY_MPEG1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATY_MPEG2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_CZESTOTLIWOSCI = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+REZERWUAR_BITOW = 511       # maks. main_data_begin - ramka może brać tyle bajtów danych z poprzednich
+OPOZNIENIE_DEKODERA = 529   # opóźnienie dekodera (GAPLESS_DELAY mpg123) - obcinane razem z tagiem LAME
+
+def _ramka_mp3(bajty, i: int):
+    """
+    Ramka warstwy III pod i: (długość, początek side info, początek danych,
+    próbki na ramkę, main_data_begin) albo None, jeśli to nie nagłówek
+    """
+    if i + 4 > len(bajty):
+        return None
+    naglowek = int.from_bytes(bajty[i:i + 4], "big")
+    wersja = (naglowek >> 19) & 3
+    bitrate = (naglowek >> 12) & 15
+    czestotliwosc = (naglowek >> 10) & 3
+    if (naglowek >> 21 != 0x7FF or wersja == 1 or (naglowek >> 17) & 3 != 1
+            or bitrate in (0, 15) or czestotliwosc == 3):
+        return None
+    mpeg1 = wersja == 3
+    kbps = (_BITRATY_MPEG1 if mpeg1 else _BITRATY_MPEG2)[bitrate]
+    dlugosc = (144 if mpeg1 else 72) * kbps * 1000 // _CZESTOTLIWOSCI[wersja][czestotliwosc]
+    mono = (naglowek >> 6) & 3 == 3
+    side_info = 4 + (0 if naglowek & 0x10000 else 2)  # nagłówek + CRC
+    poczatek_danych = side_info + ((17 if mono else 32) if mpeg1 else (9 if mono else 17))
+    main_data_begin = int.from_bytes(bajty[i + side_info:i + side_info + 2], "big") >> (7 if mpeg1 else 8)
+    return (dlugosc + ((naglowek >> 9) & 1), side_info, poczatek_danych,
+            1152 if mpeg1 else 576, main_data_begin)
+
+def _wycisz_ramke(bajty: bytearray, i: int, side_info: int, poczatek_danych: int, mpeg1: bool):
+    """
+    Zeruje part2_3_length każdego granulu - ramka dekoduje się jako cisza,
+    a main_data_begin (i rezerwuar dla następnych ramek) zostaje bez zmian
+    """
+    dlugosc = poczatek_danych - side_info
+    kanaly = 1 if dlugosc == (17 if mpeg1 else 9) else 2
+    if mpeg1:
+        przed, granul, granuli = 9 + (5 if kanaly == 1 else 3) + 4 * kanaly, 59, 2 * kanaly
+    else:
+        przed, granul, granuli = 8 + kanaly, 63, kanaly
+    bity = int.from_bytes(bajty[i + side_info:i + poczatek_danych], "big")
+    for g in range(granuli):
+        bity &= ~(0xFFF << (dlugosc * 8 - przed - g * granul - 12))
+    bajty[i + side_info:i + poczatek_danych] = bity.to_bytes(dlugosc, "big")
+
+def _pusta_ramka(wzor: bytes) -> bytearray:
+    """Ramka ciszy (zerowe side info i dane) o formacie ramki wzor, 64 kbps"""
+    naglowek = int.from_bytes(wzor[:4], "big")
+    mpeg1 = (naglowek >> 19) & 3 == 3
+    naglowek = (naglowek & ~0xF200) | ((5 if mpeg1 else 8) << 12) | 0x10000  # bez paddingu i CRC
+    naglowek = naglowek.to_bytes(4, "big")
+    ramka = bytearray(_ramka_mp3(naglowek + bytes(2), 0)[0])
+    ramka[:4] = naglowek
+    return ramka
+
+def _ramka_xing(wzor: bytes, ramek: int, bajtow: int) -> bytes:
+    """
+    Ramka Xing z liczbą ramek i bajtów fragmentu - bez niej libsndfile
+    szacuje długość z bitrate pierwszej ramki i przy VBR ucina odczyt
+    """
+    ramka = _pusta_ramka(wzor)
+    poczatek_danych = _ramka_mp3(ramka, 0)[2]
+    ramka[poczatek_danych:poczatek_danych + 16] = (b"Xing" + (3).to_bytes(4, "big") + ramek.to_bytes(4, "big")
+                                                   + (bajtow + len(ramka)).to_bytes(4, "big"))
+    return bytes(ramka)
+
+class DekoderStrumienia:
+    """
+    Dekodowanie MP3 przychodzącego w kawałkach (Edge, ElevenLabs stream)
+
+    libsndfile nie ma API przyrostowego, więc strumień jest dzielony na
+    ramki MP3 i każda pełna ramka jest dekodowana raz - po dopłynięciu
+    min_bajtow nowych ramek. Ramka może brać dane z ramek poprzednich
+    (rezerwuar bitów) i nakłada się z poprzednią (MDCT), dlatego porcja
+    jest dekodowana razem z ramkami sprzed niej, a ich próbki są odrzucane.
+
+    Ramka Xing/Info strumienia opisuje cały plik (przy dekodowaniu prefiksu
+    mpg123 zgłaszał "Xing stream size off") - jest zastępowana ramką
+    opisującą porcję, a opóźnienie i padding enkodera z tagu LAME są
+    obcinane na początku i końcu strumienia, jak przy dekodowaniu całości.
+    """
+
+    def __init__(self, min_bajtow: int = 4096):
+        self.min_bajtow = min_bajtow
+        self.samplerate = None
+        self._bufor = bytearray()  # ramki kontekstu + ramki nowe + niepełna końcówka
+        self._kontekst = []        # (długość, bajty danych) ramek kontekstu z początku bufora
+        self._nowe = []            # (długość, bajty danych) pełnych, niezdekodowanych ramek
+        self._probek_na_ramke = None
+        self._pierwsza = True
+        self._mp3 = True
+        self._pomin_poczatek = 0   # opóźnienie enkodera (tag LAME)
+        self._pomin_koniec = 0     # padding enkodera (tag LAME)
+        self._ogon = np.zeros(0, dtype=np.float32)  # wstrzymane próbki - może to być padding
+
+    def _czytaj_tag(self, i: int):
+        """Ramka Xing/Info na początku strumienia: opóźnienie i padding z tagu LAME"""
+        ramka = bytes(self._bufor[i:i + 64])
+        tag = max(ramka.find(b"Xing"), ramka.find(b"Info"))
+        if tag < 0:
+            return False
+        lame = self._bufor[i + tag + 120:i + tag + 144]
+        if lame[:4] in (b"LAME", b"Lavc", b"Lavf") and len(lame) == 24:
+            self._pomin_poczatek = ((lame[21] << 4) | (lame[22] >> 4)) + OPOZNIENIE_DEKODERA
+            self._pomin_koniec = max(0, (((lame[22] & 0xF) << 8) | lame[23]) - OPOZNIENIE_DEKODERA)
+        return True
+
+    def _dziel_na_ramki(self):
+        poczatek = sum(d for d, _ in self._kontekst + self._nowe)
+        while True:
+            if self._pierwsza and self._bufor[poczatek:poczatek + 3] == b"ID3":
+                if len(self._bufor) < poczatek + 10:
+                    return
+                rozmiar = 10 + sum(b << (7 * (3 - k)) for k, b in enumerate(self._bufor[poczatek + 6:poczatek + 10]))
+                if len(self._bufor) < poczatek + rozmiar:
+                    return
+                del self._bufor[poczatek:poczatek + rozmiar]
+                continue
+            ramka = _ramka_mp3(self._bufor, poczatek)
+            if ramka is None:
+                if self._pierwsza:
+                    # Bez ramki na początku to nie MP3 - dekodowanie całości w zakoncz()
+                    self._mp3 = len(self._bufor) - poczatek < self.min_bajtow
+                    return
+                if len(self._bufor) - poczatek < 4:
+                    return
+                del self._bufor[poczatek]  # śmieci między ramkami - szukaj synchronizacji
+                continue
+            dlugosc, _, poczatek_danych, self._probek_na_ramke, _ = ramka
+            if len(self._bufor) < poczatek + dlugosc:
+                return
+            if self._pierwsza and self._czytaj_tag(poczatek):
+                del self._bufor[poczatek:poczatek + dlugosc]
+            else:
+                self._nowe.append((dlugosc, dlugosc - poczatek_danych))
+                poczatek += dlugosc
+            self._pierwsza = False
+
+    def _okno(self, koniec: int) -> bytes:
+        """
+        Bajty do zdekodowania; ramki kontekstu sięgające po rezerwuar sprzed
+        okna są wyciszane - mpg123 zgłaszałby na nich błąd, a ich próbki
+        i tak są odrzucane. Pierwsza porcja dostaje ramkę ciszy jako kontekst,
+        bo opóźnienie dekodera (po ramce Xing) ucina początek wyniku.
+        """
+        okno = bytearray(self._bufor[:koniec])
+        if not self._kontekst:
+            okno[:0] = _pusta_ramka(okno)
+            return _ramka_xing(okno, len(self._nowe) + 1, len(okno)) + bytes(okno)
+        pozycja = dostepne = 0
+        for dlugosc, dane in self._kontekst:
+            _, side_info, poczatek_danych, probek, main_data_begin = _ramka_mp3(okno, pozycja)
+            if main_data_begin > dostepne:
+                _wycisz_ramke(okno, pozycja, side_info, poczatek_danych, probek == 1152)
+            dostepne += dane
+            pozycja += dlugosc
+        return _ramka_xing(okno, len(self._kontekst) + len(self._nowe), len(okno)) + bytes(okno)
+
+    def _dekoduj_nowe(self) -> np.ndarray:
+        if not self._nowe:
+            return np.zeros(0, dtype=np.float32)
+        koniec = sum(d for d, _ in self._kontekst + self._nowe)
+        pcm, self.samplerate = sf.read(io.BytesIO(self._okno(koniec)), dtype="float32")
+        pcm = _jako_mono_float32(pcm)[-len(self._nowe) * self._probek_na_ramke:]  # bez kontekstu
+        if self._pomin_poczatek:
+            pominiete = min(self._pomin_poczatek, len(pcm))
+            pcm = pcm[pominiete:]
+            self._pomin_poczatek -= pominiete
+        if self._pomin_koniec:
+            pcm = np.concatenate([self._ogon, pcm])
+            granica = max(0, len(pcm) - self._pomin_koniec)
+            pcm, self._ogon = pcm[:granica], pcm[granica:]
+
+        # Kontekst następnej porcji: ramki z danymi pokrywającymi rezerwuar + jedna na nakładkę MDCT
+        ramki = self._kontekst + self._nowe
+        kontekst = []
+        while ramki and sum(dane for _, dane in kontekst) < REZERWUAR_BITOW:
+            kontekst.insert(0, ramki.pop())
+        if ramki:
+            kontekst.insert(0, ramki.pop())
+        del self._bufor[:sum(d for d, _ in ramki)]
+        self._kontekst, self._nowe = kontekst, []
+        return pcm
+
+    def dodaj(self, bajty: bytes) -> np.ndarray:
+        """Dokłada kawałek strumienia, zwraca gotowe do odtworzenia próbki (może być pusto)"""
+        self._bufor.extend(bajty)
+        if not self._mp3:
+            return np.zeros(0, dtype=np.float32)
+        self._dziel_na_ramki()
+        if sum(d for d, _ in self._nowe) < self.min_bajtow:
+            return np.zeros(0, dtype=np.float32)
+        return self._dekoduj_nowe()
+
+    def zakoncz(self) -> np.ndarray:
+        """Reszta próbek po ostatnim kawałku (niepełna ostatnia ramka jest pomijana)"""
+        if not self._mp3:
+            pcm, self.samplerate = sf.read(io.BytesIO(bytes(self._bufor)), dtype="float32")
+            return _jako_mono_float32(pcm)
+        self._dziel_na_ramki()
+        return self._dekoduj_nowe()  # wstrzymany ogon to padding enkodera
+
+def dekoduj_strumien(kawalki):
+    """Generator kawałków MP3 → generator (pcm, samplerate) dla PotokTTS.syntezuj_strumien"""
+    dekoder = DekoderStrumienia()
+    for kawalek in kawalki:
+        pcm = dekoder.dodaj(kawalek)
+        if len(pcm):
+            yield pcm, dekoder.samplerate
+    pcm = dekoder.zakoncz()
+    if len(pcm):
+        yield pcm, dekoder.samplerate
+
+# === 2. Jeden trwały strumień wyjściowy ===
+class WyjscieAudio:
+    """
+    Trwały sd.OutputStream (mono, float32) współdzielony przez wszystkie zdania
+
+    Strumień jest otwierany raz i zostaje otwarty między wypowiedziami -
+    brak otwierania/zamykania urządzenia przy każdym zdaniu, więc kolejne
+    zdania grają bez przerw. Zmiana częstotliwości próbkowania (inny silnik)
+    otwiera strumień na nowo.
+    """
+
+    def __init__(self):
+        self._strumien = None
+        self._samplerate = None
+        self._lock = threading.Lock()
+
+    def _otworz(self, samplerate: int):
+        if self._strumien is not None and self._samplerate == samplerate:
+            return
+        self.zamknij()
+        self._strumien = sd.OutputStream(samplerate=samplerate, channels=1, dtype="float32")
+        self._strumien.start()
+        self._samplerate = samplerate
+
+    def graj(self, pcm: np.ndarray, samplerate: int, przerwano=None):
+        """Blokujący zapis PCM do strumienia (kończy się, gdy urządzenie przyjmie dane)"""
+        with self._lock:
+            self._otworz(samplerate)
+            for start in range(0, len(pcm), BLOK_ZAPISU):
+                if przerwano is not None and przerwano.is_set():
+                    return
+                self._strumien.write(pcm[start:start + BLOK_ZAPISU])
+
+    def opoznienie(self) -> float:
+        """Ile sekund dźwięku siedzi jeszcze w buforze urządzenia"""
+        return self._strumien.latency if self._strumien is not None else 0.0
+
+    def zamknij(self):
+        if self._strumien is not None:
+            try:
+                self._strumien.stop()
+                self._strumien.close()
+            except Exception:
+                pass
+            self._strumien = None
+            self._samplerate = None
+
+_wyjscie = WyjscieAudio()
+atexit.register(_wyjscie.zamknij)
+
+def _jako_mono_float32(pcm) -> np.ndarray:
+    pcm = np.asarray(pcm, dtype=np.float32).squeeze()
+    if pcm.ndim > 1:
+        pcm = pcm.mean(axis=1)
+    return np.ascontiguousarray(pcm)
+
+# === 3. Potok: synteza zdania N+1 w trakcie odtwarzania zdania N ===
+class PotokTTS:
+    """
+    Wspólna warstwa dla silników tts/*
+
+    Silnik dostarcza tylko `syntezuj(tekst) -> (pcm, samplerate)`. Potok
+    dzieli tekst na zdania; wątek syntezy przygotowuje kolejne zdanie,
+    podczas gdy wątek odtwarzania gra poprzednie do WyjscieAudio.
+    Pierwszy dźwięk pojawia się po syntezie pierwszego zdania, a nie całej
+    odpowiedzi.
+
+    Zdania do MAX_ZNAKOW przechodzą przez cache audio (tts/cache_audio.py);
+    `glos()` zwraca (głos, tempo) silnika - część klucza cache.
+
+    Silnik strumieniowy podaje dodatkowo `syntezuj_strumien(tekst)` -
+    generator (pcm, samplerate); odtwarzanie zdania rusza wtedy od
+    pierwszego kawałka, zanim silnik skończy je syntezować.
+    """
+
+    def __init__(self, nazwa: str, syntezuj, glos=None, wyprzedzenie: int = 2, syntezuj_strumien=None):
+        self.nazwa = nazwa
+        self.syntezuj = syntezuj
+        self.syntezuj_strumien = syntezuj_strumien
+        self.glos = glos or (lambda: ("", ""))
+        self.cache = pobierz_cache()
+        self._zdania = queue.Queue()
+        self._audio = queue.Queue(maxsize=wyprzedzenie)  # ile zdań może czekać na odtworzenie
+        self._oczekujace = 0
+        self._warunek = threading.Condition()
+        self._przerwano = threading.Event()
+        self._watki = None
+
+    def _uruchom(self):
+        if self._watki is not None:
+            return
+        self._watki = [
+            threading.Thread(target=self._petla_syntezy, name=f"tts-{self.nazwa}-synteza", daemon=True),
+            threading.Thread(target=self._petla_odtwarzania, name=f"tts-{self.nazwa}-audio", daemon=True)
+        ]
+        for watek in self._watki:
+            watek.start()
+
+    def _klucz(self, zdanie: str):
+        if len(zdanie) > MAX_ZNAKOW:
+            return None
+        glos, tempo = self.glos()
+        return klucz_frazy(self.nazwa, glos, tempo, zdanie)
+
+    def _syntezuj_calosc(self, zdanie: str, klucz, start: float):
+        pcm, samplerate = self.syntezuj(zdanie)
+        pcm = _jako_mono_float32(pcm)
+        if klucz is not None:
+            self.cache.zapisz(klucz, pcm, samplerate)
+        print(f"🧩 {self.nazwa}: zdanie zsyntezowane po {time.time() - start:.2f}s ({len(zdanie)} zn.)")
+        self._audio.put((pcm, samplerate))
+
+    def _syntezuj_strumieniowo(self, zdanie: str, klucz, start: float):
+        """Kanał kawałków trafia do odtwarzania od razu; całość po końcu - do cache"""
+        kanal = queue.Queue()
+        self._audio.put(kanal)
+        czesci, samplerate = [], None
+        try:
+            for pcm, samplerate in self.syntezuj_strumien(zdanie):
+                if self._przerwano.is_set():
+                    return
+                pcm = _jako_mono_float32(pcm)
+                if not czesci:
+                    print(f"🧩 {self.nazwa}: pierwszy kawałek po {time.time() - start:.2f}s ({len(zdanie)} zn.)")
+                czesci.append(pcm)
+                kanal.put((pcm, samplerate))
+            if klucz is not None and czesci:
+                self.cache.zapisz(klucz, np.concatenate(czesci), samplerate)
+        finally:
+            kanal.put(None)
+
+    def _petla_syntezy(self):
+        while True:
+            zdanie, start = self._zdania.get()
+            if self._przerwano.is_set():
+                self._audio.put(None)
+                continue
+
+            klucz = self._klucz(zdanie)
+            audio = self.cache.pobierz(klucz) if klucz is not None else None
+            if audio is not None:
+                print(f"🧩 {self.nazwa}: zdanie z cache po {time.time() - start:.2f}s ({len(zdanie)} zn.)")
+                self._audio.put(audio)
+                continue
+
+            try:
+                if self.syntezuj_strumien is not None:
+                    self._syntezuj_strumieniowo(zdanie, klucz, start)
+                else:
+                    self._syntezuj_calosc(zdanie, klucz, start)
+            except Exception as e:
+                print(f"❌ Błąd syntezy {self.nazwa}: {e}")
+                if self.syntezuj_strumien is None:
+                    self._audio.put(None)
+
+    def _graj(self, audio):
+        if isinstance(audio, queue.Queue):
+            # Kanał strumienia - czytany do końca, nawet po przerwaniu
+            while True:
+                fragment = audio.get()
+                if fragment is None:
+                    return
+                if not self._przerwano.is_set():
+                    _wyjscie.graj(*fragment, przerwano=self._przerwano)
+        elif audio is not None and not self._przerwano.is_set():
+            _wyjscie.graj(*audio, przerwano=self._przerwano)
+
+    def _petla_odtwarzania(self):
+        while True:
+            audio = self._audio.get()
+            try:
+                self._graj(audio)
+            except Exception as e:
+                print(f"❌ Błąd odtwarzania {self.nazwa}: {e}")
+            finally:
+                with self._warunek:
+                    self._oczekujace -= 1
+                    self._warunek.notify_all()
+
+    def dodaj(self, zdanie: str):
+        """Kolejkuje jedno zdanie (nie blokuje)"""
+        if not zdanie.strip():
+            return
+        self._uruchom()
+        with self._warunek:
+            if self._oczekujace == 0:
+                self._przerwano.clear()  # nowa wypowiedź po przerwaniu
+            self._oczekujace += 1
+        self._zdania.put((zdanie, time.time()))
+
+    def czekaj(self):
+        """Blokuje do wypowiedzenia wszystkich zakolejkowanych zdań"""
+        with self._warunek:
+            self._warunek.wait_for(lambda: self._oczekujace == 0)
+        time.sleep(_wyjscie.opoznienie())  # ostatnie próbki w buforze urządzenia
+
+    def przerwij(self):
+        """Porzuca niewypowiedziane zdania (np. użytkownik zaczął mówić)"""
+        self._przerwano.set()
+
+    def mow(self, tekst: str):
+        """Tekst → zdania → synteza w tle + odtwarzanie; wraca po wypowiedzeniu"""
+        for zdanie in podziel_na_zdania(tekst):
+            self.dodaj(zdanie)
+        self.czekaj()
+
+    def rozgrzej_cache(self, frazy, w_tle: bool = True):
+        """
+        Syntezuje do cache stałe frazy (powitania, komunikaty błędów...),
+        których jeszcze tam nie ma - pierwsza odpowiedź gra od razu z dysku
+        """
+        def _rozgrzej():
+            start = time.time()
+            nowe = 0
+            for fraza in frazy:
+                for zdanie in podziel_na_zdania(fraza):
+                    klucz = self._klucz(zdanie)
+                    if klucz is None or self.cache.zawiera(klucz):
+                        continue
+                    try:
+                        pcm, samplerate = self.syntezuj(zdanie)
+                        self.cache.zapisz(klucz, _jako_mono_float32(pcm), samplerate)
+                    except Exception as e:
+                        print(f"⚠️ Rozgrzewanie cache {self.nazwa}: {e}")
+                        return
+                    nowe += 1
+            print(f"🔥 Cache TTS {self.nazwa}: {nowe} nowych fraz ({time.time() - start:.1f}s), {self.cache.statystyki()}")
+
+        if not w_tle:
+            _rozgrzej()
+            return None
+        watek = threading.Thread(target=_rozgrzej, name=f"tts-{self.nazwa}-cache", daemon=True)
+        watek.start()
+        return watek
+
+# === Test lokalny ===
+if __name__ == "__main__":
+    SR = 22050
+
+    def syntezuj_ton(tekst):
+        """Udawany silnik: ton, którego długość zależy od tekstu, synteza trwa 0.3 s"""
+        time.sleep(0.3)
+        t = np.arange(int(SR * 0.04 * len(tekst))) / SR
+        return 0.2 * np.sin(2 * np.pi * 440 * t), SR
+
+    potok = PotokTTS("test", syntezuj_ton)
+    start = time.time()
+    potok.mow("Pierwsze zdanie testowe. Drugie, trochę dłuższe zdanie testowe! A to trzecie?")
+    print(f"⏱️ Razem: {time.time() - start:.2f}s")
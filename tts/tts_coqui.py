@@ -2,9 +2,9 @@
 import os
 import sys
 import torch
-import tempfile
-import sounddevice as sd
+import threading
 import numpy as np
+from tts.potok import PotokTTS
 
 try:
     from TTS.api import TTS
@@ -19,12 +19,20 @@ CACHE_DIR = "models/tts/coqui"
 SAMPLERATE = 22050
 
 tts_model = None
+_model_lock = threading.Lock()
+_synteza_lock = threading.Lock()  # rozgrzewka w tle i potok TTS nie mogą syntezować naraz
 
 def zaladuj_model():
     global tts_model
     if tts_model is not None:
         return
 
+    with _model_lock:
+        if tts_model is None:
+            _zaladuj_model()
+
+def _zaladuj_model():
+    global tts_model
     print("📦 Ładowanie modelu Coqui TTS...")
     try:
         tts_model = TTS(model_name=MODEL_NAME, progress_bar=False, gpu=torch.cuda.is_available(), cache_dir=CACHE_DIR)
@@ -32,14 +40,28 @@ def zaladuj_model():
     except Exception as e:
         print(f"❌ Błąd ładowania modelu Coqui TTS: {e}")
 
-def mow_tekstem(tekst: str):
+def rozgrzej():
+    """Próbna synteza bez odtwarzania - rozgrzewa model i kernele"""
     zaladuj_model()
+    if tts_model is not None:
+        with _synteza_lock:
+            tts_model.tts("Dzień dobry.")
+
+def syntezuj(tekst: str):
+    """Tekst → (pcm, samplerate) bez odtwarzania"""
+    zaladuj_model()
+    if tts_model is None:
+        raise RuntimeError(f"Model Coqui TTS niedostępny ({MODEL_NAME}) - sprawdź log ładowania")
+    with _synteza_lock:
+        pcm = tts_model.tts(tekst)
+    return np.asarray(pcm, dtype=np.float32), SAMPLERATE
+
+potok = PotokTTS("coqui", syntezuj, glos=lambda: (MODEL_NAME, ""))
+
+def mow_tekstem(tekst: str):
     print(f"🗣️ Coqui-TTS mówi: {tekst}")
     try:
-        waveform = tts_model.tts(tekst)
-        waveform = waveform.squeeze()
-        sd.play(waveform, samplerate=SAMPLERATE)
-        sd.wait()
+        potok.mow(tekst)
     except Exception as e:
         print(f"❌ Błąd Coqui TTS: {e}")
 
@@ -1,11 +1,12 @@
 # tts_edge.py
 import os
 import sys
+import queue
 import asyncio
-import tempfile
-import sounddevice as sd
-import soundfile as sf
-import json
+import threading
+import numpy as np
+from core import konfiguracja
+from tts.potok import PotokTTS, dekoduj_strumien
 
 try:
     import edge_tts
@@ -22,57 +23,83 @@ POLISH_VOICES = {
     "agnieszka": "pl-PL-AgnieszkaNeural"  # kobieta, naturalny
 }
 
-# Wczytaj głos z konfiguracji lub użyj domyślnego
-voice_name = "zofia"  # domyślny
-try:
-    with open("config/config.json", "r", encoding="utf-8") as f:
-        config = json.load(f)
-        voice_name = config.get("local_config", {}).get("edge_voice", "zofia")
-except Exception:
-    pass
-
+# Głos z konfiguracji (snapshot core.konfiguracja) lub domyślny
+voice_name = konfiguracja.sekcja("local_config").get("edge_voice", "zofia")
 VOICE = POLISH_VOICES.get(voice_name, POLISH_VOICES["zofia"])
 RATE = "+0%"    # prędkość mówienia
 VOLUME = "+0%"  # głośność
 
 print(f"🎙️ Edge-TTS używa głosu: {voice_name} ({VOICE})")
 
-async def _generuj_mowe_async(tekst: str, output_path: str):
-    """Asynchroniczna generacja mowy"""
+def _odswiez_glos(snapshot):
+    """Zmiana edge_voice w GUI działa bez restartu"""
+    global voice_name, VOICE
+    nowy = snapshot.sekcja("local_config").get("edge_voice", "zofia")
+    if nowy != voice_name:
+        voice_name = nowy
+        VOICE = POLISH_VOICES.get(nowy, POLISH_VOICES["zofia"])
+        print(f"🎙️ Edge-TTS: nowy głos z konfiguracji: {nowy} ({VOICE})")
+
+konfiguracja.obserwuj(_odswiez_glos)
+
+# === Jedna pętla asyncio w tle dla wszystkich wypowiedzi ===
+_petla = None
+_petla_lock = threading.Lock()
+
+def _petla_zdarzen():
+    """Pętla zdarzeń tworzona raz, działa w wątku demona do końca procesu"""
+    global _petla
+    with _petla_lock:
+        if _petla is None:
+            _petla = asyncio.new_event_loop()
+            threading.Thread(target=_petla.run_forever, name="edge-tts-petla", daemon=True).start()
+        return _petla
+
+async def _pobieraj_mp3(tekst: str, kanal: queue.Queue):
+    """Kawałki MP3 z Communicate.stream() → kanał (None = koniec, wyjątek = błąd)"""
     try:
         communicate = edge_tts.Communicate(tekst, VOICE, rate=RATE, volume=VOLUME)
-        await communicate.save(output_path)
-        return True
+        async for kawalek in communicate.stream():
+            if kawalek["type"] == "audio":
+                kanal.put(kawalek["data"])
     except Exception as e:
-        print(f"❌ Błąd Edge-TTS async: {e}")
-        return False
+        kanal.put(e)
+    finally:
+        kanal.put(None)
+
+def _kawalki_mp3(tekst: str):
+    kanal = queue.Queue()
+    asyncio.run_coroutine_threadsafe(_pobieraj_mp3(tekst, kanal), _petla_zdarzen())
+    while True:
+        kawalek = kanal.get()
+        if kawalek is None:
+            return
+        if isinstance(kawalek, Exception):
+            raise RuntimeError(f"Błąd Edge-TTS: {kawalek}") from kawalek
+        yield kawalek
+
+def syntezuj_strumien(tekst: str):
+    """Tekst → generator (pcm, samplerate), dekodowanie w pamięci w trakcie pobierania"""
+    yield from dekoduj_strumien(_kawalki_mp3(tekst))
+
+def syntezuj(tekst: str):
+    """Tekst → (pcm, samplerate) bez odtwarzania (np. rozgrzewanie cache)"""
+    czesci, samplerate = [], None
+    for pcm, samplerate in syntezuj_strumien(tekst):
+        czesci.append(pcm)
+    if not czesci:
+        raise RuntimeError("Nie udało się wygenerować mowy")
+    return np.concatenate(czesci), samplerate
+
+potok = PotokTTS("edge", syntezuj, glos=lambda: (VOICE, f"{RATE} {VOLUME}"), syntezuj_strumien=syntezuj_strumien)
 
 def mow_tekstem(tekst: str):
     """Główna funkcja TTS - zgodna z interfejsem AIA"""
     print(f"🗣️ Edge-TTS mówi: {tekst}")
+    konfiguracja.pobierz()  # tani stat (najwyżej raz na sekundę) - ewentualnie przeładuje głos
     
     try:
-        # Stwórz tymczasowy plik audio
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            temp_path = tmp_file.name
-        
-        # Generuj mowę asynchronicznie
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        success = loop.run_until_complete(_generuj_mowe_async(tekst, temp_path))
-        loop.close()
-        
-        if success and os.path.exists(temp_path):
-            # Odtwórz plik audio
-            data, samplerate = sf.read(temp_path)
-            sd.play(data, samplerate)
-            sd.wait()  # czekaj na zakończenie
-            
-            # Usuń tymczasowy plik
-            os.unlink(temp_path)
-        else:
-            print("❌ Nie udało się wygenerować mowy")
-            
+        potok.mow(tekst)
     except Exception as e:
         print(f"❌ Błąd Edge-TTS: {e}")
 
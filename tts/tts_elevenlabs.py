@@ -1,8 +1,10 @@
 import os
 import sys
-import json
 import tempfile
-import requests
+import numpy as np
+from core import konfiguracja
+from core.http_klient import pobierz_sesje, opis_pomiaru
+from tts.potok import PotokTTS, MP3_DOSTEPNE, dekoduj_strumien
 
 try:
     from playsound import playsound
@@ -27,52 +29,91 @@ except:
     pass
 
 if not api_key:
-    try:
-        with open("config/secure.json", "r", encoding="utf-8") as f:
-            secure = json.load(f)
-            api_key = secure.get("elevenlabs_api_key")
-            voice_id = secure.get("elevenlabs_voice_id", voice_id)
-            if api_key:
-                print("🔑 API ElevenLabs z secure.json")
-            if not voice_id:
-                print("⚠️ Brak voice_id w secure.json – użyto domyślnego.")
-    except:
-        pass
+    api_key = konfiguracja.sekret("elevenlabs_api_key")
+    voice_id = konfiguracja.sekret("elevenlabs_voice_id", voice_id)
+    if api_key:
+        print("🔑 API ElevenLabs z secure.json")
+    if not voice_id:
+        print("⚠️ Brak voice_id w secure.json – użyto domyślnego.")
 
 if not api_key:
     print("❌ Brak klucza API ElevenLabs!")
 
-# === 2. Funkcja do mówienia ===
-def mow_tekstem(tekst: str):
-    if not api_key:
-        print("❌ Nie można użyć ElevenLabs – brak klucza API.")
-        return
+VOICE_SETTINGS = {"stability": 0.5, "similarity_boost": 0.75}
 
-    print(f"🗣️ ElevenLabs mówi: {tekst}")
+# Adres API - nadpisywalny w secure.json (np. lokalny serwer testowy)
+BASE_URL = konfiguracja.sekret("elevenlabs_base_url", "https://api.elevenlabs.io")
+OUTPUT_FORMAT = "mp3_22050_32"   # mniejsze kawałki = szybszy pierwszy dźwięk
+ROZMIAR_KAWALKA = 4096
+TIMEOUT = (5, 30)                # (połączenie, przerwa między kawałkami)
+
+sesja = pobierz_sesje("elevenlabs")
 
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+# === 2. Synteza strumieniowa ===
+def _kawalki_mp3(tekst: str):
+    """Kawałki MP3 z endpointu /stream, w miarę jak przychodzą"""
+    url = f"{BASE_URL}/v1/text-to-speech/{voice_id}/stream"
     headers = {
         "xi-api-key": api_key,
         "Content-Type": "application/json"
     }
     payload = {
         "text": tekst,
-        "voice_settings": {"stability": 0.5, "similarity_boost": 0.75}
+        "voice_settings": VOICE_SETTINGS
     }
 
-    tmp_path = None
-    try:
-        response = requests.post(url, headers=headers, json=payload)
+    with sesja.post(url, headers=headers, json=payload, params={"output_format": OUTPUT_FORMAT},
+                    stream=True, timeout=TIMEOUT) as response:
         if response.status_code != 200:
-            print(f"❌ Błąd API ElevenLabs: {response.status_code}")
             try:
-                print(response.json())
-            except:
-                print(response.text)
-            return
+                szczegoly = response.json()
+            except Exception:
+                szczegoly = response.text
+            raise RuntimeError(f"Błąd API ElevenLabs: {response.status_code} {szczegoly}")
+        print(f"⏱️ ElevenLabs: {opis_pomiaru()}")
+        for kawalek in response.iter_content(chunk_size=ROZMIAR_KAWALKA):
+            if kawalek:
+                yield kawalek
+
+def syntezuj_strumien(tekst: str):
+    """Tekst → generator (pcm, samplerate), dekodowanie w pamięci w trakcie pobierania"""
+    yield from dekoduj_strumien(_kawalki_mp3(tekst))
 
+def syntezuj(tekst: str):
+    """Tekst → (pcm, samplerate) bez odtwarzania (np. rozgrzewanie cache)"""
+    czesci, samplerate = [], None
+    for pcm, samplerate in syntezuj_strumien(tekst):
+        czesci.append(pcm)
+    if not czesci:
+        raise RuntimeError("ElevenLabs zwrócił pusty strumień")
+    return np.concatenate(czesci), samplerate
+
+# Potok tylko gdy da się go użyć (MP3 w libsndfile i klucz API) - None kieruje
+# też strumień LLM do mow_tekstem, z jego komunikatem i odtwarzaniem przez playsound
+potok = PotokTTS("elevenlabs", syntezuj, glos=lambda: (voice_id, str(sorted(VOICE_SETTINGS.items()))),
+                 syntezuj_strumien=syntezuj_strumien) if MP3_DOSTEPNE and api_key else None
+
+# === 3. Funkcja do mówienia ===
+def mow_tekstem(tekst: str):
+    if not api_key:
+        print("❌ Nie można użyć ElevenLabs – brak klucza API.")
+        return
+
+    print(f"🗣️ ElevenLabs mówi: {tekst}")
+
+    if potok is not None:
+        try:
+            potok.mow(tekst)
+        except Exception as e:
+            print(f"❌ Błąd ElevenLabs TTS: {e}")
+        return
+
+    # Stary libsndfile bez MP3 - cały plik przez playsound
+    tmp_path = None
+    try:
+        content = b"".join(_kawalki_mp3(tekst))
         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp:
-            tmp.write(response.content)
+            tmp.write(content)
             tmp_path = tmp.name
 
         playsound(tmp_path)
@@ -88,4 +129,47 @@ def mow_tekstem(tekst: str):
 
 # === Test lokalny ===
 if __name__ == "__main__":
-    mow_tekstem("To jest testowy komunikat z ElevenLabs. Działa poprawnie.")
+    if "--serwer-testowy" in sys.argv:
+        # Lokalny zastępnik API: gotowe MP3 wysyłane kawałkami z opóźnieniem
+        import io
+        import time
+        import threading
+        import soundfile as sf
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        t = np.arange(22050 * 8) / 22050
+        bufor = io.BytesIO()
+        sf.write(bufor, (0.3 * np.sin(2 * np.pi * 330 * t)).astype(np.float32), 22050, format="MP3")
+        MP3 = bufor.getvalue()
+
+        class ZastepnikAPI(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i in range(0, len(MP3), 1024):
+                    kawalek = MP3[i:i + 1024]
+                    self.wfile.write(f"{len(kawalek):X}\r\n".encode() + kawalek + b"\r\n")
+                    self.wfile.flush()
+                    time.sleep(0.05)
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, *args):
+                pass
+
+        serwer = ThreadingHTTPServer(("127.0.0.1", 0), ZastepnikAPI)
+        threading.Thread(target=serwer.serve_forever, daemon=True).start()
+        BASE_URL = f"http://127.0.0.1:{serwer.server_port}"
+        api_key = api_key or "test"
+        print(f"🧪 Zastępnik API ElevenLabs: {BASE_URL} ({len(MP3)} B MP3)")
+
+        start = time.time()
+        for pcm, samplerate in syntezuj_strumien("Test"):
+            print(f"  +{time.time() - start:.2f}s: {len(pcm)} próbek @ {samplerate} Hz")
+        print(f"📊 {sesja.statystyki()}")
+    else:
+        mow_tekstem("To jest testowy komunikat z ElevenLabs. Działa poprawnie.")
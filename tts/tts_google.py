@@ -1,6 +1,8 @@
+import io
 import os
 import sys
 import tempfile
+from tts.potok import PotokTTS, MP3_DOSTEPNE, dekoduj
 
 try:
     from gtts import gTTS
@@ -16,8 +18,25 @@ except ImportError:
     os.system(f"{sys.executable} -m pip install --force-reinstall playsound==1.2.2")
     from playsound import playsound
 
+def syntezuj(tekst: str):
+    """Tekst → (pcm, samplerate) bez odtwarzania"""
+    bufor = io.BytesIO()
+    gTTS(text=tekst, lang="pl").write_to_fp(bufor)
+    return dekoduj(bufor.getvalue())
+
+# Bez MP3 w libsndfile potok nie zdekoduje gTTS - None kieruje też strumień LLM do mow_tekstem
+potok = PotokTTS("google", syntezuj, glos=lambda: ("pl", "")) if MP3_DOSTEPNE else None
+
 def mow_tekstem(tekst: str):
     print(f"🗣️ Google TTS mówi: {tekst}")
+    if potok is not None:
+        try:
+            potok.mow(tekst)
+        except Exception as e:
+            print(f"❌ Błąd Google TTS: {e}")
+        return
+
+    # Stary libsndfile bez MP3 - cały plik przez playsound
     tmp_path = None
     try:
         tts = gTTS(text=tekst, lang="pl")
@@ -1,7 +1,7 @@
 #TTS_pyttsx3.py
 import sys
 import os
-import json
+from core import konfiguracja
 
 try:
     import pyttsx3
@@ -26,9 +26,7 @@ except Exception as e:
 # === Możliwość wyboru głosu z config ===
 voice_index = 0  # domyślny głos
 try:
-    with open("config/secure.json", "r", encoding="utf-8") as f:
-        secure = json.load(f)
-        voice_index = int(secure.get("pyttsx3_voice_index", 0))
+    voice_index = int(konfiguracja.sekret("pyttsx3_voice_index", 0))
 except Exception:
     pass
 